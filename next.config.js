@@ -7,6 +7,15 @@ const nextConfig = {
     config.resolve.alias['@'] = path.join(__dirname, 'src');
     return config;
   },
+  async headers() {
+    // Publication shards are named by content hash and never change
+    return [
+      {
+        source: '/data/publications/:file([\\w.-]+\\.[0-9a-f]{12}\\.json)',
+        headers: [{ key: 'Cache-Control', value: 'public, max-age=31536000, immutable' }],
+      },
+    ];
+  },
   images: {
     formats: ['image/avif', 'image/webp'],
     deviceSizes: [640, 750, 828, 1080, 1200, 1920],
@@ -0,0 +1,10 @@
+-- CreateTable
+CREATE TABLE "SyncHash" (
+    "kind" TEXT NOT NULL,
+    "key" TEXT NOT NULL,
+    "rowId" TEXT NOT NULL,
+    "hash" TEXT NOT NULL,
+    "updatedAt" TIMESTAMP(3) NOT NULL,
+
+    CONSTRAINT "SyncHash_pkey" PRIMARY KEY ("kind","key")
+);
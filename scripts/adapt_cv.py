@@ -1,40 +1,75 @@
 import json
 import click
 from pathlib import Path
-import together
-from typing import Dict, List, Union
+from typing import Callable, Dict, List, Optional, Union
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 import logging
-from dotenv import load_dotenv
-import os
-import yaml
 from datetime import datetime
-import pypandoc
-import jinja2
+from functools import lru_cache
+from config import get_llm, completion_text, stream_completion
+from json_stream import JSONMemberScanner
+from llm_trace import call_label, log_summary, note_cache, note_parse
+from cv_retrieval import select_context
+from token_budget import chunk_text
+from llm_cache import JSONCache, file_hash, fingerprint, set_fingerprint
+from safe_io import atomic_write_json
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Load environment variables
-load_dotenv()
-together.api_key = os.getenv("TOGETHER_API_KEY")
+# Bump whenever the analysis, merge or synthesis prompts change so cached results are not reused
+ANALYSIS_PROMPT_VERSION = "2"
 
-# Load configuration
-with open("config/cv_config.yaml", "r") as f:
-    CONFIG = yaml.safe_load(f)
+CONFIG_PATH = Path("config/cv_config.yaml")
+
+# yaml, jinja2, pypandoc and the LLM client are imported where they are used
+# so that --help and argument errors do not pay for them
+
+@lru_cache(maxsize=None)
+def get_config() -> Dict:
+    """Load cv_config.yaml once, on first use"""
+    import yaml
+    with open(CONFIG_PATH, "r") as f:
+        return yaml.safe_load(f)
+
+def validate_context(ctx, param, value):
+    """Check --context against the contexts listed in the config"""
+    contexts = get_config()['contexts']
+    if value not in contexts:
+        raise click.BadParameter(f"must be one of: {', '.join(contexts)}")
+    return value
 
 class CVAdapter:
-    def __init__(self):
+    def __init__(self, trace_path: str = None, use_cache: bool = True):
         self.data_dir = Path("src/data/research")
         self.template_dir = Path("templates/cv")
         self.output_dir = Path("output/cv")
         self.output_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Initialize Jinja2 environment for templates
-        self.jinja_env = jinja2.Environment(
-            loader=jinja2.FileSystemLoader(str(self.template_dir)),
-            trim_blocks=True,
-            lstrip_blocks=True
-        )
+        self.analysis_cache = JSONCache(self.output_dir / "cache" / "analyses") if use_cache else None
+        self.trace_path = trace_path
+        # Connects on the first call, so export-only and fully cached runs skip it
+        self.llm = get_llm(trace_path=trace_path, run_name="adapt-cv", lazy=True)
+        self._jinja_env = None
+
+    @property
+    def jinja_env(self):
+        """Jinja2 environment for templates, created on first export"""
+        if self._jinja_env is None:
+            import jinja2
+            cache_dir = self.output_dir / "cache" / "jinja"
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            self._jinja_env = jinja2.Environment(
+                loader=jinja2.FileSystemLoader(str(self.template_dir)),
+                bytecode_cache=jinja2.FileSystemBytecodeCache(str(cache_dir)),
+                # Sections missing from the data (or from an adaptation) render empty
+                undefined=jinja2.ChainableUndefined,
+                # Fields that resolve to methods (e.g. title on a plain string) would
+                # otherwise print a memory address and change the output on every run
+                finalize=lambda value: "" if callable(value) else value,
+                trim_blocks=True,
+                lstrip_blocks=True
+            )
+        return self._jinja_env
 
     def load_cv_data(self) -> Dict:
         """Load all CV data from json files"""
@@ -43,44 +78,56 @@ class CVAdapter:
             cv_data[file.stem] = json.load(open(file))
         return cv_data
 
-    def analyze_reference_cvs(self, reference_cvs: List[Path]) -> Dict:
-        """Analyze multiple reference CVs for patterns and insights"""
-        analyses = []
+    def _complete_json(self, prompt: str, label: str, temperature: float = None) -> Optional[Dict]:
+        """Run one completion and parse its JSON object response"""
+        params = dict(
+            prompt=prompt,
+            model=get_config()['llm']['model'],
+            max_tokens=get_config()['llm']['max_tokens']
+        )
+        if temperature is not None:
+            params['temperature'] = temperature
         
-        for cv_path in reference_cvs:
-            with open(cv_path, 'r') as f:
-                content = f.read()
-            
-            prompt = f"""Analyze this reference CV and extract:
+        with call_label(self.llm, label):
+            response = self.llm.Complete.create(**params)
+        
+        try:
+            result = json.loads(completion_text(response))
+            if not isinstance(result, dict):
+                raise json.JSONDecodeError("Expected a JSON object", completion_text(response), 0)
+            note_parse(self.llm, True)
+            return result
+        except json.JSONDecodeError as e:
+            note_parse(self.llm, False)
+            logger.error(f"Error parsing {label} response: {e}")
+            return None
+
+    def _analysis_prompt(self, name: str, content: str, part: int, parts: int) -> str:
+        location = f" (part {part + 1} of {parts})" if parts > 1 else ""
+        return f"""Analyze this reference CV{location} and extract:
 1. Key sections and their organization
 2. Notable presentation styles or formats
 3. Effective phrases or descriptions
 4. Unique elements that make this CV stand out
 5. Field-specific conventions or expectations
 
-Reference CV from {cv_path.name}:
+Reference CV from {name}{location}:
 {content}
 
 Format your response as JSON with sections for each category of analysis.
 """
-            
-            response = together.Complete.create(
-                prompt=prompt,
-                model=CONFIG['llm']['model'],
-                max_tokens=CONFIG['llm']['max_tokens'],
-                temperature=CONFIG['llm']['temperature']
-            )
-            
-            try:
-                analysis = json.loads(response.output.text)
-                analysis['source'] = cv_path.name
-                analyses.append(analysis)
-            except json.JSONDecodeError as e:
-                logger.error(f"Error parsing LLM response for {cv_path}: {e}")
-        
-        # Synthesize insights from multiple CVs
-        synthesis_prompt = f"""Synthesize insights from these CV analyses:
-{json.dumps(analyses, indent=2)}
+
+    def _merge_prompt(self, name: str, partials: List[Dict]) -> str:
+        return f"""Combine these analyses of consecutive parts of the reference CV {name}
+into a single analysis with the same categories:
+{json.dumps(partials, separators=(',', ':'))}
+
+Format your response as JSON with sections for each category of analysis.
+"""
+
+    def _synthesis_prompt(self, analyses: List[Dict]) -> str:
+        return f"""Synthesize insights from these CV analyses:
+{json.dumps(analyses, separators=(',', ':'))}
 
 Identify:
 1. Common patterns across CVs
@@ -90,36 +137,134 @@ Identify:
 
 Format response as JSON.
 """
+
+    def _merge_level(self, pool: ThreadPoolExecutor, items: List[Dict], fan_in: int,
+                     prompt_fn, label: str) -> List[Dict]:
+        """Merge items in groups of fan_in concurrently, one tree level at a time"""
+        groups = [items[i:i + fan_in] for i in range(0, len(items), fan_in)]
+        futures = [pool.submit(self._complete_json, prompt_fn(group), label) for group in groups]
+        return [future.result() or {'unmerged': group} for future, group in zip(futures, groups)]
+
+    def _analyze_file(self, pool: ThreadPoolExecutor, cv_path: Path, chunk_tokens: int,
+                      fan_in: int) -> Optional[Dict]:
+        """Analyze one reference CV chunk by chunk and merge the partial analyses.
+
+        Results are cached by file content hash, model, prompt version and chunk size.
+        """
+        model = get_config()['llm']['model']
+        content_hash = file_hash(cv_path)
+        cache_key = fingerprint("analysis", content_hash, model, ANALYSIS_PROMPT_VERSION, str(chunk_tokens))
+        if self.analysis_cache is not None:
+            cached = self.analysis_cache.get(cache_key)
+            note_cache(self.llm, model, hit=cached is not None, label="analyze_reference")
+            if cached is not None:
+                cached['source'] = cv_path.name
+                return {'hash': content_hash, 'analysis': cached}
         
-        synthesis_response = together.Complete.create(
-            prompt=synthesis_prompt,
-            model=CONFIG['llm']['model'],
-            max_tokens=CONFIG['llm']['max_tokens']
-        )
+        with open(cv_path, 'r') as f:
+            parts = chunk_text(f.read(), chunk_tokens)
         
-        try:
-            synthesis = json.loads(synthesis_response.output.text)
-            synthesis['individual_analyses'] = analyses
-            return synthesis
-        except json.JSONDecodeError as e:
-            logger.error(f"Error parsing synthesis response: {e}")
-            return {'individual_analyses': analyses}
+        futures = [
+            pool.submit(self._complete_json, self._analysis_prompt(cv_path.name, chunk, i, len(parts)),
+                        "analyze_reference", get_config()['llm']['temperature'])
+            for i, chunk in enumerate(parts)
+        ]
+        results = [future.result() for future in futures]
+        partials = [result for result in results if result]
+        if not partials:
+            logger.error(f"No usable analysis for {cv_path}")
+            return None
+        
+        complete = len(partials) == len(results)
+        while len(partials) > 1:
+            partials = self._merge_level(pool, partials, fan_in,
+                                         lambda group: self._merge_prompt(cv_path.name, group),
+                                         "merge_reference")
+            complete = complete and not any('unmerged' in partial for partial in partials)
+        analysis = partials[0]
+        analysis['source'] = cv_path.name
+        
+        # Incomplete analyses are not cached so the next run retries them
+        if complete and self.analysis_cache is not None:
+            self.analysis_cache.put(cache_key, analysis)
+        return {'hash': content_hash, 'analysis': analysis}
+
+    def analyze_reference_cvs(self, reference_cvs: List[Path], max_workers: int = None) -> Dict:
+        """Analyze multiple reference CVs for patterns and insights.
+
+        Long CVs are split into chunks; chunks of all files are analyzed
+        concurrently and merged per file, then the file analyses are
+        synthesized as a tree of merges with at most merge_fan_in inputs each.
+        Per-file analyses and the synthesis are cached, so unchanged
+        references skip the LLM entirely.
+        """
+        settings = get_config().get('analysis', {})
+        workers = max_workers or settings.get('max_workers', 4)
+        chunk_tokens = settings.get('chunk_tokens', 6000)
+        fan_in = max(2, settings.get('merge_fan_in', 4))
+        model = get_config()['llm']['model']
+        
+        # Map: one coordinator per file feeds chunk requests into a shared pool
+        with ThreadPoolExecutor(max_workers=workers) as pool, \
+                ThreadPoolExecutor(max_workers=max(1, len(reference_cvs))) as coordinators:
+            futures = [coordinators.submit(self._analyze_file, pool, cv_path, chunk_tokens, fan_in)
+                       for cv_path in reference_cvs]
+            members = [member for member in (f.result() for f in futures) if member]
+            analyses = [member['analysis'] for member in members]
+            
+            # The synthesis depends only on the set of analyzed files
+            synthesis_key = set_fingerprint((m['hash'] for m in members), "synthesis", model,
+                                            ANALYSIS_PROMPT_VERSION, str(chunk_tokens), str(fan_in))
+            synthesis = self.analysis_cache.get(synthesis_key) if self.analysis_cache else None
+            if self.analysis_cache is not None:
+                note_cache(self.llm, model, hit=synthesis is not None, label="synthesize")
+            
+            if synthesis is None:
+                # Reduce: synthesize the file analyses level by level
+                level = analyses
+                while True:
+                    level = self._merge_level(pool, level, fan_in, self._synthesis_prompt, "synthesize")
+                    if len(level) <= 1:
+                        break
+                synthesis = level[0] if level and 'unmerged' not in level[0] else None
+                if synthesis is not None and self.analysis_cache is not None:
+                    self.analysis_cache.put(synthesis_key, synthesis)
+        
+        synthesis = dict(synthesis or {})
+        synthesis['individual_analyses'] = analyses
+        return synthesis
+
+    def adapt_cv(self, context: str, purpose: str, reference_analysis: Dict = None,
+                 context_budget: int = None,
+                 on_section: Callable[[str, object], None] = None) -> Optional[Dict]:
+        """Adapt CV using current data and optional reference analysis.
 
-    def adapt_cv(self, context: str, purpose: str, reference_analysis: Dict = None) -> Dict:
-        """Adapt CV using current data and optional reference analysis"""
+        The completion is streamed and on_section is called with each top-level
+        section of the JSON response as soon as it is complete. If the stream
+        fails or the JSON breaks off, the sections received so far are returned.
+        """
         cv_data = self.load_cv_data()
         
+        # Only the items relevant to the context and purpose go into the prompt
+        retrieval = get_config().get('retrieval', {})
+        selected = select_context(
+            cv_data,
+            f"{context} {purpose}",
+            budget_tokens=context_budget or retrieval.get('budget_tokens', 3000),
+            top_k=retrieval.get('top_k', 40)
+        )
+        
         prompt = f"""Given the following CV data, context, and reference analysis,
 provide detailed suggestions for adapting this CV.
 
 Context: {context}
 Purpose: {purpose}
 
-Current CV data:
-{json.dumps(cv_data, indent=2)}
+Most relevant CV items (the summary counts the items left out):
+{json.dumps(selected, separators=(',', ':'))}
 
 Reference Analysis (if available):
-{json.dumps(reference_analysis, indent=2) if reference_analysis else "None"}
+{json.dumps(reference_analysis, separators=(',', ':')) if reference_analysis else "None"}
 
 Provide:
 1. Recommended sections and their order
@@ -132,24 +277,37 @@ Provide:
 Format response as JSON.
 """
         
-        response = together.Complete.create(
+        scanner = JSONMemberScanner()
+        suggestions = {}
+        chunks = stream_completion(
+            self.llm,
             prompt=prompt,
-            model=CONFIG['llm']['model'],
-            max_tokens=CONFIG['llm']['max_tokens']
+            model=get_config()['llm']['model'],
+            max_tokens=get_config()['llm']['max_tokens']
         )
-        
         try:
-            return json.loads(response.output.text)
-        except json.JSONDecodeError as e:
-            logger.error(f"Error parsing adaptation response: {e}")
-            return None
+            with call_label(self.llm, "adapt"):
+                for chunk in chunks:
+                    for key, value in scanner.feed(chunk):
+                        suggestions[key] = value
+                        if on_section:
+                            on_section(key, value)
+                    if scanner.done:
+                        break
+        except Exception as e:
+            logger.error(f"Adaptation stream failed: {e}")
+        finally:
+            chunks.close()
+        
+        note_parse(self.llm, scanner.done)
+        if not scanner.done:
+            logger.error(f"Incomplete adaptation response, keeping {len(suggestions)} sections")
+        return suggestions or None
 
-    def export_cv(self, adapted_data: Dict, format: str) -> Path:
+    def export_cv(self, adapted_data: Dict, format: str, context: str = None) -> Path:
         """Export adapted CV to specified format"""
-        # Load appropriate template
-        template = self.jinja_env.get_template(f"{format}_template.{format}")
-        
-        # Render template with adapted data
+        # Render the LaTeX template for the context with adapted data
+        template = self.jinja_env.get_template(self._context_template(context))
         rendered = template.render(**adapted_data)
         
         # Generate output filename
@@ -162,31 +320,144 @@ Format response as JSON.
                 f.write(rendered)
         elif format in ["docx", "pdf"]:
             # Use pandoc for conversion
-            pypandoc.convert_text(
-                rendered,
-                format,
-                format='latex',
-                outputfile=str(output_file),
-                extra_args=['--template', str(self.template_dir / f"custom.{format}")]
-            )
+            convert_latex(rendered, format, str(output_file),
+                          str(self.template_dir / f"custom.{format}"))
         
         return output_file
 
+    def _context_template(self, context: Optional[str]) -> str:
+        """LaTeX template for a context, falling back to the configured default"""
+        name = f"{context}_template.tex"
+        if (self.template_dir / name).exists():
+            return name
+        return get_config().get('export', {}).get('default_template', 'academic_template.tex')
+
+    def render_context(self, context: str, cv_data: Dict) -> str:
+        """Render the LaTeX source for one context from CV data and its latest adaptation"""
+        data = dict(cv_data)
+        adapted_file = self.output_dir / "adapted" / f"{context}.json"
+        if adapted_file.exists():
+            with open(adapted_file) as f:
+                data.update(json.load(f))
+        data['context'] = context
+        return self.jinja_env.get_template(self._context_template(context)).render(**data)
+
+    def export_all(self, contexts: List[str] = None, formats: List[str] = None,
+                   max_workers: int = None, force: bool = False) -> List[Dict]:
+        """Export every context in every format, skipping outputs whose source is unchanged.
+
+        Each context is rendered to LaTeX once; tex outputs are written directly
+        and pandoc conversions run in a process pool. A manifest keeps the hash
+        of the source behind each output so unchanged outputs are not rebuilt.
+        """
+        settings = get_config().get('export', {})
+        contexts = contexts or get_config()['contexts']
+        formats = formats or get_config().get('formats', ['tex'])
+        max_workers = max_workers or settings.get('max_workers')
+
+        export_dir = self.output_dir / "exports"
+        export_dir.mkdir(parents=True, exist_ok=True)
+        manifest_path = export_dir / "manifest.json"
+        manifest = {}
+        if manifest_path.exists():
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+
+        cv_data = self.load_cv_data()
+        results, conversions = [], []
+        for context in contexts:
+            try:
+                rendered = self.render_context(context, cv_data)
+            except Exception as e:
+                logger.error(f"Error rendering {context} CV: {e}")
+                results.extend({'context': context, 'format': fmt, 'status': 'failed'} for fmt in formats)
+                continue
+            
+            for fmt in formats:
+                key = f"{context}.{fmt}"
+                output_file = export_dir / f"cv_{key}"
+                pandoc_template = self.template_dir / f"custom.{fmt}"
+                template_arg = str(pandoc_template) if fmt != "tex" and pandoc_template.exists() else None
+                source_hash = fingerprint(rendered, fmt, file_hash(pandoc_template) if template_arg else "")
+                entry = {'context': context, 'format': fmt, 'output': str(output_file),
+                         'source_hash': source_hash}
+                
+                if not force and output_file.exists() and manifest.get(key, {}).get('source_hash') == source_hash:
+                    results.append(dict(entry, status='unchanged'))
+                elif fmt == "tex":
+                    with open(output_file, 'w') as f:
+                        f.write(rendered)
+                    results.append(dict(entry, status='written'))
+                else:
+                    conversions.append((entry, rendered, template_arg))
+
+        if conversions:
+            with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                futures = [(entry, pool.submit(convert_latex, rendered, entry['format'],
+                                               entry['output'], template_arg))
+                           for entry, rendered, template_arg in conversions]
+                for entry, future in futures:
+                    try:
+                        future.result()
+                        results.append(dict(entry, status='written'))
+                    except Exception as e:
+                        logger.error(f"Error converting {entry['context']} CV to {entry['format']}: {e}")
+                        results.append(dict(entry, status='failed'))
+
+        for result in results:
+            if result['status'] != 'failed':
+                manifest[f"{result['context']}.{result['format']}"] = {
+                    'source_hash': result['source_hash'], 'output': result['output']}
+        atomic_write_json(manifest_path, manifest, sort_keys=True)
+        return results
+
+def format_section(key: str, value) -> str:
+    """Readable text for one suggestion section"""
+    lines = [f"\n{key.replace('_', ' ').capitalize()}:"]
+    if isinstance(value, list):
+        lines.extend(f"- {item if isinstance(item, str) else json.dumps(item)}" for item in value)
+    elif isinstance(value, dict):
+        lines.extend(f"- {k}: {v if isinstance(v, str) else json.dumps(v)}" for k, v in value.items())
+    else:
+        lines.append(str(value))
+    return "\n".join(lines)
+
+def convert_latex(source: str, format: str, output_file: str, template: Optional[str] = None) -> str:
+    """Convert rendered LaTeX with pandoc (module level so worker processes can run it)"""
+    import pypandoc
+    pypandoc.convert_text(
+        source,
+        format,
+        format='latex',
+        outputfile=output_file,
+        extra_args=['--template', template] if template else []
+    )
+    return output_file
+
 @click.group()
-def cli():
+@click.option('--trace', type=click.Path(dir_okay=False),
+              help="Append a JSONL trace of every LLM call to this file")
+@click.pass_context
+def cli(ctx, trace: str):
     """Enhanced CV adaptation CLI"""
-    pass
+    ctx.obj = {'trace': trace}
 
 @cli.command()
-@click.option('--context', type=click.Choice(CONFIG['contexts']), prompt=True)
+@click.option('--context', callback=validate_context, prompt=True,
+              help="Target context (one of the contexts in config/cv_config.yaml)")
 @click.option('--purpose', prompt="What is the purpose of this CV adaptation?")
 @click.option('--reference-cvs', multiple=True, type=click.Path(exists=True),
               help="Path to reference CVs")
 @click.option('--format', type=click.Choice(['tex', 'docx', 'pdf']), default='tex',
               help="Output format")
-def adapt(context: str, purpose: str, reference_cvs: List[str], format: str):
+@click.option('--context-budget', type=int,
+              help="Token budget for CV items in the prompt (default from config)")
+@click.option('--no-cache', is_flag=True, help="Re-analyze reference CVs even if cached")
+@click.pass_obj
+def adapt(obj: Dict, context: str, purpose: str, reference_cvs: List[str], format: str,
+          context_budget: int, no_cache: bool):
     """Adapt CV for specific context with optional reference CVs"""
-    adapter = CVAdapter()
+    adapter = CVAdapter(trace_path=obj['trace'], use_cache=not no_cache)
     
     # Analyze reference CVs if provided
     reference_analysis = None
@@ -194,39 +465,68 @@ def adapt(context: str, purpose: str, reference_cvs: List[str], format: str):
         logger.info(f"Analyzing {len(reference_cvs)} reference CVs...")
         reference_analysis = adapter.analyze_reference_cvs([Path(cv) for cv in reference_cvs])
     
-    # Get adaptation suggestions
+    # Get adaptation suggestions, saving and echoing each section as it arrives
     logger.info(f"Adapting CV for {context} context...")
-    suggestions = adapter.adapt_cv(context, purpose, reference_analysis)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    suggestions_file = adapter.output_dir / f"suggestions_{timestamp}.json"
+    received = {}
+    
+    def on_section(key: str, value):
+        received[key] = value
+        atomic_write_json(suggestions_file, received)
+        click.echo(format_section(key, value))
+    
+    suggestions = adapter.adapt_cv(context, purpose, reference_analysis, context_budget, on_section)
     
     if suggestions:
-        # Save suggestions
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        suggestions_file = adapter.output_dir / f"suggestions_{timestamp}.json"
-        with open(suggestions_file, 'w') as f:
-            json.dump(suggestions, f, indent=2)
+        logger.info(f"Saved suggestions to {suggestions_file}")
         
-        # Export adapted CV
-        output_file = adapter.export_cv(suggestions, format)
+        # Keep the latest adaptation per context for export-all
+        adapted_dir = adapter.output_dir / "adapted"
+        adapted_dir.mkdir(exist_ok=True)
+        atomic_write_json(adapted_dir / f"{context}.json", suggestions)
         
-        logger.info(f"Saved suggestions to {suggestions_file}")
+        # Export adapted CV
+        output_file = adapter.export_cv(suggestions, format, context)
         logger.info(f"Exported adapted CV to {output_file}")
-        
-        # Print key suggestions
-        click.echo("\nKey suggestions:")
-        for suggestion in suggestions.get("general_suggestions", []):
-            click.echo(f"- {suggestion}")
+    
+    log_summary(adapter.llm)
 
 @cli.command()
 @click.argument('reference_cvs', nargs=-1, type=click.Path(exists=True))
 @click.option('--output', default="cv_analysis.json", help="Output file name")
-def analyze(reference_cvs: List[str], output: str):
+@click.option('--workers', type=int, help="Concurrent LLM requests (default from config)")
+@click.option('--no-cache', is_flag=True, help="Re-analyze reference CVs even if cached")
+@click.pass_obj
+def analyze(obj: Dict, reference_cvs: List[str], output: str, workers: int, no_cache: bool):
     """Analyze multiple reference CVs"""
-    adapter = CVAdapter()
-    analysis = adapter.analyze_reference_cvs([Path(cv) for cv in reference_cvs])
+    adapter = CVAdapter(trace_path=obj['trace'], use_cache=not no_cache)
+    analysis = adapter.analyze_reference_cvs([Path(cv) for cv in reference_cvs], workers)
     
     with open(output, 'w') as f:
         json.dump(analysis, f, indent=2)
     logger.info(f"Saved CV analysis to {output}")
+    log_summary(adapter.llm)
+
+@cli.command('export-all')
+@click.option('--context', 'contexts', multiple=True, callback=lambda ctx, param, values:
+              tuple(validate_context(ctx, param, v) for v in values),
+              help="Context to export (repeatable, default all contexts in the config)")
+@click.option('--format', 'formats', multiple=True, type=click.Choice(['tex', 'docx', 'pdf']),
+              help="Format to export (repeatable, default all formats in the config)")
+@click.option('--workers', type=int, help="Concurrent pandoc conversions (default from config)")
+@click.option('--force', is_flag=True, help="Rebuild outputs even if their source is unchanged")
+def export_all(contexts: List[str], formats: List[str], workers: int, force: bool):
+    """Export every context in every format"""
+    adapter = CVAdapter()
+    results = adapter.export_all(list(contexts), list(formats), workers, force)
+    
+    for result in results:
+        click.echo(f"{result['status']:>9}  {result['context']}.{result['format']}")
+    failed = sum(result['status'] == 'failed' for result in results)
+    unchanged = sum(result['status'] == 'unchanged' for result in results)
+    logger.info(f"Exported {len(results) - failed - unchanged} files, "
+                f"{unchanged} unchanged, {failed} failed")
 
 if __name__ == "__main__":
     cli() 
\ No newline at end of file
@@ -3,6 +3,8 @@ import click
 from pathlib import Path
 import datetime
 from typing import Dict, List
+from content_store import AREAS_COLLECTION, open_store
+from safe_io import update_json
 
 DATA_DIR = Path("src/data/research")
 
@@ -42,20 +44,21 @@ WORK_TYPES = {
     }
 }
 
+def collection_name(filename: str) -> str:
+    """Content store collection for a file in the data directory"""
+    return f"research/{filename}"
+
 def load_json(filename: str) -> Dict:
-    """Load a JSON file from the data directory"""
+    """Load a JSON file from the data directory (or the content store)"""
+    with open_store() as store:
+        if store and store.has_collection(collection_name(filename)):
+            return store.load(collection_name(filename))
     filepath = DATA_DIR / filename
     if not filepath.exists():
         return {}
     with open(filepath) as f:
         return json.load(f)
 
-def save_json(data: Dict, filename: str):
-    """Save data to a JSON file in the data directory"""
-    filepath = DATA_DIR / filename
-    with open(filepath, "w") as f:
-        json.dump(data, f, indent=2)
-
 def prompt_areas() -> List[str]:
     """Prompt user to select research areas"""
     areas = load_json("areas.json")
@@ -108,19 +111,15 @@ def add(type, area):
         data['amount'] = click.prompt('Amount')
         data['funder'] = click.prompt('Funder')
     
-    # Load existing data
-    research_file = DATA_DIR / "areas.json"
-    with open(research_file) as f:
-        research_data = json.load(f)
-    
-    # Add new item
-    if type + 's' not in research_data[area]:
-        research_data[area][type + 's'] = []
-    research_data[area][type + 's'].append(data)
-    
-    # Save updated data
-    with open(research_file, 'w') as f:
-        json.dump(research_data, f, indent=2)
+    with open_store() as store:
+        if store:
+            # Insert one row; areas.json is rewritten by compaction
+            store.add_item(AREAS_COLLECTION, data, group=type + 's', area=area)
+            click.echo("Run 'cv_updater.py compact' to update areas.json")
+        else:
+            # Add the item to the current file contents under the file lock
+            update_json(DATA_DIR / "areas.json",
+                        lambda research_data: research_data[area].setdefault(type + 's', []).append(data))
     
     click.echo(f"Added {type}: {data['title']}")
 
@@ -139,23 +138,101 @@ def list_work():
 @cli.command()
 def add_area():
     """Add a new research area"""
-    areas = load_json("areas.json")
-    
     name = click.prompt("Area name")
     id = click.prompt("Area ID (e.g., ai-education)")
     description = click.prompt("Description")
     keywords = click.prompt("Keywords (comma-separated)").split(",")
     keywords = [k.strip() for k in keywords]
     
-    areas[name] = {
+    area = {
         "id": id,
         "description": description,
         "keywords": keywords
     }
     
-    save_json(areas, "areas.json")
+    with open_store() as store:
+        if store:
+            store.set_area(name, area)
+            click.echo("Run 'cv_updater.py compact' to update areas.json")
+        else:
+            update_json(DATA_DIR / "areas.json", lambda areas: areas.update({name: area}), default={})
     click.echo(f"\nAdded research area: {name}")
 
+def validate_work(item: Dict, work_type: str) -> List[str]:
+    """Problems that keep an item from being added as work_type"""
+    if work_type not in WORK_TYPES:
+        return [f"unknown work type: {work_type}" if work_type else "no work type (use --type or a work_type column)"]
+    spec = WORK_TYPES[work_type]
+    errors = [f"missing {name}" for name in spec["required_fields"]
+              if item.get(name) in (None, "", [])]
+    subtype = item.get("subtype")
+    if subtype and subtype not in spec["subtypes"]:
+        errors.append(f"unknown {work_type} subtype: {subtype}")
+    return errors
+
+@cli.command()
+@click.argument('input_file', type=click.Path(exists=True, dir_okay=False))
+@click.option('--type', 'default_type', type=click.Choice(list(WORK_TYPES)),
+              help="Work type for rows without a work_type column")
+@click.option('--group', 'default_group',
+              help="List inside <type>s.json for rows without a group column (e.g. journal_articles)")
+@click.option('--report', type=click.Path(dir_okay=False), help="Write the per-row error report as JSON")
+@click.option('--dry-run', is_flag=True, help="Validate without writing")
+def bulk(input_file, default_type, default_group, report, dry_run):
+    """Import many works from CSV or JSONL (list cells separated by ';')"""
+    from bulk_import import ImportReport, RowError, merge_sorted, read_rows
+    
+    result = ImportReport()
+    files: Dict[str, Dict] = {}
+    valid: Dict[str, Dict[str, List[Dict]]] = {}
+    for number, item in read_rows(Path(input_file)):
+        work_type = item.pop('work_type', None) or default_type
+        group = item.pop('group', None) or default_group
+        errors = [item.pop('__error__')] if '__error__' in item else validate_work(item, work_type)
+        
+        if not errors:
+            filename = f"{work_type}s.json"
+            if filename not in files:
+                files[filename] = load_json(filename)
+            if not group:
+                # A file with a single list (grants.json) needs no group
+                groups = list(files[filename])
+                if len(groups) == 1:
+                    group = groups[0]
+                else:
+                    errors.append(f"no group for {filename} (one of: {', '.join(groups) or 'none yet'})")
+        
+        if errors:
+            result.errors.append(RowError(number, str(item.get('title', '')), errors))
+            continue
+        valid.setdefault(filename, {}).setdefault(group, []).append(item)
+    
+    for filename, groups in valid.items():
+        result.added += sum(len(items) for items in groups.values())
+        if dry_run:
+            continue
+        with open_store() as store:
+            if store and store.has_collection(collection_name(filename)):
+                # Rows go in with one transaction; date-sorted collections export newest first
+                for group, items in groups.items():
+                    store.add_items(collection_name(filename), items, group)
+                store.export(collection_name(filename))
+                continue
+        
+        def merge(data: Dict):
+            for group, items in groups.items():
+                data[group] = merge_sorted(data.get(group, []), items)
+        update_json(DATA_DIR / filename, merge, default={})
+    
+    for error in result.errors:
+        click.echo(f"Row {error.row} ({error.title or 'untitled'}): {'; '.join(error.errors)}", err=True)
+    if report:
+        result.save(Path(report))
+    verb = "Validated" if dry_run else "Imported"
+    click.echo(f"{verb} {result.added} works, {len(result.errors)} rows rejected")
+    if result.errors:
+        raise SystemExit(1)
+
 cli.add_command(add)
 
 if __name__ == "__main__":
@@ -0,0 +1,461 @@
+"""Canonical author index for the whole corpus.
+
+Author strings come straight from the CV ("Ion, M.", "Herbst, P. G.",
+"Gere, A.R."), so the same person turns up under several spellings. This
+builds, in one pass over every author string, an index of canonical
+authors with their variants, and lists the merges it is not sure about as
+proposals for a person to confirm:
+
+- names are parsed into a last name and given names or initials, and
+  compared in a folded form (no accents, case, dots or hyphens);
+- candidates are found through a trigram index over last names, so only
+  similar last names are ever compared. Trigrams miss one-letter typos in
+  short names ("Paulsen"/"Paulson"), so last names one edit apart are also
+  found, through an index of their one-letter deletions;
+- each candidate is scored from last-name similarity and whether the given
+  names agree. Variants that agree with exactly one author are merged;
+  ambiguous ones ("Brown, A." when there is an "A. M." and an "A. R.
+  Brown") and near misses become proposals.
+
+Decisions are kept in the index and honoured on every rebuild:
+
+    python scripts/author_index.py
+    python scripts/author_index.py --accept "Brown, A.=Brown, A. M." --reject "Gere, A.=Gere, A.R."
+"""
+import argparse
+import json
+import logging
+import math
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from safe_io import atomic_write_json
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DATA_ROOT = Path("src/data")
+SOURCES = [DATA_ROOT / "publications.json", DATA_ROOT / "research" / "publications.json",
+           DATA_ROOT / "cv" / "publications_and_presentations.json"]
+AUTHORS_FILE = DATA_ROOT / "authors.json"
+INDEX_FILE = DATA_ROOT / "author-index.json"
+
+MIN_SIMILARITY = 0.7     # last-name trigram similarity for two names to be compared at all
+MERGE_THRESHOLD = 0.9    # score at which a variant is merged without asking
+REVIEW_THRESHOLD = 0.6   # score at which a possible merge is proposed
+EDIT_SIMILARITY = 0.8    # last-name similarity of a one-letter typo: proposed, never merged on its own
+MIN_EDIT_LENGTH = 4      # shorter last names one letter apart are usually different people ("Ko", "Ho")
+
+# Anything with these is a heading or a place that slipped into an author list
+NOT_A_NAME = re.compile(r"[\d&:;/()@]|\b(and|talks?|lectures?|invited|university|department|conference"
+                        r"|annual|meetings?|symposium|proceedings|congress|workshop|north america)\b", re.I)
+# A list item that is only initials, left over from splitting "Herbst, P." on commas
+INITIALS_ONLY = re.compile(r"^(?:[^\W\d_]\.?\s*)+\}?\.?$")
+
+
+def fold(text: str) -> str:
+    """Lower case without accents, for comparison"""
+    text = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in text if not unicodedata.combining(c)).lower()
+
+
+def clean_name(raw: str) -> str:
+    """An author string without LaTeX markup and stray whitespace"""
+    text = re.sub(r"\\\w+\s*\{([^}]*)\}", r"\1", raw)
+    text = text.replace("{", "").replace("}", "").replace("~", " ")
+    return re.sub(r"\s+", " ", text).strip(" ,;")
+
+
+@dataclass(frozen=True)
+class AuthorName:
+    """An author string split into a last name and given names or initials.
+
+    last_key and folded hold the comparison forms of last and given.
+    """
+    raw: str
+    last: str
+    given: Tuple[str, ...]
+    last_key: str
+    folded: Tuple[str, ...]
+
+    @property
+    def initials(self) -> str:
+        return "".join(g[0] for g in self.folded)
+
+    @property
+    def key(self) -> str:
+        return f"{self.last_key}|{self.initials}"
+
+
+def split_given(text: str) -> Tuple[str, ...]:
+    """"A.R." and "A. R." both give ("A", "R"); "Lowenberg D." gives ("Lowenberg", "D")"""
+    return tuple(part for part in re.split(r"[\s.]+", text) if part)
+
+
+def parse_name(raw: str, details: Optional[Dict] = None) -> Optional[AuthorName]:
+    """Parse "Last, F. M." or "First Middle Last"; None for strings that are not names.
+
+    authors.json details, when given, supply the full first name.
+    """
+    # A lone brace is a venue or place cut out of the middle of a LaTeX group
+    if raw.count("{") != raw.count("}"):
+        return None
+    text = clean_name(raw)
+    if not text or NOT_A_NAME.search(text) or not re.search(r"[^\W\d_]", text):
+        return None
+    if "," in text:
+        last, _, rest = text.partition(",")
+        given = split_given(rest)
+    else:
+        parts = text.split()
+        if len(parts) < 2:
+            return None
+        last, given = parts[-1], split_given(" ".join(parts[:-1]))
+    last = last.strip()
+    if not last or len(last.split()) > 3:
+        return None
+    if details and details.get("firstName"):
+        first = split_given(details["firstName"])
+        # Keep written middle initials after the recorded first name
+        given = first + given[len(first):] if given else first
+    return AuthorName(raw=raw, last=last, given=given, last_key=re.sub(r"[^a-z]", "", fold(last)),
+                      folded=tuple(fold(g) for g in given))
+
+
+def trigrams(text: str) -> Set[str]:
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def similarity(a: Set[str], b: Set[str]) -> float:
+    """Dice coefficient of two trigram sets"""
+    return 2 * len(a & b) / (len(a) + len(b)) if a and b else 0.0
+
+
+def given_score(a: Tuple[str, ...], b: Tuple[str, ...]) -> float:
+    """How well two lists of folded given names agree: 1 identical, 0 contradictory.
+
+    Initials agree with names starting with them, and a shorter list agrees
+    with a longer one it is the start of ("A." and "A. R.").
+    """
+    if not a or not b:
+        return 0.6
+    if a == b:
+        return 1.0
+    for x, y in zip(a, b):
+        if x[0] != y[0] or (len(x) > 1 and len(y) > 1 and x != y):
+            return 0.0
+    return 0.95
+
+
+def deletions(text: str) -> Set[str]:
+    """text and every string one letter shorter; two strings one edit apart share one"""
+    return {text} | {text[:i] + text[i + 1:] for i in range(len(text))}
+
+
+def one_edit_apart(a: str, b: str) -> bool:
+    """Whether one substitution, insertion, deletion or swap of neighbours turns a into b"""
+    if a == b or abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) != len(b):
+        short, long = sorted((a, b), key=len)
+        return short in {long[:i] + long[i + 1:] for i in range(len(long))}
+    diff = [i for i, (x, y) in enumerate(zip(a, b)) if x != y]
+    return len(diff) == 1 or (len(diff) == 2 and diff[1] == diff[0] + 1
+                              and a[diff[0]] == b[diff[1]] and a[diff[1]] == b[diff[0]])
+
+
+def name_score(a: AuthorName, b: AuthorName, last_similarity: float = None) -> float:
+    if last_similarity is None:
+        last_similarity = 1.0 if a.last_key == b.last_key else similarity(trigrams(a.last_key),
+                                                                           trigrams(b.last_key))
+    return last_similarity * given_score(a.folded, b.folded)
+
+
+@dataclass
+class Cluster:
+    """One canonical author and the names merged into it"""
+    names: List[AuthorName] = field(default_factory=list)
+    canonical: Optional[str] = None
+
+
+@dataclass
+class Proposal:
+    variant: str
+    canonical: str
+    score: float
+    reason: str
+
+    def to_dict(self) -> Dict:
+        return {"variant": self.variant, "canonical": self.canonical,
+                "score": round(self.score, 3), "reason": self.reason}
+
+
+def join_fragments(names: List[str]) -> List[str]:
+    """Rejoin names a naive comma split cut in two: ["Herbst", "P."] -> ["Herbst, P."]"""
+    joined = []
+    for name in names:
+        name = name.strip()
+        if joined and INITIALS_ONLY.match(name) and "," not in joined[-1] and len(joined[-1].split()) <= 3:
+            joined[-1] = f"{joined[-1]}, {name}"
+        elif name:
+            joined.append(name)
+    return joined
+
+
+def iter_author_strings(data) -> Iterator[str]:
+    """Every name in an "authors" list anywhere in a JSON document"""
+    if isinstance(data, dict):
+        for key, value in data.items():
+            if key == "authors":
+                names = value if isinstance(value, list) else [value]
+                yield from join_fragments([name for name in names if isinstance(name, str)])
+            else:
+                yield from iter_author_strings(value)
+    elif isinstance(data, list):
+        for value in data:
+            yield from iter_author_strings(value)
+
+
+def read_corpus(paths: Iterable[Path]) -> Counter:
+    """Occurrences of each author string across the source files"""
+    counts = Counter()
+    for path in paths:
+        if not path.exists():
+            logger.warning(f"Skipping missing source {path}")
+            continue
+        with open(path) as f:
+            counts.update(iter_author_strings(json.load(f)))
+    return counts
+
+
+class AuthorIndexBuilder:
+    """Clusters author strings into canonical authors in one pass"""
+
+    def __init__(self, known: Dict[str, Dict] = None, accepted: Dict[str, str] = None,
+                 rejected: Iterable[Iterable[str]] = (), min_similarity: float = MIN_SIMILARITY,
+                 merge_threshold: float = MERGE_THRESHOLD, review_threshold: float = REVIEW_THRESHOLD):
+        self.known = known or {}
+        self.accepted = dict(accepted or {})
+        self.rejected = {frozenset(pair) for pair in rejected}
+        self.min_similarity = min_similarity
+        self.merge_threshold = merge_threshold
+        self.review_threshold = review_threshold
+        self.clusters: List[Cluster] = []
+        self.cluster_of: Dict[str, int] = {}
+        self.by_last: Dict[str, List[int]] = defaultdict(list)
+        self.postings: Dict[str, Set[str]] = defaultdict(set)
+        self.grams: Dict[str, Set[str]] = {}
+        self.near: Dict[str, Set[str]] = defaultdict(set)
+        self.similar: Dict[str, Dict[str, float]] = {}
+        self.proposals: List[Tuple[str, int, float, str]] = []
+
+    def _add(self, name: AuthorName, cluster_id: Optional[int] = None) -> int:
+        if cluster_id is None:
+            cluster_id = len(self.clusters)
+            self.clusters.append(Cluster())
+        self.clusters[cluster_id].names.append(name)
+        self.cluster_of[name.raw] = cluster_id
+        if cluster_id not in self.by_last[name.last_key]:
+            self.by_last[name.last_key].append(cluster_id)
+        return cluster_id
+
+    def index_last_names(self, keys: Iterable[str]):
+        """Trigram index over every last name in the corpus"""
+        for last in keys:
+            if last not in self.grams:
+                self.grams[last] = trigrams(last)
+                for gram in self.grams[last]:
+                    self.postings[gram].add(last)
+                if len(last) >= MIN_EDIT_LENGTH:
+                    for short in deletions(last):
+                        self.near[short].add(last)
+
+    def similar_last_names(self, last: str) -> Dict[str, float]:
+        """Last names in the corpus similar to last, with their similarity.
+
+        Reaching min_similarity takes at least `needed` shared trigrams, so
+        any match shares one of the len - needed + 1 rarest trigrams of
+        last; only those postings are read, and candidates are verified.
+        Last names one edit apart score at least EDIT_SIMILARITY.
+        """
+        if last in self.similar:
+            return self.similar[last]
+        grams = self.grams.get(last) or trigrams(last)
+        t = self.min_similarity
+        needed = math.ceil(t * len(grams) / (2 - t))
+        rarest = sorted(grams, key=lambda g: len(self.postings.get(g, ())))[:len(grams) - needed + 1]
+        # Dice >= t also bounds how different the two trigram counts can be
+        low, high = len(grams) * t / (2 - t), len(grams) * (2 - t) / t
+        found = {last: 1.0}
+        for other in set().union(*(self.postings.get(gram, ()) for gram in rarest)):
+            if other != last and low <= len(self.grams[other]) <= high:
+                score = similarity(grams, self.grams[other])
+                if score >= t:
+                    found[other] = score
+        if len(last) >= MIN_EDIT_LENGTH:
+            for other in set().union(*(self.near.get(short, ()) for short in deletions(last))):
+                if other != last and one_edit_apart(last, other):
+                    found[other] = max(found.get(other, 0.0), EDIT_SIMILARITY)
+        self.similar[last] = found
+        return found
+
+    def _score(self, name: AuthorName, cluster_id: int) -> float:
+        """Score against the whole cluster: every member has to agree"""
+        members = self.clusters[cluster_id].names
+        if self.rejected and any(frozenset((name.raw, m.raw)) in self.rejected for m in members):
+            return 0.0
+        similar = self.similar_last_names(name.last_key)
+        return min(name_score(name, m, similar.get(m.last_key, 0.0)) for m in members)
+
+    def place(self, name: AuthorName):
+        target = self.accepted.get(name.raw)
+        if target in self.cluster_of:
+            self._add(name, self.cluster_of[target])
+            return
+        scores = {}
+        for last in self.similar_last_names(name.last_key):
+            for cluster_id in self.by_last.get(last, ()):
+                if cluster_id not in scores:
+                    scores[cluster_id] = self._score(name, cluster_id)
+        merges = [c for c, s in scores.items() if s >= self.merge_threshold]
+        if len(merges) == 1:
+            self._add(name, merges[0])
+            return
+        cluster_id = self._add(name)
+        for other, score in scores.items():
+            if len(merges) > 1 and other in merges:
+                self.proposals.append((name.raw, other, score, f"ambiguous: matches {len(merges)} authors"))
+            elif score >= self.review_threshold:
+                reason = "same last name" if name.last_key == self.clusters[other].names[0].last_key \
+                    else "similar last name"
+                self.proposals.append((name.raw, other, score, reason))
+
+    def order(self, names: Iterable[AuthorName], counts: Counter) -> List[AuthorName]:
+        """Pinned targets and fuller names first, so clusters are founded by complete forms"""
+        targets = set(self.accepted.values())
+        return sorted(names, key=lambda n: (n.raw not in targets, n.raw in self.accepted, -len(n.given),
+                                            n.raw not in self.known, -counts[n.raw], n.raw))
+
+    def canonical(self, cluster: Cluster, counts: Counter) -> str:
+        """The authors.json entry if there is one, else the fullest, most used form"""
+        best = min(cluster.names, key=lambda n: (n.raw not in self.known, -len(n.given),
+                                                 -sum(len(g) for g in n.given), -counts[n.raw], n.raw))
+        return best.raw
+
+    def build(self, counts: Counter) -> Dict:
+        names, unparsed = [], []
+        for raw in set(counts) | set(self.known):
+            parsed = parse_name(raw, self.known.get(raw))
+            if parsed:
+                names.append(parsed)
+            else:
+                unparsed.append(raw)
+        self.index_last_names(name.last_key for name in names)
+        for name in self.order(names, counts):
+            self.place(name)
+
+        authors, aliases = {}, {}
+        for cluster in self.clusters:
+            cluster.canonical = self.canonical(cluster, counts)
+            head = next(n for n in cluster.names if n.raw == cluster.canonical)
+            authors[cluster.canonical] = {
+                "key": head.key, "lastName": head.last,
+                "variants": {n.raw: counts[n.raw] for n in sorted(cluster.names, key=lambda n: n.raw)},
+                "count": sum(counts[n.raw] for n in cluster.names),
+            }
+            for n in cluster.names:
+                if n.raw != cluster.canonical:
+                    aliases[n.raw] = cluster.canonical
+
+        proposals = {}
+        for variant, cluster_id, score, reason in self.proposals:
+            canonical = self.clusters[cluster_id].canonical
+            # Only propose merging two distinct authors, once per pair
+            if self.cluster_of[variant] == cluster_id:
+                continue
+            pair = frozenset((self.clusters[self.cluster_of[variant]].canonical, canonical))
+            if pair not in proposals or proposals[pair].score < score:
+                proposals[pair] = Proposal(variant, canonical, score, reason)
+
+        return {
+            "authors": dict(sorted(authors.items())),
+            "aliases": dict(sorted(aliases.items())),
+            "proposals": [p.to_dict() for p in sorted(proposals.values(), key=lambda p: (-p.score, p.variant))],
+            "unparsed": sorted(unparsed),
+            "accepted": dict(sorted(self.accepted.items())),
+            "rejected": sorted(sorted(pair) for pair in self.rejected),
+        }
+
+
+def load_index(path: Path) -> Dict:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def parse_pair(text: str) -> Tuple[str, str]:
+    variant, sep, canonical = text.partition("=")
+    if not sep or not variant.strip() or not canonical.strip():
+        raise argparse.ArgumentTypeError(f"expected VARIANT=CANONICAL, got {text!r}")
+    return variant.strip(), canonical.strip()
+
+
+def build_index(sources: Iterable[Path] = SOURCES, authors_path: Path = AUTHORS_FILE,
+                index_path: Path = INDEX_FILE, accept: Iterable[Tuple[str, str]] = (),
+                reject: Iterable[Tuple[str, str]] = (), **thresholds) -> Dict:
+    """Rebuild the index from the sources, keeping earlier decisions"""
+    previous = load_index(index_path)
+    accepted = dict(previous.get("accepted", {}))
+    rejected = {frozenset(pair) for pair in previous.get("rejected", [])}
+    for variant, canonical in accept:
+        accepted[variant] = canonical
+        rejected.discard(frozenset((variant, canonical)))
+    for a, b in reject:
+        rejected.add(frozenset((a, b)))
+        if accepted.get(a) == b:
+            del accepted[a]
+
+    known = {}
+    if authors_path.exists():
+        with open(authors_path) as f:
+            known = json.load(f).get("authors", {})
+    counts = read_corpus(sources)
+    builder = AuthorIndexBuilder(known, accepted, rejected, **thresholds)
+    index = builder.build(counts)
+    atomic_write_json(index_path, index)
+    logger.info(f"Indexed {sum(counts.values())} author mentions as {len(index['authors'])} authors "
+                f"({len(index['aliases'])} variants merged, {len(index['proposals'])} merges to review, "
+                f"{len(index['unparsed'])} entries that are not names)")
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the canonical author index and merge proposals")
+    parser.add_argument("--source", dest="sources", type=Path, action="append",
+                        help="JSON file with author lists (repeatable, default: the site data)")
+    parser.add_argument("--authors", type=Path, default=AUTHORS_FILE)
+    parser.add_argument("--output", type=Path, default=INDEX_FILE)
+    parser.add_argument("--accept", type=parse_pair, action="append", default=[], metavar="VARIANT=CANONICAL",
+                        help="Merge VARIANT into CANONICAL from now on (repeatable)")
+    parser.add_argument("--reject", type=parse_pair, action="append", default=[], metavar="A=B",
+                        help="Never merge A and B (repeatable)")
+    parser.add_argument("--merge-threshold", type=float, default=MERGE_THRESHOLD)
+    parser.add_argument("--review-threshold", type=float, default=REVIEW_THRESHOLD)
+    args = parser.parse_args()
+
+    index = build_index(args.sources or SOURCES, args.authors, args.output, args.accept, args.reject,
+                        merge_threshold=args.merge_threshold, review_threshold=args.review_threshold)
+    for proposal in index["proposals"]:
+        print(f"{proposal['score']:.2f}  {proposal['variant']!r} -> {proposal['canonical']!r}"
+              f"  ({proposal['reason']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""Query latency of the publication search index.
+
+Builds an index over a synthetic corpus (default 50,000 records with a
+Zipf-like vocabulary, so common and rare words both occur) or loads a
+built index, then times a mix of queries:
+
+    python scripts/bench_search.py
+    python scripts/bench_search.py --records 100000 --output search.json
+    python scripts/bench_search.py --index public/data/search/index.json --query "geometry teach"
+
+Every query is timed fresh: the prefix expansions the index keeps between
+queries are cleared before each one, so no query is helped by an earlier
+one. (Expansions and levels of short prefixes are found when the index is
+loaded and count towards the load time.) Exits with 1 when the p95 of any query kind exceeds --budget-ms.
+"""
+import argparse
+import itertools
+import json
+import random
+import statistics
+import sys
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from search_index import SearchIndex, build_index, encode
+
+SYLLABLES = ["al", "ge", "bra", "tea", "ch", "ing", "math", "em", "at", "ics", "geo", "met", "ry", "stu",
+             "dent", "lear", "ning", "mod", "el", "proof", "ana", "lys", "is", "cur", "ric", "ulum"]
+VENUES = ["Journal of Mathematics Teacher Education", "PME-NA", "Educational Studies in Mathematics",
+          "ZDM", "Learning at Scale", "Computers & Education"]
+
+
+@dataclass
+class LatencyResult:
+    """Latency of one kind of query, over all its runs"""
+    kind: str
+    queries: int
+    p50_ms: float
+    p95_ms: float
+    max_ms: float
+    hits: float
+
+
+def vocabulary(size: int, rng: random.Random) -> List[str]:
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def synthetic_corpus(records: int, seed: int = 7) -> List[Dict]:
+    """Publications whose words follow a Zipf-like distribution"""
+    rng = random.Random(seed)
+    words = vocabulary(20000, rng)
+    cumulative = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(words))))
+    surnames = vocabulary(3000, rng)
+
+    def text(n: int) -> str:
+        return " ".join(rng.choices(words, cum_weights=cumulative, k=n))
+
+    return [{"title": text(rng.randint(5, 12)).capitalize(),
+             "authors": [f"{rng.choice(surnames).capitalize()}, {rng.choice('ABCDEFGHJKLMNPRS')}."
+                         for _ in range(rng.randint(1, 5))],
+             "venue": rng.choice(VENUES), "year": rng.randint(1995, 2026),
+             "type": rng.choice(["journal", "conference", "book_chapter"]),
+             "description": text(rng.randint(10, 40))}
+            for _ in range(records)]
+
+
+def query_mix(index: SearchIndex, count: int, seed: int = 11) -> Dict[str, List[str]]:
+    """Queries by kind: common, rare and two words, and a typed prefix"""
+    rng = random.Random(seed)
+    by_frequency = sorted(range(len(index.terms)), key=lambda t: -index.df[t])
+    common = [index.terms[t] for t in by_frequency[:50]]
+    rare = [index.terms[t] for t in by_frequency[len(by_frequency) // 2:]]
+    return {
+        "common word": [rng.choice(common) for _ in range(count)],
+        "rare word": [rng.choice(rare) for _ in range(count)],
+        "two words": [f"{rng.choice(common)} {rng.choice(rare)}" for _ in range(count)],
+        "two common words": [f"{rng.choice(common)} {rng.choice(common)}" for _ in range(count)],
+        "prefix": [rng.choice(common)[:3] for _ in range(count)],
+        "word + prefix": [f"{rng.choice(common)} {rng.choice(rare)[:3]}" for _ in range(count)],
+    }
+
+
+def p95(times: List[float]) -> float:
+    return round(sorted(times)[max(0, int(len(times) * 0.95) - 1)], 3)
+
+
+def timed(index: SearchIndex, queries: Sequence[str], limit: int) -> Tuple[List[float], List[int]]:
+    """Latency and hit count of each query, run fresh"""
+    times, hits = [], []
+    for query in queries:
+        index.expansions.clear()
+        start = time.perf_counter()
+        found = index.search(query, limit)
+        times.append((time.perf_counter() - start) * 1000)
+        hits.append(len(found))
+    return times, hits
+
+
+def measure(index: SearchIndex, kind: str, queries: Sequence[str], limit: int = 20) -> LatencyResult:
+    """Latency of fresh queries of one kind"""
+    times, hits = timed(index, queries, limit)
+    return LatencyResult(kind=kind, queries=len(queries), p50_ms=round(statistics.median(times), 3),
+                         p95_ms=p95(times), max_ms=round(max(times), 3), hits=round(statistics.mean(hits), 1))
+
+
+def print_table(results: List[LatencyResult]):
+    print(f"{'query':<20}{'p50 ms':>9}{'p95 ms':>9}{'max ms':>9}{'hits':>7}")
+    for r in results:
+        print(f"{r.kind:<20}{r.p50_ms:>9.3f}{r.p95_ms:>9.3f}{r.max_ms:>9.3f}{r.hits:>7.1f}")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure search index query latency")
+    parser.add_argument("--records", type=int, default=50000, help="Size of the synthetic corpus")
+    parser.add_argument("--index", type=Path, help="Benchmark a built index instead")
+    parser.add_argument("--query", action="append", default=[], help="Time this query too (repeatable)")
+    parser.add_argument("--queries", type=int, default=100, help="Queries of each kind")
+    parser.add_argument("--budget-ms", type=float, default=1.0, help="Allowed p95 per query kind")
+    parser.add_argument("--output", type=Path, help="Write the report as JSON")
+    args = parser.parse_args(argv)
+
+    if args.index:
+        start = time.perf_counter()
+        index = SearchIndex.load(args.index)
+        source = str(args.index)
+    else:
+        corpus = synthetic_corpus(args.records)
+        start = time.perf_counter()
+        data = encode(build_index(corpus))
+        print(f"built index over {args.records} records in {time.perf_counter() - start:.1f} s "
+              f"({len(data) / 2 ** 20:.1f} MiB)")
+        start = time.perf_counter()
+        index = SearchIndex(json.loads(data))
+        source = f"synthetic {args.records}"
+    print(f"loaded {len(index.docs)} documents, {len(index.terms)} terms "
+          f"in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    mix = query_mix(index, args.queries)
+    if args.query:
+        mix["given"] = args.query
+    results = [measure(index, kind, queries) for kind, queries in mix.items()]
+    print_table(results)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"python": sys.version.split()[0], "index": source, "documents": len(index.docs),
+                       "results": [asdict(r) for r in results]}, f, indent=2)
+
+    slow = [r for r in results if r.p95_ms > args.budget_ms]
+    for r in slow:
+        print(f"SLOW {r.kind}: p95 {r.p95_ms} ms > {args.budget_ms} ms", file=sys.stderr)
+    return 1 if slow else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
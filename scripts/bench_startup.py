@@ -0,0 +1,154 @@
+"""Cold-start benchmark for the command line entry points.
+
+Runs each entry point with ``python -X importtime <script> --help`` and
+reports the wall time and the cumulative import time, together with the
+heaviest top-level imports. Compare against a saved report with --baseline
+to catch modules that start importing heavy dependencies again:
+
+    python scripts/bench_startup.py --output startup.json
+    python scripts/bench_startup.py --baseline startup.json --tolerance 1.5
+"""
+import argparse
+import json
+import re
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# name -> argv (relative to the repository root) that should return quickly
+ENTRY_POINTS = {
+    "adapt_cv": ["scripts/adapt_cv.py", "--help"],
+    "adapt_cv.adapt": ["scripts/adapt_cv.py", "adapt", "--help"],
+    "research_classifier": ["scripts/research_classifier.py", "--help"],
+    "eval_classifier": ["scripts/eval_classifier.py", "--help"],
+    "cv_updater": ["scripts/cv_updater.py", "--help"],
+    "cv_importer": ["scripts/cv_importer.py", "--help"],
+    "add_research": ["scripts/add_research.py", "--help"],
+    "llm_stub": ["scripts/llm_stub.py", "--help"],
+    "pipeline": ["scripts/pipeline.py", "--help"],
+    "search_index": ["scripts/search_index.py", "--help"],
+    "cv_to_json": ["src/scripts/cv_to_json.py", "--help"],
+    "find_dois": ["src/scripts/find_dois.py", "--help"],
+    "find_cv_dois": ["src/scripts/find_cv_dois.py", "--help"],
+}
+
+# "import time:       123 |       4567 |   package.module"
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s+)(\S+)")
+
+
+@dataclass
+class StartupResult:
+    """Startup cost of one entry point, medians over all runs"""
+    name: str
+    argv: List[str]
+    wall_ms: float
+    import_ms: float
+    returncode: int
+    top_imports: List[Dict] = field(default_factory=list)
+
+
+def parse_importtime(stderr: str) -> Dict[str, int]:
+    """Cumulative microseconds per top-level import from -X importtime output"""
+    totals = {}
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        _, cumulative, indent, module = match.groups()
+        # Nested imports are indented by two spaces per level below the first
+        if len(indent) == 1:
+            totals[module] = totals.get(module, 0) + int(cumulative)
+    return totals
+
+
+def measure(name: str, argv: Sequence[str], runs: int = 3, top: int = 5) -> StartupResult:
+    """Run an entry point several times and keep the median timings"""
+    walls, imports = [], []
+    modules: Dict[str, List[int]] = {}
+    returncode = 0
+    for _ in range(runs):
+        start = time.perf_counter()
+        proc = subprocess.run([sys.executable, "-X", "importtime", *argv], cwd=ROOT,
+                              capture_output=True, text=True)
+        walls.append((time.perf_counter() - start) * 1000)
+        returncode = returncode or proc.returncode
+        totals = parse_importtime(proc.stderr)
+        imports.append(sum(totals.values()) / 1000)
+        for module, us in totals.items():
+            modules.setdefault(module, []).append(us)
+
+    heaviest = sorted(((statistics.median(v) / 1000, m) for m, v in modules.items()), reverse=True)
+    return StartupResult(
+        name=name,
+        argv=list(argv),
+        wall_ms=round(statistics.median(walls), 1),
+        import_ms=round(statistics.median(imports), 1),
+        returncode=returncode,
+        top_imports=[{"module": m, "ms": round(ms, 1)} for ms, m in heaviest[:top]],
+    )
+
+
+def regressions(results: List[StartupResult], baseline: Dict, tolerance: float,
+                slack_ms: float = 20.0) -> List[str]:
+    """Entry points whose import time grew beyond tolerance x baseline + slack"""
+    previous = {row["name"]: row for row in baseline.get("results", [])}
+    problems = []
+    for result in results:
+        before = previous.get(result.name)
+        if before is None:
+            continue
+        limit = before["import_ms"] * tolerance + slack_ms
+        if result.import_ms > limit:
+            problems.append(f"{result.name}: {result.import_ms} ms imports "
+                            f"(baseline {before['import_ms']} ms, limit {limit:.1f} ms)")
+    return problems
+
+
+def print_table(results: List[StartupResult]):
+    print(f"{'entry point':<22}{'wall ms':>10}{'import ms':>11}  heaviest imports")
+    for r in results:
+        heaviest = ", ".join(f"{t['module']} {t['ms']:.0f}" for t in r.top_imports[:3])
+        status = "" if r.returncode == 0 else f"  (exit {r.returncode})"
+        print(f"{r.name:<22}{r.wall_ms:>10.1f}{r.import_ms:>11.1f}  {heaviest}{status}")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure cold-start time of the CLI entry points")
+    parser.add_argument("--only", help=f"Comma-separated entry points ({', '.join(ENTRY_POINTS)})")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per entry point (median is kept)")
+    parser.add_argument("--output", type=Path, help="Write the report as JSON")
+    parser.add_argument("--baseline", type=Path, help="Earlier report to compare against")
+    parser.add_argument("--tolerance", type=float, default=1.5,
+                        help="Allowed import-time growth factor over the baseline")
+    args = parser.parse_args(argv)
+
+    names = [n.strip() for n in args.only.split(",")] if args.only else list(ENTRY_POINTS)
+    unknown = set(names) - set(ENTRY_POINTS)
+    if unknown:
+        parser.error(f"Unknown entry points: {', '.join(sorted(unknown))}")
+
+    results = [measure(name, ENTRY_POINTS[name], args.runs) for name in names]
+    print_table(results)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"python": sys.version.split()[0], "runs": args.runs,
+                       "results": [asdict(r) for r in results]}, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            problems = regressions(results, json.load(f), args.tolerance)
+        for problem in problems:
+            print(f"REGRESSION {problem}", file=sys.stderr)
+        if problems:
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
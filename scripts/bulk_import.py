@@ -0,0 +1,92 @@
+import csv
+import heapq
+import json
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple
+
+# CSV cells for these fields hold several values separated by semicolons
+LIST_FIELDS = {"authors", "pi", "co_pi", "collaborators", "tags", "areas", "related_publications"}
+INT_FIELDS = {"year", "year_start", "year_end", "citation_count"}
+
+
+@dataclass
+class RowError:
+    """Validation problems for one input row"""
+    row: int
+    title: str
+    errors: List[str]
+
+
+@dataclass
+class ImportReport:
+    """Outcome of a bulk import"""
+    added: int = 0
+    errors: List[RowError] = field(default_factory=list)
+
+    def save(self, path: Path):
+        with open(path, "w") as f:
+            json.dump({"added": self.added, "errors": [asdict(e) for e in self.errors]}, f, indent=2)
+
+
+def _coerce(key: str, value):
+    if not isinstance(value, str):
+        return value
+    value = value.strip()
+    if key in LIST_FIELDS:
+        return [v.strip() for v in value.split(";") if v.strip()]
+    if key in INT_FIELDS and value.isdigit():
+        return int(value)
+    return value
+
+
+def read_rows(path: Path) -> Iterator[Tuple[int, Dict]]:
+    """Stream (row number, item) pairs from a CSV or JSONL file.
+
+    Row numbers are 1-based data rows. Empty CSV cells are dropped so they
+    count as missing fields.
+    """
+    path = Path(path)
+    with open(path, newline="") as f:
+        if path.suffix.lower() == ".csv":
+            for number, row in enumerate(csv.DictReader(f), start=1):
+                yield number, {k.strip(): _coerce(k.strip(), v) for k, v in row.items()
+                               if k and v is not None and v.strip()}
+        else:
+            number = 0
+            for line in f:
+                if not line.strip():
+                    continue
+                number += 1
+                try:
+                    item = json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield number, {"__error__": f"invalid JSON: {e}"}
+                    continue
+                yield number, item if isinstance(item, dict) else {"__error__": "not a JSON object"}
+
+
+def missing_fields(item: Dict, required: Sequence[str]) -> List[str]:
+    """Required fields that are absent or empty"""
+    return [name for name in required if item.get(name) in (None, "", [])]
+
+
+def sort_key(item: Dict) -> str:
+    """Date-like value items are ordered by (date, year or year_start)"""
+    for name in ("date", "year", "year_start"):
+        if item.get(name) not in (None, ""):
+            return str(item[name])
+    return ""
+
+
+def merge_sorted(existing: List[Dict], new: List[Dict],
+                 key: Callable[[Dict], str] = sort_key) -> List[Dict]:
+    """Merge new items into a newest-first list without re-sorting it.
+
+    New items are sorted among themselves and merged in one pass. A list that
+    is not already newest first is sorted once, as the single-item commands did.
+    """
+    keys = [key(item) for item in existing]
+    if any(a < b for a, b in zip(keys, keys[1:])):
+        return sorted(existing + new, key=key, reverse=True)
+    return list(heapq.merge(existing, sorted(new, key=key, reverse=True), key=key, reverse=True))
@@ -1,12 +1,51 @@
 import os
-import together
-from dotenv import load_dotenv
+
+# together and dotenv are imported on first use to keep CLI startup fast
 
 def setup_llm_creds():
     """Setup Together AI credentials from environment variables"""
+    from dotenv import load_dotenv
     load_dotenv()
+    if os.getenv("LLM_BASE_URL"):
+        return
+    import together
     together.api_key = os.getenv("TOGETHER_API_KEY")
 
-def get_llm():
-    """Get Together AI client"""
-    return together 
\ No newline at end of file
+def _client():
+    base_url = os.getenv("LLM_BASE_URL")
+    if base_url:
+        from llm_stub import LocalLLMClient
+        return LocalLLMClient(base_url)
+    import together
+    return together
+
+def _connect():
+    setup_llm_creds()
+    return _client()
+
+def get_llm(trace_path: str = None, run_name: str = None, lazy: bool = False):
+    """Get Together AI client, or a local stand-in when LLM_BASE_URL is set.
+
+    Calls are always counted for the end-of-run summary; they are also
+    written to a JSONL trace when trace_path (or LLM_TRACE) is given.
+    A lazy client sets up credentials and connects on its first call.
+    """
+    from llm_trace import TracedLLM
+    trace_path = trace_path or os.getenv("LLM_TRACE")
+    if lazy:
+        return TracedLLM(None, trace_path, run_name, connect=_connect)
+    return TracedLLM(_client(), trace_path, run_name)
+
+def completion_text(response) -> str:
+    """Extract the generated text from a completion response"""
+    try:
+        return response['output']['choices'][0]['text']
+    except (KeyError, IndexError, TypeError):
+        return ""
+
+def stream_completion(llm, **params):
+    """Yield completion text chunks, falling back to a single chunk"""
+    if hasattr(llm.Complete, "create_streaming"):
+        yield from llm.Complete.create_streaming(**params)
+    else:
+        yield completion_text(llm.Complete.create(**params))
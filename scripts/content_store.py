@@ -0,0 +1,495 @@
+"""SQLite store for the research and CV data files.
+
+The JSON files under src/data stay the format the Next.js site reads, but once
+the store exists the editing tools work against it instead of rewriting whole
+files. Each file is a collection:
+
+    list    a JSON list of items (cv/grants.json)
+    groups  an object of named item lists (research/publications.json)
+    areas   research/areas.json, area objects holding item lists
+
+Items are rows indexed by collection, area, type, year and status, with their
+lower-cased text kept for search, so point edits and filtered queries touch
+only the rows involved. Changed collections
+are marked dirty and written back to JSON by export.
+
+    python scripts/content_store.py init      # import the JSON files once
+                                              # (run cv_updater.py compact first)
+    python scripts/content_store.py export    # write changed collections
+"""
+import argparse
+import json
+import logging
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from row_edits import RowEdits, search_text
+from safe_io import VersionConflict, atomic_write_json, file_lock
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DATA_ROOT = Path("src/data")
+DB_PATH = DATA_ROOT / "content.db"
+SOURCE_DIRS = ("research", "cv")
+AREAS_COLLECTION = "research/areas.json"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS collections (
+    name TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    sort TEXT NOT NULL DEFAULT 'position',
+    groups TEXT NOT NULL DEFAULT '[]',
+    dirty INTEGER NOT NULL DEFAULT 0,
+    version INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS areas (
+    name TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS items (
+    id INTEGER PRIMARY KEY,
+    collection TEXT NOT NULL REFERENCES collections(name),
+    grp TEXT NOT NULL DEFAULT '',
+    area TEXT,
+    position INTEGER NOT NULL,
+    item_type TEXT,
+    year INTEGER,
+    status TEXT,
+    sort_key TEXT NOT NULL DEFAULT '',
+    title TEXT,
+    search TEXT NOT NULL DEFAULT '',
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS item_areas (
+    item_id INTEGER NOT NULL REFERENCES items(id) ON DELETE CASCADE,
+    area TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS items_by_group ON items(collection, area, grp, position);
+CREATE INDEX IF NOT EXISTS items_by_date ON items(collection, grp, sort_key);
+CREATE INDEX IF NOT EXISTS items_by_type ON items(item_type);
+CREATE INDEX IF NOT EXISTS items_by_year ON items(year);
+CREATE INDEX IF NOT EXISTS items_by_status ON items(status);
+CREATE INDEX IF NOT EXISTS item_areas_by_area ON item_areas(area, item_id);
+CREATE INDEX IF NOT EXISTS item_areas_by_item ON item_areas(item_id);
+"""
+
+
+def sort_key(item: Dict) -> str:
+    """Date-like value items are ordered by (date, year or year_start)"""
+    for name in ("date", "year", "year_start"):
+        if item.get(name) not in (None, ""):
+            return str(item[name])
+    return ""
+
+
+def _year(item: Dict) -> Optional[int]:
+    key = sort_key(item)[:4]
+    return int(key) if key.isdigit() else None
+
+
+def _singular(name: str) -> str:
+    return name[:-1] if name.endswith("s") else name
+
+
+def _is_item_list(value) -> bool:
+    return isinstance(value, list) and all(isinstance(v, dict) for v in value)
+
+
+def _newest_first(items: List[Dict]) -> bool:
+    keys = [sort_key(item) for item in items]
+    return all(a >= b for a, b in zip(keys, keys[1:]))
+
+
+class ContentStore:
+    """Data access for the research and CV collections"""
+
+    def __init__(self, db_path: Path = DB_PATH, data_root: Path = DATA_ROOT):
+        self.db_path = Path(db_path)
+        self.data_root = Path(data_root)
+        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.executescript(SCHEMA)
+        self._upgrade()
+
+    def _upgrade(self):
+        """Add columns introduced after a store was created"""
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(collections)")}
+        if "version" not in columns:
+            with self.conn:
+                self.conn.execute("ALTER TABLE collections ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(items)")}
+        if "search" not in columns:
+            with self.conn:
+                self.conn.execute("ALTER TABLE items ADD COLUMN search TEXT NOT NULL DEFAULT ''")
+                rows = self.conn.execute("SELECT id, data FROM items").fetchall()
+                self.conn.executemany("UPDATE items SET search = ? WHERE id = ?",
+                                      [(search_text(json.loads(data)), item_id) for item_id, data in rows])
+
+    def close(self):
+        self.conn.close()
+
+    # Collections
+
+    def collections(self) -> List[str]:
+        return [row[0] for row in self.conn.execute("SELECT name FROM collections ORDER BY name")]
+
+    def has_collection(self, name: str) -> bool:
+        return self.conn.execute("SELECT 1 FROM collections WHERE name = ?", (name,)).fetchone() is not None
+
+    def _collection(self, name: str) -> Tuple[str, str, List[str]]:
+        row = self.conn.execute("SELECT kind, sort, groups FROM collections WHERE name = ?",
+                                (name,)).fetchone()
+        if row is None:
+            raise KeyError(f"Unknown collection: {name}")
+        return row[0], row[1], json.loads(row[2])
+
+    def ensure_collection(self, name: str, kind: str = "list", sort: str = "date"):
+        """Create an empty collection unless it exists"""
+        with self.conn:
+            self.conn.execute("INSERT OR IGNORE INTO collections (name, kind, sort) VALUES (?, ?, ?)",
+                              (name, kind, sort))
+
+    def _mark_dirty(self, name: str):
+        self.conn.execute("UPDATE collections SET dirty = 1, version = version + 1 WHERE name = ?", (name,))
+
+    def version(self, name: str) -> int:
+        """Counter bumped by every change to a collection, for readers caching it"""
+        row = self.conn.execute("SELECT version FROM collections WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else 0
+
+    # Import and export
+
+    def import_file(self, name: str) -> bool:
+        """Load one JSON file into the store, replacing what was there"""
+        path = self.data_root / name
+        with open(path) as f:
+            data = json.load(f)
+
+        if name == AREAS_COLLECTION and isinstance(data, dict):
+            kind = "areas"
+        elif _is_item_list(data):
+            kind = "list"
+        elif isinstance(data, dict) and all(_is_item_list(v) for v in data.values()):
+            kind = "groups"
+        else:
+            return False
+
+        with self.conn:
+            self._drop(name)
+            if kind == "areas":
+                self.conn.execute("INSERT INTO collections (name, kind) VALUES (?, 'areas')", (name,))
+                for position, (area, meta) in enumerate(data.items()):
+                    self._insert_area(area, meta, position)
+            elif kind == "list":
+                sort = "date" if _newest_first(data) else "position"
+                self.conn.execute("INSERT INTO collections (name, kind, sort) VALUES (?, 'list', ?)",
+                                  (name, sort))
+                self._insert_items(name, data)
+            else:
+                sort = "date" if all(_newest_first(v) for v in data.values()) else "position"
+                self.conn.execute("INSERT INTO collections (name, kind, sort, groups) VALUES (?, 'groups', ?, ?)",
+                                  (name, sort, json.dumps(list(data))))
+                for group, items in data.items():
+                    self._insert_items(name, items, group)
+        return True
+
+    def import_all(self) -> List[str]:
+        """Import every JSON file with a recognised shape from the source directories"""
+        imported = []
+        for directory in SOURCE_DIRS:
+            for path in sorted((self.data_root / directory).glob("*.json")):
+                name = f"{directory}/{path.name}"
+                if self.import_file(name):
+                    imported.append(name)
+                else:
+                    logger.info(f"Skipping {name}: not a list of items")
+        return imported
+
+    def _drop(self, name: str):
+        self.conn.execute("DELETE FROM items WHERE collection = ?", (name,))
+        self.conn.execute("DELETE FROM collections WHERE name = ?", (name,))
+        if name == AREAS_COLLECTION:
+            self.conn.execute("DELETE FROM areas")
+
+    def export(self, name: str) -> Path:
+        """Write a collection back to its JSON file"""
+        path = self.data_root / name
+        with file_lock(path):
+            atomic_write_json(path, self.load(name))
+        with self.conn:
+            self.conn.execute("UPDATE collections SET dirty = 0 WHERE name = ?", (name,))
+        return path
+
+    def export_dirty(self, names: Optional[Iterable[str]] = None) -> List[str]:
+        """Write every collection (of names, if given) changed since its last export"""
+        dirty = [row[0] for row in self.conn.execute("SELECT name FROM collections WHERE dirty = 1")]
+        names = dirty if names is None else [name for name in dirty if name in set(names)]
+        for name in names:
+            self.export(name)
+        return names
+
+    # Reads
+
+    def _group_items(self, name: str, sort: str, group: str, area: Optional[str] = None) -> List[Dict]:
+        order = "sort_key DESC, position" if sort == "date" else "position"
+        rows = self.conn.execute(
+            f"SELECT data FROM items WHERE collection = ? AND grp = ? AND area IS ? ORDER BY {order}",
+            (name, group, area))
+        return [json.loads(row[0]) for row in rows]
+
+    def load(self, name: str) -> Union[Dict, List]:
+        """A collection in the same shape as its JSON file"""
+        kind, sort, groups = self._collection(name)
+        if kind == "list":
+            return self._group_items(name, sort, "")
+        if kind == "groups":
+            return {group: self._group_items(name, sort, group) for group in groups}
+
+        data = {}
+        for area, meta in self.conn.execute("SELECT name, data FROM areas ORDER BY position"):
+            meta = json.loads(meta)
+            item_groups = [row[0] for row in self.conn.execute(
+                "SELECT DISTINCT grp FROM items WHERE collection = ? AND area = ?", (name, area))]
+            for group in item_groups:
+                meta.setdefault(group, [])
+            for key, value in meta.items():
+                if key in item_groups or value == []:
+                    meta[key] = self._group_items(name, sort, key, area)
+            data[area] = meta
+        return data
+
+    def areas(self) -> Dict[str, Dict]:
+        """Area metadata (without item lists) in file order"""
+        return {name: json.loads(data) for name, data in
+                self.conn.execute("SELECT name, data FROM areas ORDER BY position")}
+
+    def _where(self, collection: str = None, group: str = None, area: str = None, owner: str = None,
+               item_type: str = None, year: int = None, status: str = None,
+               search: str = None) -> Tuple[str, List]:
+        clauses, params = [], []
+        for column, value in (("collection", collection), ("grp", group), ("area", owner),
+                              ("item_type", item_type), ("year", year), ("status", status)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if area is not None:
+            clauses.append("id IN (SELECT item_id FROM item_areas WHERE area = ?)")
+            params.append(area)
+        if search and search.strip():
+            clauses.append("instr(search, ?) > 0")
+            params.append(search.strip().lower())
+        return (f"WHERE {' AND '.join(clauses)}" if clauses else ""), params
+
+    def query(self, limit: int = None, offset: int = 0, **filters) -> List[Tuple[int, Dict]]:
+        """(id, item) pairs matching every given filter, in collection order.
+
+        Filters are collection, group, area (any area the item is listed
+        under), owner (the area whose list holds it), item_type, year, status
+        and search (a substring of the item's text).
+        """
+        where, params = self._where(**filters)
+        page = ""
+        if limit is not None:
+            page = " LIMIT ? OFFSET ?"
+            params += [limit, offset]
+        rows = self.conn.execute(
+            f"SELECT id, data FROM items {where} ORDER BY collection, area, grp, position{page}", params)
+        return [(row[0], json.loads(row[1])) for row in rows]
+
+    def count(self, **filters) -> int:
+        """Number of items query would return for the same filters"""
+        where, params = self._where(**filters)
+        return self.conn.execute(f"SELECT COUNT(*) FROM items {where}", params).fetchone()[0]
+
+    def distinct(self, column: str, **filters) -> List:
+        """Sorted values of the year or status column among matching items"""
+        if column not in ("year", "status"):
+            raise ValueError(f"Not a filter column: {column}")
+        where, params = self._where(**filters)
+        condition = f"{where} AND {column} IS NOT NULL" if where else f"WHERE {column} IS NOT NULL"
+        return [row[0] for row in self.conn.execute(
+            f"SELECT DISTINCT {column} FROM items {condition} ORDER BY {column}", params)]
+
+    def get_item(self, item_id: int) -> Optional[Dict]:
+        row = self.conn.execute("SELECT data FROM items WHERE id = ?", (item_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    # Writes
+
+    def _insert_area(self, area: str, meta: Dict, position: int):
+        fields = {}
+        for key, value in meta.items():
+            if _is_item_list(value) and value:
+                fields[key] = []
+                self._insert_items(AREAS_COLLECTION, value, key, area, meta.get("id"))
+            else:
+                fields[key] = value
+        self.conn.execute("INSERT OR REPLACE INTO areas (name, position, data) VALUES (?, ?, ?)",
+                          (area, position, json.dumps(fields)))
+
+    def _insert_items(self, name: str, items: Iterable[Dict], group: str = "",
+                      area: Optional[str] = None, area_id: Optional[str] = None) -> List[int]:
+        start = self.conn.execute(
+            "SELECT COALESCE(MAX(position) + 1, 0) FROM items WHERE collection = ? AND grp = ? AND area IS ?",
+            (name, group, area)).fetchone()[0]
+        item_type = _singular(group) if name == AREAS_COLLECTION else _singular(Path(name).stem)
+        ids = []
+        for offset, item in enumerate(items):
+            cursor = self.conn.execute(
+                "INSERT INTO items (collection, grp, area, position, item_type, year, status, sort_key, title, "
+                "search, data) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (name, group, area, start + offset, item_type, _year(item), item.get("status"),
+                 sort_key(item), item.get("title"), search_text(item), json.dumps(item)))
+            ids.append(cursor.lastrowid)
+            self._index_areas(cursor.lastrowid, item, area, area_id)
+        return ids
+
+    def _index_areas(self, item_id: int, item: Dict, area: Optional[str], area_id: Optional[str]):
+        labels = {label for label in (area, area_id) if label}
+        labels.update(a for a in item.get("areas", []) if isinstance(a, str))
+        self.conn.executemany("INSERT INTO item_areas (item_id, area) VALUES (?, ?)",
+                              [(item_id, label) for label in sorted(labels)])
+
+    def _add_items(self, name: str, items: List[Dict], group: str, area: Optional[str]) -> List[int]:
+        kind, _, groups = self._collection(name)
+        area_id = None
+        if kind == "groups" and group not in groups:
+            self.conn.execute("UPDATE collections SET groups = ? WHERE name = ?",
+                              (json.dumps(groups + [group]), name))
+        if kind == "areas":
+            row = self.conn.execute("SELECT data FROM areas WHERE name = ?", (area,)).fetchone()
+            if row is None:
+                raise KeyError(f"Unknown research area: {area}")
+            area_id = json.loads(row[0]).get("id")
+        ids = self._insert_items(name, items, group, area, area_id)
+        self._mark_dirty(name)
+        return ids
+
+    def add_items(self, name: str, items: List[Dict], group: str = "", area: str = None) -> List[int]:
+        """Add items to one list of a collection in a single transaction"""
+        with self.conn:
+            return self._add_items(name, items, group, area)
+
+    def add_item(self, name: str, item: Dict, group: str = "", area: str = None) -> int:
+        return self.add_items(name, [item], group, area)[0]
+
+    def _update_item(self, item_id: int, item: Dict):
+        row = self.conn.execute("SELECT collection, area FROM items WHERE id = ?", (item_id,)).fetchone()
+        if row is None:
+            raise KeyError(f"Unknown item: {item_id}")
+        collection, area = row
+        self.conn.execute(
+            "UPDATE items SET year = ?, status = ?, sort_key = ?, title = ?, search = ?, data = ? WHERE id = ?",
+            (_year(item), item.get("status"), sort_key(item), item.get("title"), search_text(item),
+             json.dumps(item), item_id))
+        self.conn.execute("DELETE FROM item_areas WHERE item_id = ?", (item_id,))
+        area_id = None
+        if area is not None:
+            meta = self.conn.execute("SELECT data FROM areas WHERE name = ?", (area,)).fetchone()
+            area_id = json.loads(meta[0]).get("id") if meta else None
+        self._index_areas(item_id, item, area, area_id)
+        self._mark_dirty(collection)
+
+    def update_item(self, item_id: int, item: Dict):
+        """Replace one item's data in place"""
+        with self.conn:
+            self._update_item(item_id, item)
+
+    def _delete_item(self, item_id: int):
+        row = self.conn.execute("SELECT collection FROM items WHERE id = ?", (item_id,)).fetchone()
+        if row is None:
+            return
+        self.conn.execute("DELETE FROM items WHERE id = ?", (item_id,))
+        self._mark_dirty(row[0])
+
+    def delete_item(self, item_id: int):
+        with self.conn:
+            self._delete_item(item_id)
+
+    def edit_rows(self, name: str, rows: List[Tuple[int, Dict]], edits: RowEdits, group: str = "",
+                  area: str = None):
+        """Apply row-level edits to rows, the (id, item) pairs query returned.
+
+        Positions in edits index rows. Only the edited, deleted and added rows
+        are written, in a single transaction; VersionConflict is raised if an
+        edited or deleted row was changed or removed since it was read.
+        """
+        with self.conn:
+            for position in [*edits.updated, *edits.deleted]:
+                item_id, expected = rows[position]
+                if self.get_item(item_id) != expected:
+                    raise VersionConflict(self.data_root / name,
+                                          f"{expected.get('title', 'An item')!r} was changed by someone else")
+            for position, item in edits.updated.items():
+                self._update_item(rows[position][0], item)
+            for position in edits.deleted:
+                self._delete_item(rows[position][0])
+            if edits.added:
+                self._add_items(name, edits.added, group, area)
+
+    def set_area(self, area: str, fields: Dict):
+        """Create or update a research area's own fields; its item lists are kept"""
+        with self.conn:
+            row = self.conn.execute("SELECT position, data FROM areas WHERE name = ?", (area,)).fetchone()
+            if row is None:
+                position = self.conn.execute("SELECT COALESCE(MAX(position) + 1, 0) FROM areas").fetchone()[0]
+                data = {}
+            else:
+                position, data = row[0], json.loads(row[1])
+            data.update({k: ([] if _is_item_list(v) else v) for k, v in fields.items()})
+            self.conn.execute("INSERT OR REPLACE INTO areas (name, position, data) VALUES (?, ?, ?)",
+                              (area, position, json.dumps(data)))
+            self.conn.execute("INSERT OR IGNORE INTO collections (name, kind) VALUES (?, 'areas')",
+                              (AREAS_COLLECTION,))
+            self._mark_dirty(AREAS_COLLECTION)
+
+    def delete_area(self, area: str):
+        with self.conn:
+            self.conn.execute("DELETE FROM items WHERE collection = ? AND area = ?", (AREAS_COLLECTION, area))
+            self.conn.execute("DELETE FROM areas WHERE name = ?", (area,))
+            self._mark_dirty(AREAS_COLLECTION)
+
+
+@contextmanager
+def open_store(db_path: Path = DB_PATH, data_root: Path = DATA_ROOT) -> Iterator[Optional[ContentStore]]:
+    """The content store if it has been initialised, otherwise None (use the JSON files)"""
+    if not Path(db_path).exists():
+        yield None
+        return
+    store = ContentStore(db_path, data_root)
+    try:
+        yield store
+    finally:
+        store.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite store for the research and CV data files")
+    parser.add_argument("command", choices=["init", "export", "status"])
+    parser.add_argument("--db", type=Path, default=DB_PATH)
+    parser.add_argument("--data-root", type=Path, default=DATA_ROOT)
+    args = parser.parse_args()
+
+    store = ContentStore(args.db, args.data_root)
+    try:
+        if args.command == "init":
+            imported = store.import_all()
+            logger.info(f"Imported {len(imported)} collections into {args.db}")
+        elif args.command == "export":
+            exported = store.export_dirty()
+            logger.info(f"Exported {len(exported)} changed collections")
+        else:
+            for name, kind, dirty, count in store.conn.execute(
+                    "SELECT c.name, c.kind, c.dirty, COUNT(i.id) FROM collections c "
+                    "LEFT JOIN items i ON i.collection = c.name GROUP BY c.name ORDER BY c.name"):
+                print(f"{name:<45} {kind:<7} {count:>5} items{'  (changed)' if dirty else ''}")
+    finally:
+        store.close()
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,7 @@ import re
 import json
 import click
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional
 from dataclasses import dataclass
 from datetime import datetime
 
@@ -29,19 +29,29 @@ class CVImporter:
         self.output_dir = Path("src/data/cv")
         self.output_dir.mkdir(parents=True, exist_ok=True)
 
-    def import_cv(self) -> Dict:
-        """Import and parse CV content"""
+    def import_cv(self, on_progress: Optional[Callable[[str, float], None]] = None) -> Dict:
+        """Import and parse CV content
+
+        on_progress, if given, is called with each section name and the
+        fraction of sections already parsed.
+        """
         if not self.input_file.exists():
             raise FileNotFoundError(f"CV file not found: {self.input_file}")
             
         with open(self.input_file) as f:
             content = f.read()
             
-        return {
-            "contact": self.parse_contact(content),
-            "education": self.parse_education(content),
-            "publications_and_presentations": self.parse_publications_and_presentations(content)
-        }
+        parsers = [
+            ("contact", self.parse_contact),
+            ("education", self.parse_education),
+            ("publications_and_presentations", self.parse_publications_and_presentations)
+        ]
+        data = {}
+        for done, (section, parse) in enumerate(parsers):
+            if on_progress:
+                on_progress(section, done / len(parsers))
+            data[section] = parse(content)
+        return data
 
     def parse_contact(self, content: str) -> Dict:
         """Parse contact information section"""
@@ -0,0 +1,126 @@
+import json
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+from token_budget import count_tokens
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is",
+    "it", "of", "on", "or", "that", "the", "this", "to", "with", "cv", "my"
+}
+
+# Keys that mark a dict as a CV item rather than a container
+ITEM_KEYS = ("title", "name")
+
+
+@dataclass
+class CVItem:
+    """A single CV entry and where it lives in the loaded data"""
+    section: str
+    data: Dict
+    text: str
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens without stopwords"""
+    return [t for t in re.findall(r"[a-z0-9]+", text.lower()) if t not in STOPWORDS]
+
+
+def _item_text(data: Dict) -> str:
+    parts = []
+    for value in data.values():
+        if isinstance(value, str):
+            parts.append(value)
+        elif isinstance(value, list):
+            parts.extend(v for v in value if isinstance(v, str))
+        elif isinstance(value, (int, float)):
+            parts.append(str(value))
+    return " ".join(parts)
+
+
+def flatten_cv_items(cv_data: Dict) -> List[CVItem]:
+    """Collect every item (dict with a title or name) from nested CV data"""
+    items = []
+
+    def walk(value, path: List[str]):
+        if isinstance(value, dict):
+            if any(key in value for key in ITEM_KEYS) and path:
+                items.append(CVItem(section="/".join(path[:-1]) if path[-1].isdigit() else "/".join(path),
+                                    data=value, text=_item_text(value)))
+                return
+            for key, child in value.items():
+                walk(child, path + [str(key)])
+        elif isinstance(value, list):
+            for i, child in enumerate(value):
+                walk(child, path + [str(i)])
+
+    walk(cv_data, [])
+    return items
+
+
+class BM25Index:
+    """Okapi BM25 over CV items"""
+
+    def __init__(self, items: List[CVItem], k1: float = 1.5, b: float = 0.75):
+        self.items = items
+        self.k1 = k1
+        self.b = b
+        self.doc_terms = [Counter(tokenize(item.text + " " + item.section)) for item in items]
+        self.doc_lengths = [sum(terms.values()) for terms in self.doc_terms]
+        self.avg_length = sum(self.doc_lengths) / len(items) if items else 0.0
+        doc_freq = Counter()
+        for terms in self.doc_terms:
+            doc_freq.update(terms.keys())
+        n = len(items)
+        self.idf = {term: math.log(1 + (n - df + 0.5) / (df + 0.5)) for term, df in doc_freq.items()}
+
+    def search(self, query: str) -> List[Tuple[float, int]]:
+        """Return (score, item index) pairs sorted by descending score"""
+        terms = [t for t in set(tokenize(query)) if t in self.idf]
+        scores = []
+        for i, doc in enumerate(self.doc_terms):
+            score = 0.0
+            norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[i] / (self.avg_length or 1))
+            for term in terms:
+                tf = doc.get(term)
+                if tf:
+                    score += self.idf[term] * tf * (self.k1 + 1) / (tf + norm)
+            scores.append((score, i))
+        scores.sort(key=lambda pair: (-pair[0], pair[1]))
+        return scores
+
+
+def select_context(cv_data: Dict, query: str, budget_tokens: int = 3000, top_k: int = 40) -> Dict:
+    """Pick the CV items most relevant to query within a token budget.
+
+    Matching items are added in relevance order until top_k items or the
+    budget is reached; everything else is summarized as per-section counts.
+    """
+    items = flatten_cv_items(cv_data)
+    index = BM25Index(items)
+
+    selected, used = [], 0
+    chosen = set()
+    for score, i in index.search(query):
+        if len(selected) >= top_k or score <= 0:
+            break
+        entry = dict(items[i].data, section=items[i].section)
+        cost = count_tokens(json.dumps(entry, separators=(",", ":")))
+        if used + cost > budget_tokens:
+            continue
+        selected.append(entry)
+        chosen.add(i)
+        used += cost
+
+    omitted = Counter(items[i].section for i in range(len(items)) if i not in chosen)
+    return {
+        "relevant_items": selected,
+        "summary": {
+            "total_items": len(items),
+            "omitted_items": sum(omitted.values()),
+            "omitted_by_section": dict(sorted(omitted.items())),
+        }
+    }
@@ -1,9 +1,20 @@
 import click
-import yaml
 from pathlib import Path
 from typing import Dict, List
-import json
 from datetime import datetime
+from item_log import ItemLog
+from content_store import open_store
+
+DATA_DIR = Path("src/data/cv")
+ITEM_TYPES = ['publication', 'presentation', 'grant', 'service']
+
+# Fields the add command prompts for, required for bulk imports too
+REQUIRED_FIELDS = {
+    'publication': ['title', 'date', 'authors', 'venue', 'type', 'status'],
+    'presentation': ['title', 'date', 'venue', 'location', 'type'],
+    'grant': ['title', 'date', 'amount', 'funder', 'role', 'status'],
+    'service': ['title', 'date', 'organization', 'role', 'type'],
+}
 
 @click.group()
 def cli():
@@ -11,7 +22,7 @@ def cli():
     pass
 
 @cli.command()
-@click.option('--type', type=click.Choice(['publication', 'presentation', 'grant', 'service']))
+@click.option('--type', type=click.Choice(ITEM_TYPES))
 def add(type):
     """Add new item to CV"""
     data = {}
@@ -50,28 +61,88 @@ def add(type):
     
     # Save to appropriate file
     save_item(type, data)
-    click.echo(f"Added {type}: {data['title']}")
+    click.echo(f"Added {type}: {data['title']} (run 'compact' to update {type}s.json)")
 
-def save_item(type: str, data: Dict):
-    """Save item to appropriate JSON file"""
-    file_path = Path(f"src/data/cv/{type}s.json")
+@cli.command()
+@click.option('--type', 'types', multiple=True, type=click.Choice(ITEM_TYPES),
+              help="Item type to compact (repeatable, default all)")
+def compact(types):
+    """Merge logged additions into the sorted JSON files the site reads"""
+    with open_store() as store:
+        if store:
+            # Without --type this also writes research collections changed by point edits
+            names = [collection_name(type) for type in types] if types else None
+            for name in store.export_dirty(names):
+                click.echo(f"Exported {name} from the content store")
+            return
     
-    # Load existing data
-    if file_path.exists():
-        with open(file_path) as f:
-            items = json.load(f)
-    else:
-        items = []
+    for type in types or ITEM_TYPES:
+        added = ItemLog(DATA_DIR, type).compact()
+        if added:
+            click.echo(f"Merged {added} new {type}s into {type}s.json")
+
+@cli.command()
+@click.argument('input_file', type=click.Path(exists=True, dir_okay=False))
+@click.option('--type', 'default_type', type=click.Choice(ITEM_TYPES),
+              help="Item type for rows without an item_type column")
+@click.option('--report', type=click.Path(dir_okay=False), help="Write the per-row error report as JSON")
+@click.option('--dry-run', is_flag=True, help="Validate without writing")
+def bulk(input_file, default_type, report, dry_run):
+    """Import many items from CSV or JSONL (list cells separated by ';')"""
+    from bulk_import import ImportReport, RowError, missing_fields, read_rows
     
-    # Add new item
-    items.append(data)
+    result = ImportReport()
+    valid: Dict[str, List[Dict]] = {}
+    for number, item in read_rows(Path(input_file)):
+        type = item.pop('item_type', None) or default_type
+        if '__error__' in item:
+            errors = [item.pop('__error__')]
+        elif type not in REQUIRED_FIELDS:
+            errors = [f"unknown item type: {type}" if type else "no item type (use --type or an item_type column)"]
+        else:
+            errors = [f"missing {name}" for name in missing_fields(item, REQUIRED_FIELDS[type])]
+        if errors:
+            result.errors.append(RowError(number, str(item.get('title', '')), errors))
+            continue
+        valid.setdefault(type, []).append(item)
     
-    # Sort by date
-    items.sort(key=lambda x: x['date'], reverse=True)
+    result.added = sum(len(items) for items in valid.values())
+    if not dry_run:
+        for type, items in valid.items():
+            save_items(type, items, compact=True)
     
-    # Save updated data
-    with open(file_path, 'w') as f:
-        json.dump(items, f, indent=2)
+    for error in result.errors:
+        click.echo(f"Row {error.row} ({error.title or 'untitled'}): {'; '.join(error.errors)}", err=True)
+    if report:
+        result.save(Path(report))
+    verb = "Validated" if dry_run else "Imported"
+    click.echo(f"{verb} {result.added} items, {len(result.errors)} rows rejected")
+    if result.errors:
+        raise SystemExit(1)
+
+def collection_name(type: str) -> str:
+    """Content store collection for an item type"""
+    return f"cv/{type}s.json"
+
+def save_items(type: str, items: List[Dict], compact: bool = False):
+    """Store items as content store rows, or as log lines without a store"""
+    with open_store() as store:
+        if store:
+            name = collection_name(type)
+            store.ensure_collection(name, kind="list", sort="date")
+            store.add_items(name, items)
+            if compact:
+                store.export(name)
+            return
+    
+    log = ItemLog(DATA_DIR, type)
+    log.extend(items)
+    if compact:
+        log.compact()
+
+def save_item(type: str, data: Dict):
+    """Save one item; compact writes it to the JSON file the site reads"""
+    save_items(type, [data])
 
 if __name__ == '__main__':
     cli() 
\ No newline at end of file
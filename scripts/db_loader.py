@@ -0,0 +1,708 @@
+"""Bulk loader from the JSON data files into the site's Prisma tables.
+
+Reads src/data/publications.json, authors.json and research-areas.json and
+writes the Publication, Author, PublicationAuthor, Keyword and ResearchArea
+tables (plus Prisma's implicit join tables) in one transaction. Authors,
+keywords and areas are resolved through in-memory maps loaded once from the
+database, and every table is written with multi-row upserts, so a load costs
+a few statements per batch instead of several round trips per row.
+
+Each record's content hash is kept in the SyncHash table. With --sync only
+records whose hash changed are written and records that disappeared from
+the JSON are deleted, so editing one CV entry writes one row:
+
+    python scripts/db_loader.py                          # DATABASE_URL (Postgres, needs psycopg2)
+    python scripts/db_loader.py --sync --dry-run         # what a sync would change
+    python scripts/db_loader.py --sqlite local.db --create-schema
+
+The SQLite mode uses a stand-in schema with the same tables and unique keys,
+for tests and trying the loader without a database server.
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DATA_ROOT = Path("src/data")
+PUBLICATIONS_FILE = DATA_ROOT / "publications.json"
+AUTHORS_FILE = DATA_ROOT / "authors.json"
+AREAS_FILE = DATA_ROOT / "research-areas.json"
+
+# Sections of publications.json that hold Publication rows (grants have their own table)
+PUBLICATION_SECTIONS = {"publications": "publication", "talks": "talk"}
+
+# Publication columns filled from the JSON, in insert order
+PUBLICATION_COLUMNS = ["title", "authors", "description", "venue", "year", "date", "status", "type",
+                       "doi", "pdfLink", "projectLink", "location", "award", "volume", "issue",
+                       "pages", "publisher", "isbn"]
+
+AuthorName = Tuple[str, str, Optional[str]]
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS "Publication" (
+    "id" TEXT PRIMARY KEY, "title" TEXT NOT NULL, "authors" TEXT NOT NULL DEFAULT '[]',
+    "description" TEXT NOT NULL, "venue" TEXT, "year" INTEGER NOT NULL, "date" TEXT, "status" TEXT,
+    "type" TEXT NOT NULL, "doi" TEXT, "pdfLink" TEXT, "pdfFile" TEXT, "projectLink" TEXT,
+    "location" TEXT, "award" TEXT, "volume" TEXT, "issue" TEXT, "pages" TEXT, "publisher" TEXT,
+    "isbn" TEXT, "acceptanceRate" TEXT, "seriesTitle" TEXT, "edition" TEXT,
+    "createdAt" TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP, "updatedAt" TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS "Keyword" (
+    "id" TEXT PRIMARY KEY, "name" TEXT NOT NULL UNIQUE,
+    "createdAt" TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP, "updatedAt" TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS "ResearchArea" (
+    "id" TEXT PRIMARY KEY, "name" TEXT NOT NULL UNIQUE, "description" TEXT NOT NULL,
+    "createdAt" TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP, "updatedAt" TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS "Author" (
+    "id" TEXT PRIMARY KEY, "firstName" TEXT NOT NULL, "lastName" TEXT NOT NULL, "middleName" TEXT,
+    "email" TEXT, "affiliation" TEXT, "isYou" BOOLEAN NOT NULL DEFAULT 0,
+    "createdAt" TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP, "updatedAt" TEXT NOT NULL,
+    UNIQUE ("firstName", "lastName", "middleName")
+);
+CREATE TABLE IF NOT EXISTS "PublicationAuthor" (
+    "id" TEXT PRIMARY KEY,
+    "authorId" TEXT NOT NULL REFERENCES "Author"("id"),
+    "publicationId" TEXT NOT NULL REFERENCES "Publication"("id") ON DELETE CASCADE,
+    "position" INTEGER NOT NULL, "isCorresponding" BOOLEAN NOT NULL DEFAULT 0,
+    "equalContribution" BOOLEAN NOT NULL DEFAULT 0,
+    "createdAt" TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP, "updatedAt" TEXT NOT NULL,
+    UNIQUE ("publicationId", "authorId"), UNIQUE ("publicationId", "position")
+);
+CREATE TABLE IF NOT EXISTS "_KeywordToPublication" (
+    "A" TEXT NOT NULL REFERENCES "Keyword"("id") ON DELETE CASCADE,
+    "B" TEXT NOT NULL REFERENCES "Publication"("id") ON DELETE CASCADE, UNIQUE ("A", "B")
+);
+CREATE TABLE IF NOT EXISTS "_PublicationToResearchArea" (
+    "A" TEXT NOT NULL REFERENCES "Publication"("id") ON DELETE CASCADE,
+    "B" TEXT NOT NULL REFERENCES "ResearchArea"("id") ON DELETE CASCADE, UNIQUE ("A", "B")
+);
+CREATE TABLE IF NOT EXISTS "_KeywordToResearchArea" (
+    "A" TEXT NOT NULL REFERENCES "Keyword"("id") ON DELETE CASCADE,
+    "B" TEXT NOT NULL REFERENCES "ResearchArea"("id") ON DELETE CASCADE, UNIQUE ("A", "B")
+);
+CREATE TABLE IF NOT EXISTS "SyncHash" (
+    "kind" TEXT NOT NULL, "key" TEXT NOT NULL, "rowId" TEXT NOT NULL, "hash" TEXT NOT NULL,
+    "updatedAt" TEXT NOT NULL, PRIMARY KEY ("kind", "key")
+);
+CREATE INDEX IF NOT EXISTS "_KeywordToPublication_B_index" ON "_KeywordToPublication"("B");
+CREATE INDEX IF NOT EXISTS "_PublicationToResearchArea_B_index" ON "_PublicationToResearchArea"("B");
+CREATE INDEX IF NOT EXISTS "_KeywordToResearchArea_B_index" ON "_KeywordToResearchArea"("B");
+"""
+
+
+@dataclass
+class Dialect:
+    """The differences between Postgres and the SQLite stand-in that matter here"""
+    name: str
+    placeholder: str
+    # Bind parameters allowed in one statement
+    max_params: int
+
+    def array(self, values: List[str]):
+        # Postgres drivers adapt lists to String[]; SQLite stores them as JSON
+        return values if self.name == "postgres" else json.dumps(values)
+
+    def timestamp(self, value: datetime):
+        return value if self.name == "postgres" else value.isoformat(timespec="milliseconds")
+
+
+POSTGRES = Dialect("postgres", "%s", 32767)
+# SQLite raised its bind parameter limit from 999 to 32766 in 3.32
+SQLITE = Dialect("sqlite", "?", 32766 if sqlite3.sqlite_version_info >= (3, 32) else 999)
+
+
+@dataclass
+class PublicationRecord:
+    """One publication from the JSON, ready to be written"""
+    # (type, title, year, venue): the same talk given at two venues is two rows
+    key: Tuple[str, str, int, str]
+    row: Dict[str, Any]
+    authors: List[AuthorName]
+    keywords: List[str]
+
+
+@dataclass
+class AreaRecord:
+    name: str
+    description: str
+    keywords: List[str]
+    publication_titles: List[str]
+
+
+@dataclass
+class LoadReport:
+    publications: int = 0
+    authors_created: int = 0
+    keywords_created: int = 0
+    areas: int = 0
+    skipped: List[str] = field(default_factory=list)
+    seconds: float = 0.0
+
+    def summary(self) -> str:
+        return (f"{self.publications} publications, {self.authors_created} new authors, "
+                f"{self.keywords_created} new keywords, {self.areas} research areas "
+                f"({len(self.skipped)} skipped) in {self.seconds:.2f}s")
+
+
+@dataclass
+class SyncReport:
+    """Rows a sync wrote (or would write, with dry_run)"""
+    inserted: List[str] = field(default_factory=list)
+    updated: List[str] = field(default_factory=list)
+    deleted: List[str] = field(default_factory=list)
+    unchanged: int = 0
+    areas_changed: List[str] = field(default_factory=list)
+    areas_deleted: List[str] = field(default_factory=list)
+    dry_run: bool = False
+    seconds: float = 0.0
+
+    def summary(self) -> str:
+        verb = "would change" if self.dry_run else "changed"
+        return (f"Sync {verb}: {len(self.inserted)} inserted, {len(self.updated)} updated, "
+                f"{len(self.deleted)} deleted, {self.unchanged} unchanged publications; "
+                f"{len(self.areas_changed)} areas written, {len(self.areas_deleted)} deleted "
+                f"in {self.seconds:.2f}s")
+
+    def details(self) -> List[str]:
+        return ([f"+ {label}" for label in self.inserted] + [f"~ {label}" for label in self.updated]
+                + [f"- {label}" for label in self.deleted]
+                + [f"~ area {name}" for name in self.areas_changed]
+                + [f"- area {name}" for name in self.areas_deleted])
+
+
+def record_id(*parts) -> str:
+    """Deterministic cuid-shaped id, so reloading the same record hits the same row"""
+    return "c" + hashlib.sha1("\x1f".join(map(str, parts)).encode()).hexdigest()[:24]
+
+
+def content_hash(value) -> str:
+    """Hash of a record's content in a canonical JSON form"""
+    return hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def publication_key(record: "PublicationRecord") -> str:
+    return json.dumps(list(record.key))
+
+
+def publication_hash(record: "PublicationRecord") -> str:
+    return content_hash([record.row, record.authors, record.keywords])
+
+
+def area_hash(area: "AreaRecord") -> str:
+    return content_hash([area.description, area.keywords, area.publication_titles])
+
+
+def key_label(key: str) -> str:
+    """Readable form of a stored publication key"""
+    pub_type, title, year, _ = json.loads(key)
+    return f"{pub_type} {year}: {title}"
+
+
+def batched(items: Iterable, size: int) -> Iterator[List]:
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def normalize_name(name: str) -> str:
+    """Comparison form of an author string, as the publications API uses"""
+    return re.sub(r"[.\s]", "", name.lower())
+
+
+def clean_author(name: str) -> str:
+    return re.sub(r"\s+", " ", name.replace("\\textbf{", "").replace("}", "")).strip()
+
+
+def parse_author_name(name: str, known: Dict[str, Dict]) -> AuthorName:
+    """(first, last, middle) for an author string.
+
+    Names listed in authors.json use their recorded first and last names;
+    others are split as "Last, First Middle" or "First Middle Last".
+    """
+    details = known.get(name)
+    if details and details.get("lastName"):
+        return details.get("firstName", ""), details["lastName"], None
+    if "," in name:
+        last, _, rest = name.partition(",")
+        parts = rest.split()
+        return (parts[0] if parts else ""), last.strip(), " ".join(parts[1:]) or None
+    parts = name.split()
+    if len(parts) == 1:
+        return "", parts[0], None
+    return parts[0], parts[-1], " ".join(parts[1:-1]) or None
+
+
+def publication_title(item: Dict) -> str:
+    """The title, or the first sentence of the description for entries without one"""
+    title = (item.get("title") or "").strip()
+    if title:
+        return title
+    description = (item.get("description") or "").strip()
+    return re.split(r"(?<=[.?!])\s", description, maxsplit=1)[0].rstrip(".")
+
+
+def read_publications(data: Dict, known_authors: Dict[str, Dict],
+                      skipped: Optional[List[str]] = None) -> Iterator[PublicationRecord]:
+    """PublicationRecords for every usable entry of publications.json.
+
+    Entries without a title or year cannot satisfy the Publication table and
+    are listed in skipped; repeated entries keep their first occurrence.
+    """
+    seen = set()
+    # Raw author string -> (cleaned, comparison form, parsed); corpora repeat names a lot
+    names_seen: Dict[str, Tuple[str, str, AuthorName]] = {}
+    for section, default_type in PUBLICATION_SECTIONS.items():
+        for item in data.get(section, []):
+            title = publication_title(item)
+            year = item.get("year")
+            if isinstance(year, str) and year[:4].isdigit():
+                year = int(year[:4])
+            pub_type = item.get("type") or default_type
+            venue = item.get("venue") or item.get("journal")
+            problem = "no title" if not title else "no year" if not isinstance(year, int) else None
+            key = (pub_type, title, year, venue or "")
+            if not problem and key in seen:
+                problem = "duplicate"
+            if problem:
+                if skipped is not None:
+                    skipped.append(f"{section}: {title or item.get('description', '')[:60]!r} ({problem})")
+                continue
+            seen.add(key)
+
+            # Authors deduplicated the way the publications API does
+            raw = item.get("authors") or []
+            authors, parsed, names = [], [], set()
+            for name in raw if isinstance(raw, list) else [raw]:
+                if name not in names_seen:
+                    cleaned = clean_author(name)
+                    names_seen[name] = (cleaned, normalize_name(cleaned), parse_author_name(cleaned, known_authors))
+                cleaned, normalized, author = names_seen[name]
+                if cleaned and normalized not in names:
+                    names.add(normalized)
+                    authors.append(cleaned)
+                    parsed.append(author)
+            location = item.get("location")
+            if location in raw:
+                location = None
+
+            row = {
+                "title": title,
+                "authors": authors,
+                "description": item.get("description") or f"{title} by {', '.join(authors)}",
+                "venue": venue,
+                "year": year,
+                "date": item.get("date"),
+                "status": item.get("status") or "published",
+                "type": pub_type,
+                "doi": item.get("doi"),
+                "pdfLink": item.get("pdfLink") or item.get("pdf_url"),
+                "projectLink": item.get("url") or item.get("projectLink"),
+                "location": location,
+                **{column: item.get(column) for column in
+                   ("award", "volume", "issue", "pages", "publisher", "isbn")},
+            }
+            yield PublicationRecord(key=key, row=row, authors=parsed,
+                                    keywords=list(item.get("keywords") or item.get("tags") or []))
+
+
+def read_areas(data: Dict) -> List[AreaRecord]:
+    """AreaRecords from research-areas.json"""
+    return [AreaRecord(name=area["title"], description=area.get("description", ""),
+                       keywords=list(area.get("tags", [])),
+                       publication_titles=list(area.get("publications", [])))
+            for area in data.get("researchAreas", [])]
+
+
+def connect(database_url: str = None, sqlite_path: Path = None):
+    """(connection, dialect) for a Postgres URL or a SQLite file"""
+    if sqlite_path:
+        conn = sqlite3.connect(str(sqlite_path))
+        conn.execute("PRAGMA foreign_keys = ON")
+        return conn, SQLITE
+    try:
+        import psycopg2
+    except ImportError:
+        raise SystemExit("Loading into Postgres needs psycopg2 (pip install psycopg2-binary)")
+    return psycopg2.connect(database_url), POSTGRES
+
+
+class BulkLoader:
+    """Writes publication records with batched multi-row statements.
+
+    Nothing is committed by the loader itself; run it inside the
+    connection's transaction (``with conn:``).
+    """
+
+    def __init__(self, conn, dialect: Dialect = SQLITE, batch_size: int = 1000):
+        self.conn = conn
+        self.dialect = dialect
+        self.batch_size = batch_size
+        self.now = dialect.timestamp(datetime.now(timezone.utc).replace(tzinfo=None))
+        self.authors: Dict[Tuple[str, str, str], str] = {}
+        self.keywords: Dict[str, str] = {}
+        self.areas: Dict[str, str] = {}
+        self.publications: Dict[Tuple[str, str, int, str], str] = {}
+        self.titles: Dict[str, List[str]] = {}
+
+    # Statements
+
+    def _rows_per_statement(self, columns: Sequence[str]) -> int:
+        return max(1, min(self.batch_size, self.dialect.max_params // len(columns)))
+
+    def insert(self, table: str, columns: Sequence[str], rows: Iterable[Sequence],
+               conflict: Sequence[str] = None, update: Sequence[str] = ()):
+        """Multi-row INSERT; with conflict, an upsert (update columns) or insert-or-ignore"""
+        names = ", ".join(f'"{c}"' for c in columns)
+        row_sql = "(" + ", ".join([self.dialect.placeholder] * len(columns)) + ")"
+        suffix = ""
+        if conflict:
+            target = ", ".join(f'"{c}"' for c in conflict)
+            if update:
+                sets = ", ".join(f'"{c}" = excluded."{c}"' for c in update)
+                suffix = f" ON CONFLICT ({target}) DO UPDATE SET {sets}"
+            else:
+                suffix = f" ON CONFLICT ({target}) DO NOTHING"
+        cursor = self.conn.cursor()
+        for batch in batched(rows, self._rows_per_statement(columns)):
+            sql = f'INSERT INTO "{table}" ({names}) VALUES {", ".join([row_sql] * len(batch))}{suffix}'
+            cursor.execute(sql, [value for row in batch for value in row])
+
+    def delete_where_in(self, table: str, column: str, values: Iterable[str]):
+        cursor = self.conn.cursor()
+        for batch in batched(values, self._rows_per_statement([column])):
+            marks = ", ".join([self.dialect.placeholder] * len(batch))
+            cursor.execute(f'DELETE FROM "{table}" WHERE "{column}" IN ({marks})', batch)
+
+    def _select(self, sql: str, params: Sequence = ()) -> List[Tuple]:
+        cursor = self.conn.cursor()
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+    def _links(self, table: str, key: str, value: str, ids: Sequence[str], order: str = None) -> Dict[str, List[str]]:
+        """Current link rows of table for the given ids, as id -> linked ids"""
+        links: Dict[str, List[str]] = {}
+        order_by = f' ORDER BY "{key}", "{order}"' if order else ""
+        for batch in batched(ids, self._rows_per_statement([key])):
+            marks = ", ".join([self.dialect.placeholder] * len(batch))
+            for left, right in self._select(
+                    f'SELECT "{key}", "{value}" FROM "{table}" WHERE "{key}" IN ({marks}){order_by}', batch):
+                links.setdefault(left, []).append(right)
+        return links
+
+    # Lookups
+
+    def load_maps(self):
+        """Read the existing natural keys once so later lookups stay in memory"""
+        self.authors = {(first, last, middle or ""): id for id, first, last, middle in
+                        self._select('SELECT "id", "firstName", "lastName", "middleName" FROM "Author"')}
+        self.keywords = {name.lower(): id for id, name in self._select('SELECT "id", "name" FROM "Keyword"')}
+        self.areas = {name: id for id, name in self._select('SELECT "id", "name" FROM "ResearchArea"')}
+        self.publications = {(type, title, year, venue or ""): id for id, type, title, year, venue in
+                             self._select('SELECT "id", "type", "title", "year", "venue" FROM "Publication"')}
+
+    def load_titles(self):
+        """Title -> publication ids for every stored publication (area links match on title)"""
+        for pub_id, title in self._select('SELECT "id", "title" FROM "Publication"'):
+            if pub_id not in self.titles.get(title.lower(), []):
+                self.titles.setdefault(title.lower(), []).append(pub_id)
+
+    def resolve_authors(self, names: Iterable[AuthorName], is_you: Iterable[AuthorName] = ()) -> int:
+        """Create Author rows for names not in the map; returns how many were new"""
+        is_you = set(is_you)
+        new = {}
+        for first, last, middle in names:
+            key = (first, last, middle or "")
+            if key not in self.authors and key not in new:
+                new[key] = (record_id("author", *key), first, last, middle, (first, last, middle) in is_you,
+                            self.now, self.now)
+        if new:
+            self.insert("Author", ["id", "firstName", "lastName", "middleName", "isYou", "createdAt", "updatedAt"],
+                        new.values(), conflict=["id"])
+            self.authors.update({key: row[0] for key, row in new.items()})
+        return len(new)
+
+    def resolve_keywords(self, names: Iterable[str]) -> int:
+        """Create Keyword rows for names not in the map (case-insensitive)"""
+        new = {}
+        for name in names:
+            name = name.strip()
+            if name and name.lower() not in self.keywords and name.lower() not in new:
+                new[name.lower()] = (record_id("keyword", name.lower()), name, self.now, self.now)
+        if new:
+            self.insert("Keyword", ["id", "name", "createdAt", "updatedAt"], new.values(), conflict=["name"])
+            self.keywords.update({key: row[0] for key, row in new.items()})
+        return len(new)
+
+    # Writes
+
+    def publication_id(self, record: PublicationRecord) -> str:
+        return self.publications.get(record.key) or record_id("publication", *record.key)
+
+    def write_publications(self, records: List[PublicationRecord], is_you: Iterable[AuthorName] = ()) -> Tuple[int, int]:
+        """Upsert one batch of publications and replace author and keyword links that changed"""
+        authors_created = self.resolve_authors((a for r in records for a in r.authors), is_you)
+        keywords_created = self.resolve_keywords(k for r in records for k in r.keywords)
+
+        ids = [self.publication_id(record) for record in records]
+        rows = []
+        for pub_id, record in zip(ids, records):
+            values = dict(record.row, authors=self.dialect.array(record.row["authors"]))
+            rows.append([pub_id, *(values[c] for c in PUBLICATION_COLUMNS), self.now, self.now])
+        self.insert("Publication", ["id", *PUBLICATION_COLUMNS, "createdAt", "updatedAt"], rows,
+                    conflict=["id"], update=[*PUBLICATION_COLUMNS, "updatedAt"])
+
+        # Links are only rewritten for publications whose links changed
+        current_authors = self._links("PublicationAuthor", "publicationId", "authorId", ids, order="position")
+        current_keywords = self._links("_KeywordToPublication", "B", "A", ids)
+        authors_changed, keywords_changed, links, keyword_links = [], [], [], []
+        for pub_id, record in zip(ids, records):
+            author_ids = []
+            for first, last, middle in record.authors:
+                author_id = self.authors[(first, last, middle or "")]
+                if author_id not in author_ids:
+                    author_ids.append(author_id)
+            if current_authors.get(pub_id, []) != author_ids:
+                authors_changed.append(pub_id)
+                links.extend((record_id("publication-author", pub_id, author_id), author_id, pub_id,
+                              position, position == 1, False, self.now, self.now)
+                             for position, author_id in enumerate(author_ids, start=1))
+            keyword_ids = {self.keywords[k.strip().lower()] for k in record.keywords if k.strip()}
+            if set(current_keywords.get(pub_id, [])) != keyword_ids:
+                keywords_changed.append(pub_id)
+                keyword_links.extend((keyword_id, pub_id) for keyword_id in sorted(keyword_ids))
+            self.publications[record.key] = pub_id
+            self.titles.setdefault(record.row["title"].lower(), []).append(pub_id)
+        self.delete_where_in("PublicationAuthor", "publicationId", authors_changed)
+        self.delete_where_in("_KeywordToPublication", "B", keywords_changed)
+        self.insert("PublicationAuthor", ["id", "authorId", "publicationId", "position", "isCorresponding",
+                                          "equalContribution", "createdAt", "updatedAt"], links)
+        self.insert("_KeywordToPublication", ["A", "B"], keyword_links, conflict=["A", "B"])
+        return authors_created, keywords_created
+
+    def write_areas(self, areas: List[AreaRecord]) -> int:
+        """Upsert research areas and replace their keyword and publication links"""
+        keywords_created = self.resolve_keywords(k for area in areas for k in area.keywords)
+        rows = [(self.areas.get(area.name) or record_id("area", area.name), area.name, area.description,
+                 self.now, self.now) for area in areas]
+        self.insert("ResearchArea", ["id", "name", "description", "createdAt", "updatedAt"], rows,
+                    conflict=["id"], update=["description", "updatedAt"])
+        self.areas.update({row[1]: row[0] for row in rows})
+
+        ids = [row[0] for row in rows]
+        self.delete_where_in("_KeywordToResearchArea", "B", ids)
+        self.delete_where_in("_PublicationToResearchArea", "B", ids)
+        keyword_links, publication_links = set(), set()
+        for area_id, area in zip(ids, areas):
+            keyword_links.update((self.keywords[k.strip().lower()], area_id) for k in area.keywords if k.strip())
+            for title in area.publication_titles:
+                publication_links.update((pub_id, area_id) for pub_id in self.titles.get(title.lower(), []))
+        self.insert("_KeywordToResearchArea", ["A", "B"], sorted(keyword_links), conflict=["A", "B"])
+        self.insert("_PublicationToResearchArea", ["A", "B"], sorted(publication_links), conflict=["A", "B"])
+        return keywords_created
+
+    def write_publication_areas(self, records: List[PublicationRecord], areas: List[AreaRecord]):
+        """Set the area links of individual publications from the areas' title lists"""
+        area_ids = {title.lower(): [] for area in areas for title in area.publication_titles}
+        for area in areas:
+            for title in area.publication_titles:
+                area_ids[title.lower()].append(self.areas[area.name])
+        ids = [self.publications[record.key] for record in records]
+        current = self._links("_PublicationToResearchArea", "A", "B", ids)
+        changed, links = [], []
+        for pub_id, record in zip(ids, records):
+            wanted = sorted(set(area_ids.get(record.row["title"].lower(), [])))
+            if sorted(current.get(pub_id, [])) != wanted:
+                changed.append(pub_id)
+                links.extend((pub_id, area_id) for area_id in wanted)
+        self.delete_where_in("_PublicationToResearchArea", "A", changed)
+        self.insert("_PublicationToResearchArea", ["A", "B"], links, conflict=["A", "B"])
+
+    def delete_publications(self, ids: Sequence[str]):
+        for table, column in (("PublicationAuthor", "publicationId"), ("_KeywordToPublication", "B"),
+                              ("_PublicationToResearchArea", "A"), ("Publication", "id")):
+            self.delete_where_in(table, column, ids)
+
+    def delete_areas(self, ids: Sequence[str]):
+        for table, column in (("_KeywordToResearchArea", "B"), ("_PublicationToResearchArea", "B"),
+                              ("ResearchArea", "id")):
+            self.delete_where_in(table, column, ids)
+
+    # Content hashes
+
+    def stored_hashes(self, kind: str) -> Dict[str, Tuple[str, str]]:
+        """key -> (row id, hash) of every record of kind synced so far"""
+        return {key: (row_id, digest) for key, row_id, digest in self._select(
+            f'SELECT "key", "rowId", "hash" FROM "SyncHash" WHERE "kind" = {self.dialect.placeholder}', [kind])}
+
+    def save_hashes(self, kind: str, entries: Iterable[Tuple[str, str, str]]):
+        self.insert("SyncHash", ["kind", "key", "rowId", "hash", "updatedAt"],
+                    ((kind, key, row_id, digest, self.now) for key, row_id, digest in entries),
+                    conflict=["kind", "key"], update=["rowId", "hash", "updatedAt"])
+
+    def delete_hashes(self, kind: str, keys: Iterable[str]):
+        cursor = self.conn.cursor()
+        for batch in batched(keys, self._rows_per_statement(["key"]) - 1):
+            marks = ", ".join([self.dialect.placeholder] * len(batch))
+            cursor.execute(f'DELETE FROM "SyncHash" WHERE "kind" = {self.dialect.placeholder} AND "key" IN ({marks})',
+                           [kind, *batch])
+
+    # Entry points
+
+    def load(self, records: Iterable[PublicationRecord], areas: List[AreaRecord] = (),
+             is_you: Iterable[AuthorName] = ()) -> LoadReport:
+        """Stream records into the tables in batches, recording their hashes"""
+        start = time.perf_counter()
+        report = LoadReport()
+        self.load_maps()
+        is_you = list(is_you)
+        for batch in batched(records, self.batch_size):
+            authors_created, keywords_created = self.write_publications(batch, is_you)
+            self.save_hashes("publication", [(publication_key(r), self.publications[r.key], publication_hash(r))
+                                             for r in batch])
+            report.publications += len(batch)
+            report.authors_created += authors_created
+            report.keywords_created += keywords_created
+        if areas:
+            # Area links need every publication title, including ones loaded earlier
+            self.load_titles()
+            report.keywords_created += self.write_areas(list(areas))
+            self.save_hashes("area", [(area.name, self.areas[area.name], area_hash(area)) for area in areas])
+            report.areas = len(areas)
+        report.seconds = time.perf_counter() - start
+        return report
+
+    def sync(self, records: Iterable[PublicationRecord], areas: List[AreaRecord] = (),
+             is_you: Iterable[AuthorName] = (), dry_run: bool = False) -> SyncReport:
+        """Write only the records whose content hash changed and delete the ones that are gone.
+
+        Rows that were never synced (no SyncHash entry) are never deleted.
+        With dry_run nothing is written; the report lists what would change.
+        """
+        start = time.perf_counter()
+        report = SyncReport(dry_run=dry_run)
+        stored = self.stored_hashes("publication")
+        changed: List[Tuple[PublicationRecord, str]] = []
+        seen = set()
+        for record in records:
+            key, digest = publication_key(record), publication_hash(record)
+            seen.add(key)
+            previous = stored.get(key)
+            if previous is not None and previous[1] == digest:
+                report.unchanged += 1
+                continue
+            (report.inserted if previous is None else report.updated).append(key_label(key))
+            changed.append((record, digest))
+        removed = {key: row_id for key, (row_id, _) in stored.items() if key not in seen}
+        report.deleted = sorted(key_label(key) for key in removed)
+
+        areas = list(areas)
+        stored_areas = self.stored_hashes("area")
+        changed_areas = [area for area in areas if stored_areas.get(area.name, (None, None))[1] != area_hash(area)]
+        names = {area.name for area in areas}
+        removed_areas = {name: row_id for name, (row_id, _) in stored_areas.items() if name not in names}
+        report.areas_changed = [area.name for area in changed_areas]
+        report.areas_deleted = sorted(removed_areas)
+
+        if not dry_run:
+            self.load_maps()
+            is_you = list(is_you)
+            for batch in batched(changed, self.batch_size):
+                self.write_publications([record for record, _ in batch], is_you)
+                self.save_hashes("publication", [(publication_key(record), self.publications[record.key], digest)
+                                                 for record, digest in batch])
+            self.delete_publications(list(removed.values()))
+            self.delete_hashes("publication", list(removed))
+
+            self.delete_areas(list(removed_areas.values()))
+            self.delete_hashes("area", list(removed_areas))
+            if changed_areas:
+                self.load_titles()
+                self.write_areas(changed_areas)
+                self.save_hashes("area", [(area.name, self.areas[area.name], area_hash(area))
+                                          for area in changed_areas])
+            # A changed or new publication may be listed by an area that did not change
+            known_areas = [area for area in areas if area.name in self.areas]
+            for batch in batched((record for record, _ in changed), self.batch_size):
+                self.write_publication_areas(batch, known_areas)
+        report.seconds = time.perf_counter() - start
+        return report
+
+
+def read_json(path: Path) -> Dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def owner_names(known_authors: Dict[str, Dict], owner: str) -> List[AuthorName]:
+    """Author names flagged isYou: the authors.json entry for the site owner"""
+    return [parse_author_name(owner, known_authors)] if owner else []
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk load the JSON data into the database")
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL"),
+                        help="Postgres connection URL (default: $DATABASE_URL)")
+    parser.add_argument("--sqlite", type=Path, help="Load into a SQLite file instead of Postgres")
+    parser.add_argument("--create-schema", action="store_true",
+                        help="Create the stand-in tables in the SQLite file")
+    parser.add_argument("--publications", type=Path, default=PUBLICATIONS_FILE)
+    parser.add_argument("--authors", type=Path, default=AUTHORS_FILE)
+    parser.add_argument("--areas", type=Path, default=AREAS_FILE)
+    parser.add_argument("--owner", default="Ion, M.", help="Author string of the site owner (isYou)")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--sync", action="store_true",
+                        help="Only write records whose content changed since the last load or sync")
+    parser.add_argument("--dry-run", action="store_true", help="With --sync, report changes without writing")
+    args = parser.parse_args()
+
+    if not args.sqlite and not args.database_url:
+        parser.error("Set DATABASE_URL or pass --database-url or --sqlite")
+    conn, dialect = connect(args.database_url, args.sqlite)
+    if args.create_schema:
+        if dialect is not SQLITE:
+            parser.error("--create-schema is for SQLite; use prisma migrate for Postgres")
+        conn.executescript(SQLITE_SCHEMA)
+
+    known_authors = read_json(args.authors).get("authors", {}) if args.authors.exists() else {}
+    areas = read_areas(read_json(args.areas)) if args.areas.exists() else []
+    skipped: List[str] = []
+    records = read_publications(read_json(args.publications), known_authors, skipped)
+    try:
+        with conn:
+            loader = BulkLoader(conn, dialect, args.batch_size)
+            owner = owner_names(known_authors, args.owner)
+            if args.sync or args.dry_run:
+                report = loader.sync(records, areas, owner, dry_run=args.dry_run)
+            else:
+                report = loader.load(records, areas, owner)
+    finally:
+        conn.close()
+    for reason in skipped:
+        logger.info(f"Skipped {reason}")
+    if isinstance(report, SyncReport):
+        for line in report.details():
+            print(line)
+        logger.info(report.summary())
+    else:
+        report.skipped = skipped
+        logger.info(f"Loaded {report.summary()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+"""Offline evaluation of research_classifier variants.
+
+Runs each variant over a labeled corpus (JSONL with text, primary_area and
+keywords) and reports macro-F1 for primary_area, keyword overlap, latency
+percentiles and tokens per entry. Backends:
+
+    stub    in-process llm_stub server with scripted outputs (default)
+    replay  responses recorded from an earlier live run with --recording
+    live    config.get_llm(), optionally recording responses for replay
+
+Example:
+
+    python scripts/eval_classifier.py --variants compact,routed --output eval.json
+"""
+import argparse
+import hashlib
+import json
+import logging
+import math
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence
+
+from token_budget import UsageReport
+
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+FIXTURES_DIR = Path(__file__).resolve().parent.parent / "tests" / "fixtures"
+DEFAULT_CORPUS = FIXTURES_DIR / "classifier_corpus.jsonl"
+DEFAULT_STUB_RULES = FIXTURES_DIR / "classifier_stub_rules.jsonl"
+
+# Model tiers are named symbolically and resolved against research_classifier.
+# All variants use the compact prompt; wide-budget only lets entries run longer.
+VARIANTS = {
+    "wide-budget": {"tiers": ["large"], "prompt_budget": 4096},
+    "compact": {"tiers": ["large"], "prompt_budget": None},
+    "routed": {"tiers": ["small", "large"], "prompt_budget": None},
+    "small-only": {"tiers": ["small"], "prompt_budget": None},
+}
+
+
+@dataclass
+class EntryResult:
+    """Prediction and cost for one labeled entry"""
+    id: str
+    gold_area: str
+    predicted_area: str
+    keyword_overlap: float
+    latency_s: float
+    tokens: int
+
+
+@dataclass
+class VariantReport:
+    """Aggregate metrics for one variant"""
+    variant: str
+    entries: List[EntryResult] = field(default_factory=list)
+
+    def summary(self) -> Dict:
+        latencies = [e.latency_s for e in self.entries]
+        return {
+            "variant": self.variant,
+            "entries": len(self.entries),
+            "macro_f1": round(macro_f1([e.gold_area for e in self.entries],
+                                       [e.predicted_area for e in self.entries]), 4),
+            "accuracy": round(sum(e.gold_area == e.predicted_area for e in self.entries)
+                              / max(len(self.entries), 1), 4),
+            "keyword_overlap": round(sum(e.keyword_overlap for e in self.entries)
+                                     / max(len(self.entries), 1), 4),
+            "p50_latency_s": round(percentile(latencies, 50), 4),
+            "p95_latency_s": round(percentile(latencies, 95), 4),
+            "tokens_per_entry": round(sum(e.tokens for e in self.entries)
+                                      / max(len(self.entries), 1), 1),
+        }
+
+
+def macro_f1(gold: Sequence[str], predicted: Sequence[str]) -> float:
+    """Unweighted mean of per-label F1 over all labels seen in gold or predictions"""
+    labels = sorted(set(gold) | set(predicted))
+    if not labels:
+        return 0.0
+    scores = []
+    for label in labels:
+        tp = sum(1 for g, p in zip(gold, predicted) if g == label and p == label)
+        fp = sum(1 for g, p in zip(gold, predicted) if g != label and p == label)
+        fn = sum(1 for g, p in zip(gold, predicted) if g == label and p != label)
+        if tp == 0:
+            scores.append(0.0)
+            continue
+        precision = tp / (tp + fp)
+        recall = tp / (tp + fn)
+        scores.append(2 * precision * recall / (precision + recall))
+    return sum(scores) / len(scores)
+
+
+def keyword_overlap(gold: Sequence[str], predicted: Sequence[str]) -> float:
+    """Jaccard similarity of case-folded keyword sets"""
+    gold_set = {k.strip().lower() for k in gold if k.strip()}
+    predicted_set = {k.strip().lower() for k in predicted if k.strip()}
+    if not gold_set and not predicted_set:
+        return 1.0
+    return len(gold_set & predicted_set) / len(gold_set | predicted_set)
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def load_corpus(path: Path) -> List[Dict]:
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _prompt_key(model: str, prompt: str) -> str:
+    return hashlib.sha256(f"{model}\n{prompt}".encode()).hexdigest()
+
+
+class RecordingLLM:
+    """Wraps a live client and saves every completion for later replay"""
+
+    def __init__(self, llm, path: Path):
+        self.llm = llm
+        self.path = path
+        self.lock = threading.Lock()
+        self.Complete = self
+
+    def _save(self, params: Dict, text: str, latency: float):
+        row = {"key": _prompt_key(params.get("model", ""), params.get("prompt", "")),
+               "model": params.get("model"), "text": text, "latency_s": round(latency, 4)}
+        with self.lock, open(self.path, "a") as f:
+            f.write(json.dumps(row) + "\n")
+
+    def create(self, **params):
+        from config import completion_text
+        start = time.perf_counter()
+        response = self.llm.Complete.create(**params)
+        self._save(params, completion_text(response), time.perf_counter() - start)
+        return response
+
+    def create_streaming(self, **params) -> Iterator[str]:
+        # Record the full completion so replays are not cut short by early stopping
+        start = time.perf_counter()
+        chunks = list(self.llm.Complete.create_streaming(**params))
+        self._save(params, "".join(chunks), time.perf_counter() - start)
+        yield from chunks
+
+
+class ReplayLLM:
+    """Serves completions recorded by RecordingLLM"""
+
+    def __init__(self, path: Path, speed: float = 1.0):
+        self.speed = speed
+        self.responses = {}
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    row = json.loads(line)
+                    self.responses[row["key"]] = row
+        self.Complete = self
+
+    def _lookup(self, params: Dict) -> Dict:
+        key = _prompt_key(params.get("model", ""), params.get("prompt", ""))
+        if key not in self.responses:
+            raise KeyError(f"No recorded response for model {params.get('model')}")
+        row = self.responses[key]
+        time.sleep(row["latency_s"] * self.speed)
+        return row
+
+    def create(self, **params) -> Dict:
+        return {"output": {"choices": [{"text": self._lookup(params)["text"]}]}}
+
+    def create_streaming(self, **params) -> Iterator[str]:
+        text = self._lookup(params)["text"]
+        for i in range(0, len(text), 8):
+            yield text[i:i + 8]
+
+
+def run_variant(name: str, llm, corpus: List[Dict]) -> VariantReport:
+    """Classify every corpus entry with one variant"""
+    import research_classifier as rc
+
+    spec = VARIANTS[name]
+    models = {"small": rc.SMALL_CLASSIFIER_MODEL, "large": rc.CLASSIFIER_MODEL}
+    router = rc.ModelRouter(tiers=[models[tier] for tier in spec["tiers"]])
+    budget = spec["prompt_budget"] or rc.DEFAULT_PROMPT_BUDGET
+
+    report = VariantReport(variant=name)
+    for entry in corpus:
+        usage = UsageReport()
+        start = time.perf_counter()
+        result = rc.classify_research_work(llm, entry["text"], usage, budget, router)
+        latency = time.perf_counter() - start
+        totals = usage.summary()
+        report.entries.append(EntryResult(
+            id=entry["id"],
+            gold_area=entry["primary_area"],
+            predicted_area=result.primary_area,
+            keyword_overlap=keyword_overlap(entry.get("keywords", []), result.keywords),
+            latency_s=latency,
+            tokens=totals.get("prompt_tokens", 0) + totals.get("completion_tokens", 0),
+        ))
+    return report
+
+
+def print_table(summaries: List[Dict]):
+    columns = ["variant", "entries", "macro_f1", "accuracy", "keyword_overlap",
+               "p50_latency_s", "p95_latency_s", "tokens_per_entry"]
+    print("  ".join(f"{c:>16}" for c in columns))
+    for row in summaries:
+        print("  ".join(f"{row[c]:>16}" for c in columns))
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    parser = argparse.ArgumentParser(description="Evaluate research classifier variants offline")
+    parser.add_argument("--corpus", type=Path, default=DEFAULT_CORPUS,
+                        help="Labeled JSONL corpus")
+    parser.add_argument("--variants", default=",".join(VARIANTS),
+                        help=f"Comma-separated variants ({', '.join(VARIANTS)})")
+    parser.add_argument("--backend", choices=["stub", "replay", "live"], default="stub")
+    parser.add_argument("--stub-rules", type=Path, default=DEFAULT_STUB_RULES,
+                        help="Scripted outputs for the stub backend")
+    parser.add_argument("--stub-latency", default="lognormal:-2,0.3",
+                        help="Latency distribution for the stub backend")
+    parser.add_argument("--recording", type=Path,
+                        help="Recorded responses (read with --backend replay, written with live)")
+    parser.add_argument("--replay-speed", type=float, default=1.0,
+                        help="Multiplier on recorded latencies when replaying (0 = instant)")
+    parser.add_argument("--output", type=Path, help="Write the report as JSON")
+    args = parser.parse_args(argv)
+
+    variants = [v.strip() for v in args.variants.split(",") if v.strip()]
+    unknown = set(variants) - set(VARIANTS)
+    if unknown:
+        parser.error(f"Unknown variants: {', '.join(sorted(unknown))}")
+    corpus = load_corpus(args.corpus)
+
+    server = None
+    if args.backend == "stub":
+        from llm_stub import LocalLLMClient, StubSettings, load_rules, serve_in_background, server_url
+        server = serve_in_background(StubSettings(latency=args.stub_latency, seed=0,
+                                                  rules=load_rules(args.stub_rules)))
+        llm = LocalLLMClient(server_url(server))
+    elif args.backend == "replay":
+        if not args.recording:
+            parser.error("--backend replay requires --recording")
+        llm = ReplayLLM(args.recording, args.replay_speed)
+    else:
+        from config import setup_llm_creds, get_llm
+        setup_llm_creds()
+        llm = get_llm()
+        if args.recording:
+            llm = RecordingLLM(llm, args.recording)
+
+    try:
+        reports = [run_variant(name, llm, corpus) for name in variants]
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+
+    summaries = [report.summary() for report in reports]
+    print_table(summaries)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({
+                "corpus": str(args.corpus),
+                "backend": args.backend,
+                "summaries": summaries,
+                "entries": {r.variant: [e.__dict__ for e in r.entries] for r in reports},
+            }, f, indent=2)
+
+if __name__ == "__main__":
+    main()
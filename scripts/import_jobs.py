@@ -0,0 +1,111 @@
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from cv_importer import CVImporter
+
+logger = logging.getLogger(__name__)
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+def upload_key(content: bytes) -> str:
+    """Jobs are identified by the hash of the uploaded bytes"""
+    return hashlib.sha256(content).hexdigest()
+
+
+@dataclass
+class ImportJob:
+    """State of one CV import, polled by the web page"""
+    key: str
+    name: str
+    status: str = QUEUED
+    progress: float = 0.0
+    message: str = "Waiting for a worker"
+    result: Optional[Dict] = None
+    error: Optional[str] = None
+    submitted: float = 0.0
+    finished: Optional[float] = None
+
+    @property
+    def finished_ok(self) -> bool:
+        return self.status == DONE
+
+    @property
+    def pending(self) -> bool:
+        return self.status in (QUEUED, RUNNING)
+
+
+def parse_cv(path: Path, on_progress: Callable[[str, float], None]) -> Dict:
+    return CVImporter(path).import_cv(on_progress)
+
+
+class ImportJobs:
+    """Runs CV imports on a small worker pool, one job per distinct upload.
+
+    Submitting bytes that are already queued, running or parsed returns the
+    existing job, so reruns and other users uploading the same file never
+    parse it twice. Failed jobs are retried on the next submit. The most
+    recent max_jobs finished jobs are kept.
+    """
+
+    def __init__(self, work_dir: Path = Path("temp"), max_workers: int = 2, max_jobs: int = 32,
+                 parse: Callable[[Path, Callable[[str, float], None]], Dict] = parse_cv):
+        self.work_dir = Path(work_dir)
+        self.max_jobs = max_jobs
+        self.parse = parse
+        self.lock = threading.Lock()
+        self.jobs: "OrderedDict[str, ImportJob]" = OrderedDict()
+        self.executor = ThreadPoolExecutor(max_workers, thread_name_prefix="cv-import")
+
+    def submit(self, name: str, content: bytes, key: str = None) -> ImportJob:
+        key = key or upload_key(content)
+        with self.lock:
+            job = self.jobs.get(key)
+            if job is not None and job.status != FAILED:
+                self.jobs.move_to_end(key)
+                return job
+            job = ImportJob(key=key, name=name, submitted=time.time())
+            self.jobs[key] = job
+            self._evict()
+        self.executor.submit(self._run, job, content)
+        return job
+
+    def get(self, key: str) -> Optional[ImportJob]:
+        with self.lock:
+            return self.jobs.get(key)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
+
+    def _evict(self):
+        finished = [key for key, job in self.jobs.items() if not job.pending]
+        for key in finished[:max(0, len(self.jobs) - self.max_jobs)]:
+            del self.jobs[key]
+
+    def _run(self, job: ImportJob, content: bytes):
+        # Named by content hash, so concurrent uploads never share a file
+        path = self.work_dir / f"{job.key}{Path(job.name).suffix}"
+
+        def on_progress(section: str, fraction: float):
+            job.progress = fraction
+            job.message = f"Parsing {section.replace('_', ' ')}"
+
+        job.status, job.message = RUNNING, "Starting"
+        try:
+            self.work_dir.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(content)
+            job.result = self.parse(path, on_progress)
+            job.progress, job.message, job.status = 1.0, "Done", DONE
+        except Exception as e:
+            logger.exception(f"Import of {job.name} failed")
+            job.error, job.message, job.status = str(e), "Failed", FAILED
+        finally:
+            job.finished = time.time()
+            path.unlink(missing_ok=True)
@@ -0,0 +1,107 @@
+import bisect
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from safe_io import atomic_write_json, file_lock
+
+logger = logging.getLogger(__name__)
+
+
+class ItemLog:
+    """Append-only JSONL log of CV items with a date-sorted snapshot.
+
+    Adding an item appends a single line to <type>s.log.jsonl. compact()
+    merges the lines added since the last compaction into <type>s.json (the
+    newest-first list the site reads). The index file keeps the snapshot's
+    dates in ascending order plus the log offset already merged, so new
+    items are inserted by bisection instead of re-sorting everything.
+    """
+
+    def __init__(self, data_dir: Path, type: str):
+        self.data_dir = Path(data_dir)
+        self.log_path = self.data_dir / f"{type}s.log.jsonl"
+        self.snapshot_path = self.data_dir / f"{type}s.json"
+        self.index_path = self.data_dir / f"{type}s.index.json"
+
+    def append(self, item: Dict):
+        """Append one item with a single write, never touching existing data"""
+        self.extend([item])
+
+    def extend(self, items: List[Dict]):
+        """Append several items with a single write"""
+        if not items:
+            return
+        line = "".join(json.dumps(item, separators=(",", ":")) + "\n" for item in items).encode()
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        # O_APPEND makes the kernel position each write at the current end of file
+        fd = os.open(self.log_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def pending(self, offset: int = None) -> Tuple[List[Dict], int]:
+        """Items appended since the last compaction and the offset after them"""
+        if offset is None:
+            offset = self._load_index()["offset"]
+        if not self.log_path.exists():
+            return [], offset
+        items = []
+        with open(self.log_path, "rb") as f:
+            f.seek(offset)
+            for line in f:
+                # A line without a newline is an append still in progress
+                if not line.endswith(b"\n"):
+                    break
+                offset += len(line)
+                if line.strip():
+                    try:
+                        items.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        logger.warning(f"Skipping unreadable line in {self.log_path}")
+        return items, offset
+
+    def compact(self) -> int:
+        """Merge pending items into the snapshot; returns how many were added"""
+        with file_lock(self.snapshot_path):
+            return self._compact()
+
+    def _compact(self) -> int:
+        index = self._load_index()
+        new_items, offset = self.pending(index["offset"])
+        if not new_items:
+            return 0
+
+        items = self._load_snapshot()
+        dates = index["dates"]
+        if len(dates) != len(items):
+            # Snapshot edited outside the log; rebuild the index from it once
+            items.sort(key=lambda x: x.get("date", ""), reverse=True)
+            dates = [item.get("date", "") for item in reversed(items)]
+
+        for item in new_items:
+            date = item.get("date", "")
+            # Items with equal dates keep insertion order, as a stable sort would
+            pos = bisect.bisect_left(dates, date)
+            dates.insert(pos, date)
+            items.insert(len(items) - pos, item)
+
+        atomic_write_json(self.snapshot_path, items)
+        atomic_write_json(self.index_path, {"offset": offset, "dates": dates}, indent=None)
+        return len(new_items)
+
+    def _load_snapshot(self) -> List[Dict]:
+        if not self.snapshot_path.exists():
+            return []
+        with open(self.snapshot_path) as f:
+            return json.load(f)
+
+    def _load_index(self) -> Dict:
+        if not self.index_path.exists():
+            return {"offset": 0, "dates": sorted(item.get("date", "") for item in self._load_snapshot())}
+        with open(self.index_path) as f:
+            return json.load(f)
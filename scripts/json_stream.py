@@ -0,0 +1,181 @@
+import json
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Type, TypeVar
+
+if TYPE_CHECKING:
+    from pydantic import BaseModel
+
+# pydantic is imported in first_valid_object, so importing this module stays cheap
+T = TypeVar("T", bound="BaseModel")
+
+THINK_OPEN = "<think>"
+THINK_CLOSE = "</think>"
+
+
+class _TopLevelScanner:
+    """Shared state for scanners that skip text outside top-level objects"""
+
+    def __init__(self):
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._in_think = False
+        self._window = ""
+
+    def _opens_object(self, char: str) -> bool:
+        """Handle a character outside any object; True when it opens one"""
+        # Track the last few characters to spot think tags across chunks
+        self._window = (self._window + char)[-len(THINK_CLOSE):]
+        if self._in_think:
+            if self._window.endswith(THINK_CLOSE):
+                self._in_think = False
+            return False
+        if self._window.endswith(THINK_OPEN):
+            self._in_think = True
+            return False
+        return char == "{"
+
+
+class JSONObjectScanner(_TopLevelScanner):
+    """Incrementally finds top-level JSON objects in streamed LLM output.
+
+    Text outside of braces (preambles, markdown fences) and anything inside
+    <think>...</think> blocks is skipped. Chunks may split tokens, strings or
+    tags at any position.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._current: List[str] = []
+
+    def feed(self, chunk: str) -> List[str]:
+        """Consume a chunk and return the text of any objects it completed"""
+        completed = []
+        for char in chunk:
+            if self._depth == 0:
+                if self._opens_object(char):
+                    self._depth = 1
+                    self._current = [char]
+                continue
+
+            self._current.append(char)
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char == "{":
+                self._depth += 1
+            elif char == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    completed.append("".join(self._current))
+                    self._current = []
+                    self._window = ""
+        return completed
+
+
+class JSONMemberScanner(_TopLevelScanner):
+    """Incrementally yields the members of the first top-level JSON object.
+
+    Each key/value pair is returned as soon as the comma or brace after it
+    arrives, so large responses can be used section by section. A member
+    that does not parse is dropped without losing the ones before it.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._member: List[str] = []
+        self.done = False
+
+    def _flush(self) -> List[Tuple[str, Any]]:
+        text = "".join(self._member).strip()
+        self._member = []
+        if not text:
+            return []
+        try:
+            return list(json.loads("{" + text + "}").items())
+        except json.JSONDecodeError:
+            return []
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """Consume a chunk and return the members it completed"""
+        completed = []
+        for char in chunk:
+            if self.done:
+                break
+            if self._depth == 0:
+                if self._opens_object(char):
+                    self._depth = 1
+                continue
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    completed.extend(self._flush())
+                    self.done = True
+                    continue
+            elif char == "," and self._depth == 1:
+                completed.extend(self._flush())
+                continue
+            self._member.append(char)
+        return completed
+
+
+def iter_json_objects(chunks: Iterable[str]) -> Iterator[Dict]:
+    """Yield each parseable top-level JSON object found in a stream of chunks"""
+    scanner = JSONObjectScanner()
+    for chunk in chunks:
+        for text in scanner.feed(chunk):
+            try:
+                value = json.loads(text)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(value, dict):
+                yield value
+
+
+def first_valid_object(chunks: Iterable[str], model: Type[T]) -> Optional[T]:
+    """Return the first streamed object that validates against model.
+
+    Iteration stops as soon as a valid object closes, so the remainder of the
+    stream is never requested. Generators are closed to release the connection.
+    """
+    from pydantic import ValidationError
+    try:
+        for value in iter_json_objects(chunks):
+            try:
+                return model.model_validate(value)
+            except ValidationError:
+                continue
+        return None
+    finally:
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            close()
+
+
+def recording(chunks: Iterable[str], sink: Callable[[str], None]) -> Iterator[str]:
+    """Pass chunks through while handing each one to sink"""
+    try:
+        for chunk in chunks:
+            sink(chunk)
+            yield chunk
+    finally:
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            close()
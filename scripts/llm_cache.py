@@ -0,0 +1,58 @@
+import hashlib
+import json
+import logging
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from safe_io import atomic_write_json
+
+logger = logging.getLogger(__name__)
+
+
+def fingerprint(*parts: str) -> str:
+    """Stable hash of the parts that determine a cached result"""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def file_hash(path: Path) -> str:
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def set_fingerprint(hashes: Iterable[str], *parts: str) -> str:
+    """Fingerprint of an unordered set of member hashes plus extra parts"""
+    return fingerprint(*parts, *sorted(hashes))
+
+
+class JSONCache:
+    """Directory of JSON results keyed by fingerprint"""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        return self.root / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict]:
+        path = self._path(key)
+        if not path.exists():
+            return None
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except json.JSONDecodeError:
+            logger.warning(f"Ignoring corrupt cache entry {path}")
+            return None
+
+    def put(self, key: str, value: Dict):
+        """Write an entry atomically so readers never see partial files"""
+        atomic_write_json(self._path(key), value, indent=None)
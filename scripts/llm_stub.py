@@ -0,0 +1,324 @@
+"""Local stand-in for the Together completion API.
+
+Run it with
+
+    python scripts/llm_stub.py --port 8765 --latency lognormal:-1.5,0.4 --script outputs.jsonl
+
+and point the scripts at it with LLM_BASE_URL=http://127.0.0.1:8765, which
+makes config.get_llm() return a LocalLLMClient instead of the together module.
+"""
+import argparse
+import itertools
+import json
+import logging
+import random
+import re
+import threading
+import time
+import urllib.error
+import urllib.request
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from token_budget import count_tokens
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+COMPLETION_PATHS = {"/inference", "/api/inference", "/v1/completions"}
+
+DEFAULT_OUTPUT = {
+    "primary_area": "AI in Education",
+    "secondary_areas": [],
+    "keywords": ["stub"],
+    "collaborators": []
+}
+
+
+@dataclass
+class ScriptRule:
+    """Scripted completion returned when the prompt matches a pattern"""
+    output: str
+    match: Optional[str] = None
+    preamble: str = ""
+    model: Optional[str] = None
+
+
+@dataclass
+class StubSettings:
+    """Behaviour of the stub server"""
+    latency: str = "fixed:0"
+    tokens_per_second: float = 0.0
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    retry_after: float = 1.0
+    rules: List[ScriptRule] = field(default_factory=list)
+    seed: Optional[int] = None
+
+
+def parse_latency(spec: str, rng: random.Random) -> float:
+    """Draw a latency in seconds from a spec such as 'normal:0.5,0.1'"""
+    kind, _, args = spec.partition(":")
+    values = [float(v) for v in args.split(",") if v]
+    if kind == "fixed":
+        return values[0] if values else 0.0
+    if kind == "uniform":
+        return rng.uniform(values[0], values[1])
+    if kind == "normal":
+        return max(0.0, rng.gauss(values[0], values[1]))
+    if kind == "lognormal":
+        return rng.lognormvariate(values[0], values[1])
+    if kind == "exponential":
+        return rng.expovariate(1 / values[0])
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+
+def load_rules(path: Path) -> List[ScriptRule]:
+    """Load scripted outputs from a JSONL file"""
+    rules = []
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            output = entry["output"]
+            if not isinstance(output, str):
+                output = json.dumps(output)
+            rules.append(ScriptRule(output=output, match=entry.get("match"),
+                                    preamble=entry.get("preamble", ""), model=entry.get("model")))
+    return rules
+
+
+def split_stream_tokens(text: str) -> List[str]:
+    """Split text into token-sized pieces for streaming"""
+    return re.findall(r"\s*[^\s]{1,4}|\s+$", text)
+
+
+class StubLLM:
+    """Chooses outputs and simulated timings for incoming requests"""
+
+    def __init__(self, settings: StubSettings):
+        self.settings = settings
+        self.rng = random.Random(settings.seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        patterned = [rule for rule in settings.rules if rule.match]
+        defaults = [rule for rule in settings.rules if not rule.match]
+        self._patterned = [(re.compile(rule.match, re.IGNORECASE), rule) for rule in patterned]
+        self._defaults = itertools.cycle(defaults or [ScriptRule(output=json.dumps(DEFAULT_OUTPUT))])
+
+    def next_fault(self) -> Optional[int]:
+        """Decide whether this request fails, returning the HTTP status"""
+        with self.lock:
+            self.requests += 1
+            roll = self.rng.random()
+        if roll < self.settings.rate_limit_rate:
+            return 429
+        if roll < self.settings.rate_limit_rate + self.settings.error_rate:
+            return 500
+        return None
+
+    def latency(self) -> float:
+        with self.lock:
+            return parse_latency(self.settings.latency, self.rng)
+
+    def completion(self, prompt: str, model: Optional[str], max_tokens: int) -> str:
+        """Pick the scripted output for a prompt, truncated to max_tokens"""
+        rule = next((r for pattern, r in self._patterned
+                     if pattern.search(prompt) and r.model in (None, model)), None)
+        if rule is None:
+            with self.lock:
+                rule = next(self._defaults)
+        pieces = split_stream_tokens(rule.preamble + rule.output)
+        return "".join(pieces[:max_tokens])
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """HTTP handler speaking the subset of the completion API the scripts use"""
+    stub: StubLLM = None
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+    def _send_json(self, status: int, payload: Dict, headers: Optional[Dict] = None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, {"status": "ok", "requests": self.stub.requests})
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        if self.path not in COMPLETION_PATHS:
+            self._send_json(404, {"error": "not found"})
+            return
+
+        length = int(self.headers.get("Content-Length", 0))
+        params = json.loads(self.rfile.read(length) or b"{}")
+
+        fault = self.stub.next_fault()
+        if fault == 429:
+            self._send_json(429, {"error": "rate limited"},
+                            {"Retry-After": str(self.stub.settings.retry_after)})
+            return
+        if fault:
+            self._send_json(fault, {"error": "injected failure"})
+            return
+
+        time.sleep(self.stub.latency())
+        prompt = params.get("prompt", "")
+        text = self.stub.completion(prompt, params.get("model"), int(params.get("max_tokens", 512)))
+        rate = self.stub.settings.tokens_per_second
+
+        if params.get("stream_tokens") or params.get("stream"):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.end_headers()
+            try:
+                for piece in split_stream_tokens(text):
+                    if rate:
+                        time.sleep(1 / rate)
+                    event = {"choices": [{"text": piece}]}
+                    self.wfile.write(f"data: {json.dumps(event)}\n\n".encode())
+                    self.wfile.flush()
+                self.wfile.write(b"data: [DONE]\n\n")
+            except (BrokenPipeError, ConnectionResetError):
+                # Client stopped reading early, which is expected for early-stop parsing
+                pass
+            return
+
+        if rate:
+            time.sleep(len(split_stream_tokens(text)) / rate)
+        self._send_json(200, {
+            "status": "finished",
+            "model": params.get("model"),
+            "output": {
+                "choices": [{"text": text}],
+                "usage": {
+                    "prompt_tokens": count_tokens(prompt),
+                    "completion_tokens": count_tokens(text)
+                }
+            }
+        })
+
+
+class LLMHTTPError(Exception):
+    """Error status returned by the completion endpoint"""
+
+    def __init__(self, status: int, retry_after: Optional[float] = None):
+        super().__init__(f"Completion request failed with HTTP {status}")
+        self.status = status
+        self.retry_after = retry_after
+
+
+class _Complete:
+    def __init__(self, base_url: str, timeout: float):
+        self.url = base_url.rstrip("/") + "/inference"
+        self.timeout = timeout
+
+    def _open(self, params: Dict):
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps(params).encode(),
+            headers={"Content-Type": "application/json"}
+        )
+        try:
+            return urllib.request.urlopen(request, timeout=self.timeout)
+        except urllib.error.HTTPError as e:
+            retry_after = e.headers.get("Retry-After")
+            raise LLMHTTPError(e.code, float(retry_after) if retry_after else None) from None
+
+    def create(self, **params) -> Dict:
+        with self._open(params) as response:
+            return json.load(response)
+
+    def create_streaming(self, **params) -> Iterator[str]:
+        with self._open(dict(params, stream_tokens=True)) as response:
+            for line in response:
+                line = line.decode().strip()
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    return
+                yield json.loads(data)["choices"][0]["text"]
+
+
+class LocalLLMClient:
+    """Drop-in for the together module's Complete API against a local URL"""
+
+    def __init__(self, base_url: str, timeout: float = 60.0):
+        self.base_url = base_url
+        self.Complete = _Complete(base_url, timeout)
+
+
+def make_server(settings: StubSettings, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """Create a stub server; port 0 picks a free port"""
+    handler = type("BoundStubHandler", (StubHandler,), {"stub": StubLLM(settings)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def serve_in_background(settings: StubSettings) -> ThreadingHTTPServer:
+    """Start a stub server on a free port in a daemon thread"""
+    server = make_server(settings)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def server_url(server: ThreadingHTTPServer) -> str:
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in LLM completion server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", default="fixed:0",
+                        help="Latency distribution: fixed:S, uniform:A,B, normal:MU,SD, "
+                             "lognormal:MU,SIGMA or exponential:MEAN")
+    parser.add_argument("--tokens-per-second", type=float, default=0.0,
+                        help="Simulated generation rate (0 = instant)")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="Fraction of requests answered with HTTP 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0,
+                        help="Fraction of requests answered with HTTP 429")
+    parser.add_argument("--retry-after", type=float, default=1.0,
+                        help="Retry-After seconds sent with 429 responses")
+    parser.add_argument("--script", type=str,
+                        help="JSONL of {match, model, output, preamble} scripted completions")
+    parser.add_argument("--seed", type=int, help="Random seed for reproducible runs")
+    args = parser.parse_args()
+
+    settings = StubSettings(
+        latency=args.latency,
+        tokens_per_second=args.tokens_per_second,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after,
+        rules=load_rules(Path(args.script)) if args.script else [],
+        seed=args.seed
+    )
+    server = make_server(settings, args.host, args.port)
+    logger.info(f"Stub LLM listening on {server_url(server)}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Shutting down")
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+"""Instrumentation for completion calls.
+
+TracedLLM wraps every client returned by config.get_llm() and records one row
+per completion call (model, tokens, wall time, retries, cache hit/miss, parse
+success). Rows are kept in memory for the end-of-run summary and, when a trace
+path is given, appended to a JSONL trace that loads straight into pandas:
+
+    pd.read_json("output/llm_trace.jsonl", lines=True)
+"""
+import contextlib
+import json
+import logging
+import statistics
+import threading
+import time
+import uuid
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from token_budget import count_tokens
+
+logger = logging.getLogger(__name__)
+
+# USD per million (prompt, completion) tokens; models not listed are reported without cost
+PRICES_PER_MILLION: Dict[str, Tuple[float, float]] = {
+    "deepseek-ai/DeepSeek-R1-Distill-Llama-70B-free": (0.0, 0.0),
+    "meta-llama/Llama-3.3-70B-Instruct-Turbo": (0.88, 0.88),
+    "meta-llama/Meta-Llama-3.1-8B-Instruct-Turbo": (0.18, 0.18),
+    "mistral-7b-instruct": (0.20, 0.20),
+}
+
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+
+@dataclass
+class CallRecord:
+    """One completion call (or cache lookup) in a run"""
+    run_id: str
+    label: str
+    model: str
+    started_at: float
+    wall_time_s: float = 0.0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    streamed: bool = False
+    retries: int = 0
+    cache: Optional[str] = None
+    parse_ok: Optional[bool] = None
+    error: Optional[str] = None
+    cost_usd: Optional[float] = None
+
+
+def _is_retryable(error: Exception) -> bool:
+    status = getattr(error, "status", None) or getattr(error, "status_code", None)
+    return status in RETRYABLE_STATUSES
+
+
+def _retry_delay(error: Exception, attempt: int) -> float:
+    retry_after = getattr(error, "retry_after", None)
+    return retry_after if retry_after is not None else min(2 ** attempt * 0.5, 8.0)
+
+
+class TracedLLM:
+    """Client wrapper recording every completion call.
+
+    Given connect instead of a client, the client is created by the first
+    call that needs it, so cache lookups are recorded from the start of a
+    run that may never call the LLM.
+    """
+
+    def __init__(self, llm, trace_path: Optional[Path] = None, run_name: Optional[str] = None,
+                 max_retries: int = 3, connect: Optional[Callable[[], object]] = None):
+        self._client = llm
+        self._connect = connect
+        self._connect_lock = threading.Lock()
+        self.trace_path = Path(trace_path) if trace_path else None
+        self.run_id = run_name or uuid.uuid4().hex[:8]
+        self.max_retries = max_retries
+        self.records: List[CallRecord] = []
+        self._pending: Dict[int, CallRecord] = {}
+        self.Complete = _TracedComplete(self)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        if self.trace_path:
+            self.trace_path.parent.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def llm(self):
+        """The wrapped client, connected on first use"""
+        if self._client is None and self._connect is not None:
+            # Several threads can make their first call at the same time
+            with self._connect_lock:
+                if self._client is None:
+                    self._client = self._connect()
+        return self._client
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.llm, name)
+
+    # Call bookkeeping
+
+    def _label(self) -> str:
+        return getattr(self._local, "label", None) or "completion"
+
+    def _start(self, model: str, streamed: bool = False) -> CallRecord:
+        # The previous call on this thread can no longer receive a parse result
+        self._write(getattr(self._local, "last", None))
+        record = CallRecord(run_id=self.run_id, label=self._label(), model=model,
+                            started_at=time.time(), streamed=streamed)
+        self._local.last = record
+        return record
+
+    def _finish(self, record: CallRecord, prompt: str, completion: str, started: float):
+        record.wall_time_s = round(time.perf_counter() - started, 4)
+        record.prompt_tokens = count_tokens(prompt)
+        record.completion_tokens = count_tokens(completion)
+        price = PRICES_PER_MILLION.get(record.model)
+        if price is not None:
+            record.cost_usd = round(
+                (record.prompt_tokens * price[0] + record.completion_tokens * price[1]) / 1e6, 6)
+        with self._lock:
+            self.records.append(record)
+            self._pending[id(record)] = record
+
+    def _write(self, record: Optional[CallRecord]):
+        """Append a finished record to the trace file once"""
+        if record is None:
+            return
+        with self._lock:
+            if self._pending.pop(id(record), None) is None or not self.trace_path:
+                return
+            with open(self.trace_path, "a") as f:
+                f.write(json.dumps(asdict(record)) + "\n")
+
+    def flush(self):
+        """Write all records that are still waiting for a parse result"""
+        for record in list(self._pending.values()):
+            self._write(record)
+
+    @contextlib.contextmanager
+    def label(self, name: str):
+        """Label the calls made inside the block"""
+        previous = getattr(self._local, "label", None)
+        self._local.label = name
+        try:
+            yield
+        finally:
+            self._local.label = previous
+
+    def note_parse(self, ok: bool):
+        """Mark whether the most recent call on this thread parsed successfully"""
+        record = getattr(self._local, "last", None)
+        if record is None:
+            return
+        record.parse_ok = ok
+        self._write(record)
+
+    def note_cache(self, model: str, hit: bool, label: Optional[str] = None):
+        """Record a cache lookup as a zero-cost row"""
+        record = self._start(model)
+        record.label = label or record.label
+        record.cache = "hit" if hit else "miss"
+        record.cost_usd = 0.0
+        with self._lock:
+            self.records.append(record)
+            self._pending[id(record)] = record
+        self._write(record)
+
+    # Reporting
+
+    def summary(self) -> Dict:
+        """Aggregate records by label and model"""
+        groups: Dict[Tuple[str, str], List[CallRecord]] = {}
+        for record in self.records:
+            groups.setdefault((record.label, record.model), []).append(record)
+
+        rows = []
+        for (label, model), records in sorted(groups.items()):
+            calls = [r for r in records if r.cache is None]
+            times = sorted(r.wall_time_s for r in calls) or [0.0]
+            costs = [r.cost_usd for r in calls if r.cost_usd is not None]
+            rows.append({
+                "label": label,
+                "model": model,
+                "calls": len(calls),
+                "cache_hits": sum(1 for r in records if r.cache == "hit"),
+                "cache_misses": sum(1 for r in records if r.cache == "miss"),
+                "prompt_tokens": sum(r.prompt_tokens for r in calls),
+                "completion_tokens": sum(r.completion_tokens for r in calls),
+                "wall_time_s": round(sum(times), 3),
+                "p50_s": round(statistics.median(times), 3),
+                "p95_s": round(times[min(len(times) - 1, int(0.95 * len(times)))], 3),
+                "retries": sum(r.retries for r in calls),
+                "errors": sum(1 for r in calls if r.error),
+                "parse_failures": sum(1 for r in records if r.parse_ok is False),
+                "cost_usd": round(sum(costs), 4) if costs else None,
+            })
+        return {"run_id": self.run_id, "groups": rows}
+
+    def log_summary(self):
+        """Log a one-line-per-group table of the run"""
+        self.flush()
+        summary = self.summary()
+        if not summary["groups"]:
+            return
+        logger.info(f"LLM calls for run {self.run_id}:")
+        for row in summary["groups"]:
+            cost = f"${row['cost_usd']:.4f}" if row["cost_usd"] is not None else "n/a"
+            logger.info(
+                f"  {row['label']:<16} {row['model']:<48} calls={row['calls']} "
+                f"hits={row['cache_hits']} misses={row['cache_misses']} tokens={row['prompt_tokens']}+{row['completion_tokens']} "
+                f"wall={row['wall_time_s']}s p50={row['p50_s']}s p95={row['p95_s']}s "
+                f"retries={row['retries']} errors={row['errors']} "
+                f"parse_failures={row['parse_failures']} cost={cost}"
+            )
+        if self.trace_path:
+            logger.info(f"Trace written to {self.trace_path}")
+
+
+class _TracedComplete:
+    def __init__(self, tracer: TracedLLM):
+        self.tracer = tracer
+
+    def _call_with_retries(self, record: CallRecord, fn, params: Dict):
+        attempt = 0
+        while True:
+            try:
+                return fn(**params)
+            except Exception as e:
+                if attempt >= self.tracer.max_retries or not _is_retryable(e):
+                    raise
+                delay = _retry_delay(e, attempt)
+                logger.warning(f"Retrying completion after {e} (waiting {delay:.1f}s)")
+                time.sleep(delay)
+                attempt += 1
+                record.retries = attempt
+
+    def create(self, **params):
+        tracer = self.tracer
+        record = tracer._start(params.get("model", ""))
+        started = time.perf_counter()
+        completion = ""
+        try:
+            response = self._call_with_retries(record, tracer.llm.Complete.create, params)
+            try:
+                completion = response['output']['choices'][0]['text']
+            except (KeyError, IndexError, TypeError):
+                pass
+            return response
+        except Exception as e:
+            record.error = str(e)
+            raise
+        finally:
+            tracer._finish(record, params.get("prompt", ""), completion, started)
+
+    def create_streaming(self, **params) -> Iterator[str]:
+        tracer = self.tracer
+        record = tracer._start(params.get("model", ""), streamed=True)
+        started = time.perf_counter()
+        chunks = []
+        try:
+            # Retries are only possible until the first chunk arrives
+            stream = self._call_with_retries(
+                record, lambda **p: _prime(tracer.llm.Complete.create_streaming(**p)), params)
+            for chunk in stream:
+                chunks.append(chunk)
+                yield chunk
+        except Exception as e:
+            record.error = str(e)
+            raise
+        finally:
+            tracer._finish(record, params.get("prompt", ""), "".join(chunks), started)
+
+
+def _prime(stream: Iterator[str]) -> Iterator[str]:
+    """Pull the first chunk eagerly so connection errors surface immediately"""
+    try:
+        first = next(stream)
+    except StopIteration:
+        return iter(())
+
+    def chained():
+        yield first
+        yield from stream
+    return chained()
+
+
+def call_label(llm, name: str):
+    """Label calls on a traced client; a no-op for plain clients"""
+    if isinstance(llm, TracedLLM):
+        return llm.label(name)
+    return contextlib.nullcontext()
+
+
+def note_parse(llm, ok: bool):
+    """Report parse success of the last call on a traced client"""
+    if isinstance(llm, TracedLLM):
+        llm.note_parse(ok)
+
+
+def note_cache(llm, model: str, hit: bool, label: Optional[str] = None):
+    """Report a cache hit or miss on a traced client"""
+    if isinstance(llm, TracedLLM):
+        llm.note_cache(model, hit, label)
+
+
+def log_summary(llm):
+    """Log the run summary of a traced client"""
+    if isinstance(llm, TracedLLM):
+        llm.log_summary()
@@ -0,0 +1,286 @@
+"""Incremental runner for the data pipeline.
+
+Stages are commands with declared input and output files. A stage runs only
+when the content of its inputs, its outputs or its command changed since
+its last successful run; otherwise it is skipped. Stages depend on the
+earlier stages that write a file they read or write, and stages that do not
+depend on each other run in parallel.
+
+File contents are hashed once and reused while a file's (mtime, size,
+inode) stamp is unchanged, so a build with nothing to do only stats files.
+
+Manual stages run only when asked for by name. parse-cv and enrich-dois
+are manual: they regenerate the committed publications.json from the CV
+(and query Crossref), which a plain build must not do.
+
+    python scripts/pipeline.py                  run what is out of date
+    python scripts/pipeline.py --dry-run        show what would run
+    python scripts/pipeline.py --include parse-cv --include enrich-dois
+    python scripts/pipeline.py --force classify-research
+"""
+import argparse
+import glob
+import json
+import logging
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from llm_cache import file_hash, fingerprint
+from safe_io import atomic_write_json
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+
+STATE_FILE = Path(".pipeline/state.json")
+CV_FILE = "src/data/cv/CV_ion.tex"
+PUBLICATIONS_FILE = "src/data/publications.json"
+
+RAN, SKIPPED, FAILED, BLOCKED = "ran", "skipped", "failed", "blocked"
+
+
+@dataclass
+class Stage:
+    """One step of the pipeline; inputs and outputs may be glob patterns"""
+    name: str
+    command: List[str]
+    inputs: List[str]
+    outputs: List[str]
+    after: List[str] = field(default_factory=list)
+    # Outputs a later stage rewrites; only their existence is checked
+    handed_on: List[str] = field(default_factory=list)
+    # Runs only when named with --only, --include or --force
+    manual: bool = False
+
+
+def python(script: str, *args: str) -> List[str]:
+    return [sys.executable, script, *args]
+
+
+STAGES = [
+    Stage("parse-cv", python("src/scripts/cv_to_json.py", CV_FILE, "--output", PUBLICATIONS_FILE),
+          inputs=[CV_FILE, "src/scripts/cv_to_json.py"],
+          outputs=[PUBLICATIONS_FILE], manual=True),
+    Stage("enrich-dois", python("src/scripts/find_dois.py", "--json-path", PUBLICATIONS_FILE),
+          inputs=[PUBLICATIONS_FILE, "src/scripts/find_dois.py"],
+          outputs=[PUBLICATIONS_FILE], manual=True),
+    Stage("classify-research", python("scripts/research_classifier.py", "--input", CV_FILE,
+                                      "--output", "src/data/research"),
+          inputs=[CV_FILE, "scripts/research_classifier.py", "scripts/config.py", "scripts/token_budget.py",
+                  "scripts/json_stream.py"],
+          outputs=["src/data/research/research_areas.json", "src/data/research/classification_usage.json"]),
+    Stage("compact-cv", python("scripts/cv_updater.py", "compact"),
+          inputs=["src/data/cv/*.log.jsonl", "src/data/content.db", "scripts/cv_updater.py",
+                  "scripts/item_log.py", "scripts/content_store.py"],
+          outputs=["src/data/cv/*s.json", "src/data/cv/*s.index.json", "src/data/research/areas.json"]),
+    Stage("author-index", python("scripts/author_index.py"),
+          inputs=[PUBLICATIONS_FILE, "src/data/research/publications.json",
+                  "src/data/cv/publications_and_presentations.json", "src/data/authors.json",
+                  "scripts/author_index.py"],
+          outputs=["src/data/author-index.json"]),
+    Stage("search-index", python("scripts/search_index.py"),
+          inputs=[PUBLICATIONS_FILE, "scripts/search_index.py", "scripts/publication_bundles.py"],
+          outputs=["public/data/search/index.json", "public/data/search/index.json.*"]),
+    Stage("bundles", python("scripts/publication_bundles.py"),
+          inputs=[PUBLICATIONS_FILE, "src/data/authors.json", "src/data/author-index.json",
+                  "scripts/publication_bundles.py"],
+          outputs=["public/data/publications/manifest.json", "public/data/publications/*.json",
+                   "public/data/publications/*.json.*"]),
+]
+
+
+def link_stages(stages: Sequence[Stage]) -> List[Stage]:
+    """Fill in each stage's dependencies on earlier stages.
+
+    A stage comes after every earlier stage that writes a file it reads or
+    writes, so stages that rewrite a file in place (enrich-dois) are ordered
+    after the stage that created it and before the stages that read it. The
+    earlier stage's copy of such a file is handed on: its later content is
+    not the earlier stage's doing, so it must not make that stage rerun.
+    """
+    for i, stage in enumerate(stages):
+        touched = set(stage.inputs) | set(stage.outputs)
+        for earlier in stages[:i]:
+            shared = touched & set(earlier.outputs)
+            if shared and earlier.name not in stage.after:
+                stage.after.append(earlier.name)
+            for path in shared & set(stage.outputs):
+                if path not in earlier.handed_on:
+                    earlier.handed_on.append(path)
+    return list(stages)
+
+
+class Fingerprints:
+    """Content hashes of files, remembered by stat stamp between runs"""
+
+    def __init__(self, known: Optional[Dict] = None):
+        self.known: Dict[str, Dict] = dict(known or {})
+        self.lock = threading.Lock()
+
+    def file(self, path: str) -> str:
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return "missing"
+        stamp = [st.st_mtime_ns, st.st_size, st.st_ino]
+        with self.lock:
+            cached = self.known.get(path)
+        if cached and cached["stamp"] == stamp:
+            return cached["hash"]
+        digest = file_hash(Path(path))
+        with self.lock:
+            self.known[path] = {"stamp": stamp, "hash": digest}
+        return digest
+
+    def paths(self, patterns: Iterable[str]) -> Dict[str, str]:
+        """Path -> hash for every file the patterns name"""
+        found = {}
+        for pattern in patterns:
+            if glob.has_magic(pattern):
+                for path in sorted(glob.glob(pattern)):
+                    found[path] = self.file(path)
+            else:
+                found[pattern] = self.file(pattern)
+        return found
+
+
+def command_text(stage: Stage) -> str:
+    """The command without the interpreter path, so switching venvs is not a change"""
+    command = stage.command[1:] if stage.command[0] == sys.executable else stage.command
+    return " ".join(command)
+
+
+def stage_key(stage: Stage, inputs: Dict[str, str], outputs: Dict[str, str]) -> str:
+    parts = [command_text(stage)]
+    parts += [f"in {path} {digest}" for path, digest in sorted(inputs.items())]
+    parts += [f"out {path} {digest}" for path, digest in sorted(outputs.items())]
+    return fingerprint(*parts)
+
+
+class Pipeline:
+    """Runs stages whose fingerprint changed, independent ones in parallel"""
+
+    def __init__(self, stages: Sequence[Stage], state_path: Path = STATE_FILE, workers: int = 4):
+        self.stages = {stage.name: stage for stage in link_stages(stages)}
+        self.state_path = Path(state_path)
+        self.workers = workers
+        self.state = self._load_state()
+        self.fingerprints = Fingerprints(self.state.get("files"))
+        self.lock = threading.Lock()
+
+    def _load_state(self) -> Dict:
+        try:
+            with open(self.state_path) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _save_state(self):
+        with self.lock:
+            with self.fingerprints.lock:
+                self.state["files"] = dict(self.fingerprints.known)
+            atomic_write_json(self.state_path, self.state, indent=None)
+
+    def key(self, stage: Stage) -> str:
+        outputs = self.fingerprints.paths(p for p in stage.outputs if p not in stage.handed_on)
+        for path, digest in self.fingerprints.paths(stage.handed_on).items():
+            outputs[path] = "missing" if digest == "missing" else "present"
+        return stage_key(stage, self.fingerprints.paths(stage.inputs), outputs)
+
+    def up_to_date(self, stage: Stage) -> bool:
+        return self.state.get("stages", {}).get(stage.name) == self.key(stage)
+
+    def _execute(self, stage: Stage, dry_run: bool, force: bool) -> str:
+        if not force and self.up_to_date(stage):
+            return SKIPPED
+        if dry_run:
+            return RAN
+        logger.info(f"[{stage.name}] {' '.join(stage.command)}")
+        started = time.perf_counter()
+        if subprocess.run(stage.command).returncode != 0:
+            return FAILED
+        logger.info(f"[{stage.name}] done in {time.perf_counter() - started:.1f}s")
+        # Recorded after the run, so files a stage rewrites in place count as its output
+        with self.lock:
+            self.state.setdefault("stages", {})[stage.name] = self.key(stage)
+        self._save_state()
+        return RAN
+
+    def run(self, only: Iterable[str] = (), skip: Iterable[str] = (), force: Iterable[str] = (),
+            dry_run: bool = False, include: Iterable[str] = ()) -> Dict[str, str]:
+        """Stage name -> outcome; a failed stage blocks the stages after it.
+
+        Without only, every stage that is not manual is considered, plus the
+        manual stages named in include or force.
+        """
+        skip, force, include = set(skip), set(force), set(include)
+        wanted = set(only) or {name for name, stage in self.stages.items() if not stage.manual} | include | force
+        unknown = (wanted | skip | force | include) - set(self.stages)
+        if unknown:
+            raise ValueError(f"Unknown stages: {', '.join(sorted(unknown))}")
+
+        results = {name: SKIPPED for name in self.stages if name not in wanted or name in skip}
+        running = {}
+        with ThreadPoolExecutor(self.workers, thread_name_prefix="stage") as pool:
+            while len(results) < len(self.stages):
+                for name, stage in self.stages.items():
+                    if name in results or name in running.values():
+                        continue
+                    if any(results.get(dep) in (FAILED, BLOCKED) for dep in stage.after):
+                        results[name] = BLOCKED
+                    elif all(dep in results for dep in stage.after):
+                        # A dry run cannot know whether upstream output would change
+                        force_stage = name in force or dry_run and any(results[d] == RAN for d in stage.after)
+                        running[pool.submit(self._execute, stage, dry_run, force_stage)] = name
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    results[running.pop(future)] = future.result()
+        if not dry_run:
+            self._save_state()
+        return {name: results[name] for name in self.stages}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the out-of-date stages of the data pipeline")
+    parser.add_argument("--only", action="append", default=[], metavar="STAGE",
+                        help="Run just this stage (repeatable)")
+    parser.add_argument("--include", action="append", default=[], metavar="STAGE",
+                        help="Also run this manual stage if it is out of date (repeatable)")
+    parser.add_argument("--skip", action="append", default=[], metavar="STAGE",
+                        help="Leave this stage out (repeatable)")
+    parser.add_argument("--force", action="append", default=[], metavar="STAGE",
+                        help="Run this stage even if it is up to date (repeatable)")
+    parser.add_argument("--dry-run", action="store_true", help="Show which stages would run")
+    parser.add_argument("--workers", type=int, default=4, help="Stages to run at the same time")
+    parser.add_argument("--list", action="store_true", help="List the stages and their dependencies")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    pipeline = Pipeline(STAGES, workers=args.workers)
+    if args.list:
+        for stage in pipeline.stages.values():
+            after = f" (after {', '.join(stage.after)})" if stage.after else ""
+            print(f"{stage.name}{after}{' [manual]' if stage.manual else ''}")
+        return
+    try:
+        results = pipeline.run(args.only, args.skip, args.force, args.dry_run, args.include)
+    except ValueError as e:
+        parser.error(str(e))
+    verb = "would run" if args.dry_run else RAN
+    for name, outcome in results.items():
+        logger.info(f"{name}: {verb if outcome == RAN else outcome}")
+    logger.info(f"Pipeline finished in {time.perf_counter() - started:.2f}s")
+    if FAILED in results.values():
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""Build-time publication bundles for the site.
+
+Does the work /api/publications would repeat on every request once, at
+build time: authors are joined with authors.json, also under the variant
+spellings the canonical author index maps to its entries, deduplicated and
+normalised, and publications are sorted newest first. The result is written
+to public/data/publications as static shards:
+
+    all.<hash>.json            {"publications": [...], "grants": [...]}, the API's shape
+    year-<year>.<hash>.json    publications of one year
+    type-<type>.<hash>.json    publications of one type
+    talks.<hash>.json, grants.<hash>.json
+    manifest.json              shard name -> file, count and sizes
+
+Shard file names carry a content hash, so they can be cached forever; only
+manifest.json has to be revalidated. Every shard also gets .gz and (when
+the brotli package is installed) .br variants. /api/publications serves
+the "all" shard, precompressed when the client accepts it, as long as the
+source hashes in the manifest match the current data files; otherwise it
+falls back to building the same payload with src/utils/publicationPayload.mjs,
+which mirrors build_bundles. Unchanged shards are not rewritten.
+
+    python scripts/publication_bundles.py
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+import re
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from safe_io import atomic_write_bytes, atomic_write_json
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DATA_ROOT = Path("src/data")
+PUBLICATIONS_FILE = DATA_ROOT / "publications.json"
+AUTHORS_FILE = DATA_ROOT / "authors.json"
+AUTHOR_INDEX_FILE = DATA_ROOT / "author-index.json"
+OUTPUT_DIR = Path("public/data/publications")
+MANIFEST = "manifest.json"
+
+# Shard files this script owns in the output directory
+SHARD_FILE = re.compile(r"^[\w.-]+\.[0-9a-f]{12}\.json(\.gz|\.br)?$")
+
+
+def normalize_author_name(name: str) -> str:
+    """Comparison form of an author name, as the publications API uses"""
+    return re.sub(r"[.\s]", "", name.lower())
+
+
+def author_index(authors: Dict[str, Dict], aliases: Dict[str, str] = None) -> Dict[str, str]:
+    """Normalised name -> authors.json key, for names written slightly differently.
+
+    aliases (variant -> canonical name, from author_index.py) also map the
+    variants of authors whose canonical name is in authors.json.
+    """
+    index = {normalize_author_name(name): name for name in authors}
+    for variant, canonical in (aliases or {}).items():
+        if canonical in authors:
+            index.setdefault(normalize_author_name(variant), canonical)
+    return index
+
+
+def join_authors(pub: Dict, authors: Dict[str, Dict], index: Dict[str, str]) -> Dict:
+    """A publication with deduplicated authors and the details of just those authors"""
+    raw = pub.get("authors") or []
+    names, seen = [], set()
+    for name in raw if isinstance(raw, list) else [raw]:
+        name = (name or "").strip()
+        if name and normalize_author_name(name) not in seen:
+            seen.add(normalize_author_name(name))
+            names.append(name)
+
+    joined = {k: v for k, v in pub.items() if k != "location"}
+    # location holds an author name in the CV export; keep it only when it is a place
+    if pub.get("location") and pub["location"] not in raw:
+        joined["location"] = pub["location"]
+    joined["authors"] = names
+    details = {}
+    for name in names:
+        key = name if name in authors else index.get(normalize_author_name(name))
+        if key:
+            details[name] = authors[key]
+    joined["authorDetails"] = details
+    return joined
+
+
+def sort_key(pub: Dict):
+    """Newest first; undated entries last; then by title"""
+    year = pub.get("year")
+    return (-year if isinstance(year, int) else 1, (pub.get("title") or "").lower())
+
+
+def build_bundles(data: Dict, authors: Dict[str, Dict], aliases: Dict[str, str] = None) -> Dict[str, Dict]:
+    """Shard name -> payload"""
+    index = author_index(authors, aliases)
+    publications = sorted((join_authors(p, authors, index) for p in data.get("publications", [])),
+                          key=sort_key)
+    talks = sorted((join_authors(p, authors, index) for p in data.get("talks", [])), key=sort_key)
+    grants = data.get("grants") or []
+
+    bundles = {
+        "all": {"publications": publications, "grants": grants},
+        "talks": {"publications": talks},
+        "grants": {"grants": grants},
+    }
+    for pub in publications:
+        year = pub.get("year") if isinstance(pub.get("year"), int) else "undated"
+        bundles.setdefault(f"year-{year}", {"publications": []})["publications"].append(pub)
+        pub_type = re.sub(r"[^\w-]", "_", pub.get("type") or "other")
+        bundles.setdefault(f"type-{pub_type}", {"publications": []})["publications"].append(pub)
+    return bundles
+
+
+def encode(payload: Dict) -> bytes:
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def compressors() -> Dict[str, callable]:
+    """Suffix -> compress function for the available encodings"""
+    found = {".gz": lambda data: gzip.compress(data, compresslevel=9, mtime=0)}
+    try:
+        import brotli
+    except ImportError:
+        logger.info("brotli is not installed; writing gzip variants only")
+    else:
+        found[".br"] = lambda data: brotli.compress(data, quality=11)
+    return found
+
+
+def write_bundles(bundles: Dict[str, Dict], output_dir: Path, sources: Dict[str, str]) -> Dict:
+    """Write shards that changed, remove stale ones and return the manifest"""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    encoders = compressors()
+    files, written = {}, 0
+    for name in sorted(bundles):
+        data = encode(bundles[name])
+        digest = hashlib.sha256(data).hexdigest()[:12]
+        path = output_dir / f"{name}.{digest}.json"
+        entry = {"path": path.name, "count": sum(len(v) for v in bundles[name].values()), "bytes": len(data)}
+        if not path.exists():
+            atomic_write_bytes(path, data)
+            written += 1
+        for suffix, compress in encoders.items():
+            variant = path.with_name(path.name + suffix)
+            if not variant.exists():
+                atomic_write_bytes(variant, compress(data))
+            entry[suffix.lstrip(".")] = variant.stat().st_size
+        files[name] = entry
+
+    keep = {MANIFEST} | {entry["path"] + suffix for entry in files.values() for suffix in ("", *encoders)}
+    for path in output_dir.iterdir():
+        if path.name not in keep and SHARD_FILE.match(path.name):
+            path.unlink()
+
+    version = hashlib.sha256("".join(f["path"] for f in files.values()).encode()).hexdigest()[:12]
+    manifest = {"version": version, "sources": sources, "encodings": sorted(s.lstrip(".") for s in encoders),
+                "files": files}
+    atomic_write_json(output_dir / MANIFEST, manifest)
+    logger.info(f"Wrote {written} of {len(files)} publication shards to {output_dir}")
+    return manifest
+
+
+def file_hash(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()[:12]
+
+
+def up_to_date(output_dir: Path, sources: Dict[str, str]) -> Optional[Dict]:
+    """The existing manifest if it was built from these sources and its files exist"""
+    try:
+        with open(output_dir / MANIFEST) as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    if manifest.get("sources") != sources:
+        return None
+    if not all((output_dir / entry["path"]).exists() for entry in manifest.get("files", {}).values()):
+        return None
+    return manifest
+
+
+def read_json(path: Path, key: str) -> Dict:
+    if not path.exists():
+        return {}
+    with open(path) as f:
+        return json.load(f).get(key, {})
+
+
+def build(publications_path: Path = PUBLICATIONS_FILE, authors_path: Path = AUTHORS_FILE,
+          output_dir: Path = OUTPUT_DIR, force: bool = False, index_path: Path = AUTHOR_INDEX_FILE) -> Dict:
+    sources = {publications_path.name: file_hash(publications_path)}
+    for path in (authors_path, index_path):
+        sources[path.name] = file_hash(path) if path.exists() else ""
+    manifest = None if force else up_to_date(output_dir, sources)
+    if manifest:
+        logger.info("Publication bundles are up to date")
+        return manifest
+    with open(publications_path) as f:
+        data = json.load(f)
+    bundles = build_bundles(data, read_json(authors_path, "authors"), read_json(index_path, "aliases"))
+    return write_bundles(bundles, output_dir, sources)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build static publication bundles for the site")
+    parser.add_argument("--publications", type=Path, default=PUBLICATIONS_FILE)
+    parser.add_argument("--authors", type=Path, default=AUTHORS_FILE)
+    parser.add_argument("--author-index", type=Path, default=AUTHOR_INDEX_FILE,
+                        help="Canonical author index from author_index.py, if built")
+    parser.add_argument("--output", type=Path, default=OUTPUT_DIR)
+    parser.add_argument("--force", action="store_true", help="Rebuild even if the sources are unchanged")
+    args = parser.parse_args()
+    build(args.publications, args.authors, args.output, args.force, args.author_index)
+
+
+if __name__ == "__main__":
+    main()
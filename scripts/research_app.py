@@ -1,23 +1,151 @@
 import streamlit as st
 import json
+import os
+import threading
 from pathlib import Path
 import datetime
-from typing import Dict, List
+from typing import Callable, Dict, List, Optional, Tuple
 import pandas as pd
+from content_store import AREAS_COLLECTION, ContentStore, open_store
+from row_edits import RowEdits, apply_edits, edits_from_editor, filter_items, search_text
+from safe_io import VersionConflict, update_json
 
 # Constants
 DATA_DIR = Path("src/data/research")
 AREAS_FILE = DATA_DIR / "areas.json"
+PAGE_SIZES = [25, 50, 100, 250]
 
-def load_research_data() -> Dict:
-    """Load research areas and items"""
+
+class DataCache:
+    """Parsed research data shared by all sessions of the app.
+
+    Entries are keyed by the store's version of the areas collection, or by
+    the (mtime, size, inode) stamp of areas.json without a store, so a rerun
+    only re-reads the data after someone changed it. Saves from this
+    app put the data they wrote straight into the cache. Cached objects are
+    shared between sessions and must be treated as read-only.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.stamp: Optional[Tuple] = None
+        self.data: Optional[Dict] = None
+        # (area, item type) -> (items list the texts were built from, search texts)
+        self.search: Dict[Tuple[str, str], Tuple[List[Dict], List[str]]] = {}
+
+    def set(self, data: Dict, stamp: Optional[Tuple]):
+        with self.lock:
+            self.data, self.stamp, self.search = data, stamp, {}
+
+
+@st.cache_resource
+def data_cache() -> DataCache:
+    return DataCache()
+
+def file_stamp(path: Path) -> Optional[Tuple[int, int, int]]:
+    """Cheap change marker for a file; atomic saves always give a new inode"""
+    try:
+        info = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return info.st_mtime_ns, info.st_size, info.st_ino
+
+def data_stamp() -> Optional[Tuple]:
+    """Change marker for the research data, wherever it is kept"""
+    with open_store() as store:
+        if store and store.has_collection(AREAS_COLLECTION):
+            return "store", store.version(AREAS_COLLECTION)
+    return file_stamp(AREAS_FILE)
+
+def read_research_data() -> Dict:
+    """Load research areas and items from the store or areas.json"""
+    with open_store() as store:
+        if store and store.has_collection(AREAS_COLLECTION):
+            return store.load(AREAS_COLLECTION)
     with open(AREAS_FILE) as f:
         return json.load(f)
 
-def save_research_data(data: Dict):
-    """Save research data back to file"""
-    with open(AREAS_FILE, 'w') as f:
-        json.dump(data, f, indent=2)
+def load_research_data() -> Dict:
+    """Load research areas and items, re-reading only when areas.json changed"""
+    cache = data_cache()
+    stamp = data_stamp()
+    with cache.lock:
+        if cache.data is not None and cache.stamp == stamp:
+            return cache.data
+    data = read_research_data()
+    cache.set(data, stamp)
+    return data
+
+def remember_saved(data: Dict):
+    """Cache data just written to areas.json; called while its lock is held"""
+    data_cache().set(data, file_stamp(AREAS_FILE))
+
+def refresh_from_store(store: ContentStore):
+    """Cache the store's view after a change; areas.json is rewritten by compaction"""
+    data_cache().set(store.load(AREAS_COLLECTION), ("store", store.version(AREAS_COLLECTION)))
+
+def search_texts(area: str, item_type: str, items: List[Dict]) -> List[str]:
+    """Searchable text of each item, built once per version of the data"""
+    cache = data_cache()
+    with cache.lock:
+        cached = cache.search.get((area, item_type))
+        if cached is not None and cached[0] is items:
+            return cached[1]
+    texts = [search_text(item) for item in items]
+    with cache.lock:
+        cache.search[(area, item_type)] = (items, texts)
+    return texts
+
+def update_research_data(change: Callable[[Dict], None]):
+    """Read-modify-write areas.json and keep the cache in step"""
+    update_json(AREAS_FILE, change, on_saved=remember_saved)
+
+def add_research_item(area: str, key: str, item: Dict):
+    """Add one item to an area's list"""
+    with open_store() as store:
+        if store:
+            store.add_item(AREAS_COLLECTION, item, group=key, area=area)
+            refresh_from_store(store)
+            return
+    update_research_data(lambda data: data[area].setdefault(key, []).append(item))
+
+def edit_research_items(area: str, key: str, baseline: List[Dict], edits: RowEdits):
+    """Apply row-level edits made on baseline to an area's list in areas.json.
+
+    Items nobody touched in this session are left as they are on disk, so
+    concurrent edits to other rows survive; an edited row that was changed
+    elsewhere raises VersionConflict.
+    """
+    def edit(data: Dict):
+        data[area][key] = apply_edits(data[area].get(key, []), baseline, edits, AREAS_FILE)
+    update_research_data(edit)
+
+def edit_stored_items(area: str, key: str, rows: List[Tuple[int, Dict]], edits: RowEdits):
+    """Apply row-level edits made on rows, (id, item) pairs read from the store"""
+    with open_store() as store:
+        store.edit_rows(AREAS_COLLECTION, rows, edits, group=key, area=area)
+        refresh_from_store(store)
+
+def update_area(area: str, fields: Dict):
+    """Create an area or update its own fields"""
+    with open_store() as store:
+        if store:
+            store.set_area(area, fields)
+            refresh_from_store(store)
+            return
+    update_research_data(lambda data: data.setdefault(area, {}).update(fields))
+
+def delete_area(area: str):
+    """Remove an area and its items"""
+    with open_store() as store:
+        if store:
+            store.delete_area(area)
+            refresh_from_store(store)
+            return
+    
+    def remove(data: Dict):
+        data.pop(area, None)
+    update_research_data(remove)
 
 def render_add_item():
     """Render form for adding new research items"""
@@ -97,59 +225,168 @@ def render_add_item():
                 })
             
             # Add to research data
-            key = f"{item_type}s"
-            if key not in research_data[area]:
-                research_data[area][key] = []
-            research_data[area][key].append(item_data)
-            
-            # Save updated data
-            save_research_data(research_data)
+            add_research_item(area, f"{item_type}s", item_data)
             st.success(f"Added {item_type}: {title}")
 
 def render_edit_items():
     """Render interface for editing existing items"""
     st.header("Edit Research Items")
     
-    # Load current data
-    research_data = load_research_data()
+    with open_store() as store:
+        if store and store.has_collection(AREAS_COLLECTION):
+            area_names = list(store.areas())
+        else:
+            store = None
+            area_names = list(load_research_data().keys())
+        
+        # Select area and type to edit
+        col1, col2 = st.columns(2)
+        with col1:
+            area = st.selectbox("Research Area", area_names, key="edit_area")
+        with col2:
+            item_type = st.selectbox("Type", ["publications", "projects", "grants"], key="edit_type")
+        
+        notice = st.session_state.pop("edit_notice", None)
+        if notice:
+            st.success(notice)
+        
+        if store:
+            render_store_editor(store, area, item_type)
+        else:
+            render_file_editor(area, item_type)
+
+def render_filters(years: List[int], statuses: List[str]) -> Tuple[str, Optional[int], Optional[str]]:
+    """Search, year and status filters of the item editor"""
+    col1, col2, col3 = st.columns([2, 1, 1])
+    with col1:
+        query = st.text_input("Search", key="edit_search")
+    with col2:
+        year = st.selectbox("Year", [None] + sorted(years, reverse=True),
+                            format_func=lambda y: "All" if y is None else str(y), key="edit_year")
+    with col3:
+        status = st.selectbox("Status", [None] + sorted(statuses), format_func=lambda s: s or "All",
+                              key="edit_status")
+    return query, year, status
+
+def render_pager(matches: int, total: int, item_type: str) -> Tuple[int, int]:
+    """Page size and page number for matches rows; returns (page, page_size)"""
+    col1, col2 = st.columns(2)
+    with col1:
+        page_size = st.selectbox("Rows per page", PAGE_SIZES, key="edit_page_size")
+    pages = max(1, -(-matches // page_size))
+    with col2:
+        page = st.number_input("Page", min_value=1, max_value=pages, value=1, step=1, key="edit_page")
+    st.caption(f"{matches} of {total} {item_type} match; page {page} of {pages}. "
+               "Save before changing page or filters.")
+    return page, page_size
+
+def render_editor(editor_key: str, shown: List[Dict], save: Callable[[Dict], Optional[RowEdits]],
+                  reload: Callable[[], None] = None):
+    """st.data_editor over shown with Save and Reload buttons.
+
+    save receives the editor's widget state and returns the edits it wrote,
+    or None when there was nothing to save.
+    """
+    st.data_editor(
+        pd.DataFrame(shown),
+        num_rows="dynamic",
+        hide_index=True,
+        use_container_width=True,
+        key=editor_key
+    )
     
-    # Select area and type to edit
+    # A new editor key drops pending edits once they are saved or reloaded
+    generation = st.session_state.get("edit_generation", 0)
     col1, col2 = st.columns(2)
     with col1:
-        area = st.selectbox(
-            "Research Area",
-            list(research_data.keys()),
-            key="edit_area"
-        )
+        if st.button("Save Changes"):
+            try:
+                edits = save(st.session_state.get(editor_key, {}))
+            except VersionConflict as e:
+                st.error(f"{e}. Reload to see the latest version, then reapply your edits.")
+                return
+            if not edits:
+                st.info("No changes to save")
+                return
+            st.session_state["edit_generation"] = generation + 1
+            st.session_state["edit_notice"] = f"Changes saved ({edits.summary()})"
+            st.rerun()
     with col2:
-        item_type = st.selectbox(
-            "Type",
-            ["publications", "projects", "grants"],
-            key="edit_type"
-        )
+        if st.button("Reload"):
+            if reload:
+                reload()
+            st.session_state["edit_generation"] = generation + 1
+            st.rerun()
+
+def render_file_editor(area: str, item_type: str):
+    """Edit one area's items from areas.json, filtered and paged in memory"""
+    # Edit the items as first loaded in this session so saves can detect
+    # changes made by other sessions or the CLI in the meantime
+    baseline_key = f"baseline:{area}:{item_type}"
+    if baseline_key not in st.session_state:
+        st.session_state[baseline_key] = load_research_data()[area].get(item_type, [])
+    items = st.session_state[baseline_key]
+    if not items:
+        st.info(f"No {item_type} found for {area}")
+        return
     
-    # Get items for selected area and type
-    items = research_data[area].get(item_type, [])
+    # Filter the item list before any DataFrame is built
+    query, year, status = render_filters(
+        list({item["year"] for item in items if isinstance(item.get("year"), int)}),
+        list({item["status"] for item in items if isinstance(item.get("status"), str)}))
+    matches = filter_items(items, search_texts(area, item_type, items), query, year, status)
     
-    if not items:
+    # Page through the matches; only the current page goes to the editor
+    page, page_size = render_pager(len(matches), len(items), item_type)
+    rows = matches[(page - 1) * page_size:page * page_size]
+    
+    def save(state: Dict) -> Optional[RowEdits]:
+        edits = edits_from_editor(state, rows, items)
+        if edits:
+            edit_research_items(area, item_type, items, edits)
+            st.session_state[baseline_key] = load_research_data()[area].get(item_type, [])
+        return edits
+    
+    def reload():
+        del st.session_state[baseline_key]
+    
+    generation = st.session_state.get("edit_generation", 0)
+    editor_key = f"editor:{area}:{item_type}:{generation}:{page}:{page_size}:{query}:{year}:{status}"
+    render_editor(editor_key, [items[i] for i in rows], save, reload)
+
+def render_store_editor(store: ContentStore, area: str, item_type: str):
+    """Edit one area's items from the content store.
+
+    Filters and paging run as SQL, so only the rows on the current page are
+    read; saves write back just the rows edited there.
+    """
+    group = dict(collection=AREAS_COLLECTION, group=item_type, owner=area)
+    total = store.count(**group)
+    if not total:
         st.info(f"No {item_type} found for {area}")
         return
     
-    # Convert to DataFrame for easier editing
-    df = pd.DataFrame(items)
+    query, year, status = render_filters(store.distinct("year", **group), store.distinct("status", **group))
+    filters = dict(group, search=query, year=year, status=status)
+    page, page_size = render_pager(store.count(**filters), total, item_type)
     
-    # Edit DataFrame
-    edited_df = st.data_editor(
-        df,
-        num_rows="dynamic",
-        use_container_width=True
-    )
+    # The page as first read in this session is what saves are checked against
+    generation = st.session_state.get("edit_generation", 0)
+    editor_key = f"editor:{area}:{item_type}:{generation}:{page}:{page_size}:{query}:{year}:{status}"
+    cached = st.session_state.get("edit_rows")
+    if cached is None or cached[0] != editor_key:
+        cached = (editor_key, store.query(limit=page_size, offset=(page - 1) * page_size, **filters))
+        st.session_state["edit_rows"] = cached
+    rows = cached[1]
+    shown = [item for _, item in rows]
+    
+    def save(state: Dict) -> Optional[RowEdits]:
+        edits = edits_from_editor(state, range(len(rows)), shown)
+        if edits:
+            edit_stored_items(area, item_type, rows, edits)
+        return edits
     
-    # Save button
-    if st.button("Save Changes"):
-        research_data[area][item_type] = edited_df.to_dict('records')
-        save_research_data(research_data)
-        st.success("Changes saved!")
+    render_editor(editor_key, shown, save)
 
 def render_manage_areas():
     """Render interface for managing research areas"""
@@ -166,13 +403,12 @@ def render_manage_areas():
             submitted = st.form_submit_button("Add Area")
             
             if submitted and area_name:
-                research_data[area_name] = {
+                update_area(area_name, {
                     "description": description,
                     "publications": [],
                     "projects": [],
                     "grants": []
-                }
-                save_research_data(research_data)
+                })
                 st.success(f"Added research area: {area_name}")
     
     # Edit existing areas
@@ -181,13 +417,11 @@ def render_manage_areas():
         with st.expander(area):
             new_description = st.text_area("Description", data["description"], key=f"desc_{area}")
             if st.button("Update", key=f"update_{area}"):
-                research_data[area]["description"] = new_description
-                save_research_data(research_data)
+                update_area(area, {"description": new_description})
                 st.success(f"Updated {area}")
             if st.button("Delete", key=f"delete_{area}"):
                 if st.checkbox(f"Confirm deletion of {area}"):
-                    del research_data[area]
-                    save_research_data(research_data)
+                    delete_area(area)
                     st.success(f"Deleted {area}")
                     st.rerun()
 
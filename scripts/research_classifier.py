@@ -2,18 +2,26 @@ import argparse
 import logging
 import json
 import os
-from typing import Dict, List, Literal, Optional, Union
+from typing import Dict, List, Literal, Optional, Set, Tuple, Union
 from pathlib import Path
 import re
-from dataclasses import dataclass
+import time
+from dataclasses import dataclass, field
 
-import pandas as pd
-from langchain.prompts import PromptTemplate
-from langchain.chains import LLMChain
-from langchain_core.output_parsers import JsonOutputParser
 from pydantic import BaseModel, Field
-from tqdm import tqdm
-from config import setup_llm_creds, get_llm
+from config import setup_llm_creds, get_llm, stream_completion
+from json_stream import first_valid_object, recording
+from llm_trace import call_label, log_summary, note_parse
+from token_budget import UsageReport, compact_for_prompt, output_token_cap
+
+CLASSIFIER_MODEL = "deepseek-ai/DeepSeek-R1-Distill-Llama-70B-free"
+SMALL_CLASSIFIER_MODEL = "meta-llama/Meta-Llama-3.1-8B-Instruct-Turbo"
+
+# Answers below this self-reported confidence are escalated to the next model
+DEFAULT_MIN_CONFIDENCE = 0.7
+
+# Token budget for the compacted entry text inside the classification prompt
+DEFAULT_PROMPT_BUDGET = 384
 
 class ResearchArea(BaseModel):
     """Classification of a research work into primary and secondary areas"""
@@ -23,11 +31,20 @@ class ResearchArea(BaseModel):
         "Educational Assessment",
         "STEM Education",
         "Learning Analytics",
-        "Educational Technology"
+        "Educational Technology",
+        "Uncategorized"
     ]
     secondary_areas: List[str]
     keywords: List[str]
     collaborators: List[str]
+    confidence: Optional[float] = Field(default=None, ge=0, le=1)
+
+# Output cap sized from the ResearchArea schema instead of a fixed 2048 tokens
+CLASSIFICATION_MAX_TOKENS = output_token_cap(ResearchArea)
+
+# Reasoning models write a <think> block before the JSON, which the schema cap leaves no room for
+REASONING_MODELS = {CLASSIFIER_MODEL}
+REASONING_MAX_TOKENS = CLASSIFICATION_MAX_TOKENS + 2048
 
 class Publication(BaseModel):
     """Structure for a research publication"""
@@ -163,50 +180,112 @@ def parse_grant_entry(entry: str) -> LatexEntry:
         pi=pi
     )
 
-def classify_research_work(llm, content: str) -> ResearchArea:
-    """Classify a piece of research work into research areas"""
-    prompt = f"""
-    Classify this academic work into research areas and extract relevant information.
-    The work should be classified into one primary area and optional secondary areas.
-    Also extract relevant keywords and collaborators.
-
-    Academic work: {content}
-
-    Please format your response as JSON with the following structure:
-    {{
-        "primary_area": "area name",
-        "secondary_areas": ["area1", "area2"],
-        "keywords": ["keyword1", "keyword2"],
-        "collaborators": ["name1", "name2"]
-    }}
+@dataclass
+class ModelRouter:
+    """Routes classification requests from small to large models.
+
+    Each model in tiers is tried in order; an answer is accepted when it
+    validates and reports at least min_confidence. The last tier's valid
+    answer is always accepted.
     """
+    tiers: List[str] = field(default_factory=lambda: [SMALL_CLASSIFIER_MODEL, CLASSIFIER_MODEL])
+    min_confidence: float = DEFAULT_MIN_CONFIDENCE
+    reasoning: Set[str] = field(default_factory=lambda: set(REASONING_MODELS))
+    answered: Dict[str, int] = field(default_factory=dict)
+    escalations: Dict[str, int] = field(default_factory=dict)
+    latency_s: Dict[str, float] = field(default_factory=dict)
+
+    def max_tokens(self, model: str) -> int:
+        """Output cap for one model, with room for a reasoning model's <think> block"""
+        return REASONING_MAX_TOKENS if model in self.reasoning else CLASSIFICATION_MAX_TOKENS
+
+    def accepts(self, result: Optional[ResearchArea], tier: int) -> Optional[str]:
+        """Return the escalation reason for a result, or None to accept it"""
+        if result is None:
+            return "invalid"
+        if tier == len(self.tiers) - 1:
+            return None
+        if result.confidence is None or result.confidence < self.min_confidence:
+            return "low_confidence"
+        return None
+
+    def record(self, model: str, latency: float, reason: Optional[str]):
+        self.latency_s[model] = self.latency_s.get(model, 0.0) + latency
+        if reason is None:
+            self.answered[model] = self.answered.get(model, 0) + 1
+        else:
+            key = f"{model}:{reason}"
+            self.escalations[key] = self.escalations.get(key, 0) + 1
 
-    response = llm.Complete.create(
-        model="deepseek-ai/DeepSeek-R1-Distill-Llama-70B-free",
-        messages=[{"role": "user", "content": prompt}],
+    def summary(self) -> Dict:
+        return {
+            "tiers": self.tiers,
+            "min_confidence": self.min_confidence,
+            "answered": self.answered,
+            "escalations": self.escalations,
+            "latency_s": {model: round(t, 3) for model, t in self.latency_s.items()},
+        }
+
+def request_classification(llm, prompt: str, model: str,
+                           max_tokens: int = CLASSIFICATION_MAX_TOKENS) -> Tuple[Optional[ResearchArea], str]:
+    """Stream one classification request and stop at the first valid object"""
+    params = dict(
+        prompt=prompt,
+        model=model,
         temperature=0,
-        max_tokens=2048,
+        max_tokens=max_tokens,
         top_p=0.7,
         top_k=50,
         repetition_penalty=1
     )
 
+    received = []
     try:
-        result = json.loads(response['output']['choices'][0]['text'])
-        return ResearchArea(
-            primary_area=result["primary_area"],
-            secondary_areas=result["secondary_areas"],
-            keywords=result["keywords"],
-            collaborators=result["collaborators"]
-        )
+        with call_label(llm, "classify"):
+            result = first_valid_object(
+                recording(stream_completion(llm, **params), received.append),
+                ResearchArea
+            )
     except Exception as e:
-        logging.error(f"Error parsing LLM response: {e}")
-        return ResearchArea(
-            primary_area="Uncategorized",
-            secondary_areas=[],
-            keywords=[],
-            collaborators=[]
-        )
+        logging.error(f"Error requesting classification from {model}: {e}")
+        result = None
+    note_parse(llm, result is not None)
+    return result, "".join(received)
+
+def classify_research_work(llm, content: str, usage: Optional[UsageReport] = None,
+                           prompt_budget: int = DEFAULT_PROMPT_BUDGET,
+                           router: Optional[ModelRouter] = None) -> ResearchArea:
+    """Classify a piece of research work into research areas"""
+    entry = compact_for_prompt(content, prompt_budget)
+    prompt = f"""Classify this academic work. Reply with JSON only, where confidence is 0-1:
+{{"primary_area": "...", "secondary_areas": [], "keywords": [], "collaborators": [], "confidence": 0.0}}
+
+Work: {entry}
+"""
+
+    router = router or ModelRouter(tiers=[CLASSIFIER_MODEL])
+    completion = ""
+    for tier, model in enumerate(router.tiers):
+        start = time.perf_counter()
+        result, completion = request_classification(llm, prompt, model, router.max_tokens(model))
+        latency = time.perf_counter() - start
+
+        if usage is not None:
+            usage.record(f"classify:{model}", prompt, completion, latency)
+
+        reason = router.accepts(result, tier)
+        router.record(model, latency, reason)
+        if reason is None:
+            return result
+        logging.info(f"Escalating classification from {model} ({reason})")
+
+    logging.error(f"No valid classification in LLM response: {completion[:200]!r}")
+    return ResearchArea(
+        primary_area="Uncategorized",
+        secondary_areas=[],
+        keywords=[],
+        collaborators=[]
+    )
 
 def parse_publications(content: str, llm) -> List[Publication]:
     """Parse publications from LaTeX content"""
@@ -218,6 +297,7 @@ def parse_publications(content: str, llm) -> List[Publication]:
     # Split into individual entries
     pub_entries = re.split(r'\n\s*\n', publications_content)
     
+    from tqdm import tqdm
     for pub_text in tqdm(pub_entries, desc="Processing publications"):
         if not pub_text.strip():
             continue
@@ -262,7 +342,9 @@ def parse_publications(content: str, llm) -> List[Publication]:
     
     return publications
 
-def process_publications(llm, latex_content: str) -> List[Publication]:
+def process_publications(llm, latex_content: str, usage: Optional[UsageReport] = None,
+                         prompt_budget: int = DEFAULT_PROMPT_BUDGET,
+                         router: Optional[ModelRouter] = None) -> List[Publication]:
     """Process and classify publications from CV"""
     publications = []
     
@@ -272,6 +354,7 @@ def process_publications(llm, latex_content: str) -> List[Publication]:
     # Split into individual entries (assuming they're separated by blank lines)
     pub_entries = re.split(r'\n\s*\n', pubs_content)
     
+    from tqdm import tqdm
     for entry in tqdm(pub_entries, desc="Processing publications"):
         if not entry.strip():
             continue
@@ -281,7 +364,7 @@ def process_publications(llm, latex_content: str) -> List[Publication]:
             pub_data = parse_bibtex_entry(entry)
             
             # Classify the publication
-            classification = classify_research_work(llm, entry)
+            classification = classify_research_work(llm, entry, usage, prompt_budget, router)
             
             # Create Publication object
             pub = Publication(
@@ -302,7 +385,9 @@ def process_publications(llm, latex_content: str) -> List[Publication]:
     
     return publications
 
-def process_grants(llm, latex_content: str) -> List[Grant]:
+def process_grants(llm, latex_content: str, usage: Optional[UsageReport] = None,
+                   prompt_budget: int = DEFAULT_PROMPT_BUDGET,
+                   router: Optional[ModelRouter] = None) -> List[Grant]:
     """Process and classify grants from CV"""
     grants = []
     
@@ -312,6 +397,7 @@ def process_grants(llm, latex_content: str) -> List[Grant]:
     # Split into individual entries
     grant_entries = re.split(r'\n\s*\n', grants_content)
     
+    from tqdm import tqdm
     for entry in tqdm(grant_entries, desc="Processing grants"):
         if not entry.strip():
             continue
@@ -321,7 +407,7 @@ def process_grants(llm, latex_content: str) -> List[Grant]:
             grant_data = parse_grant_entry(entry)
             
             # Classify the grant
-            classification = classify_research_work(llm, entry)
+            classification = classify_research_work(llm, entry, usage, prompt_budget, router)
             
             # Create Grant object
             grant = Grant(
@@ -376,13 +462,25 @@ def main():
                        help="Input LaTeX CV file")
     parser.add_argument("--output", type=str, required=True,
                        help="Output directory for JSON files")
+    parser.add_argument("--prompt-budget", type=int, default=DEFAULT_PROMPT_BUDGET,
+                       help="Token budget for each entry in the classification prompt")
+    parser.add_argument("--models", type=str,
+                       default=f"{SMALL_CLASSIFIER_MODEL},{CLASSIFIER_MODEL}",
+                       help="Comma-separated models to try in order, smallest first")
+    parser.add_argument("--min-confidence", type=float, default=DEFAULT_MIN_CONFIDENCE,
+                       help="Escalate answers below this confidence to the next model")
+    parser.add_argument("--trace", type=str,
+                       help="Append a JSONL trace of every LLM call to this file")
     
     args = parser.parse_args()
+    tiers = [m.strip() for m in args.models.split(",") if m.strip()]
+    if not tiers:
+        parser.error("--models needs at least one model")
     
     # Setup LLM
     logger.info("Setting up LLM...")
     setup_llm_creds()
-    llm = get_llm()
+    llm = get_llm(trace_path=args.trace, run_name="classify-research")
     
     # Read LaTeX content
     logger.info(f"Reading LaTeX file: {args.input}")
@@ -395,14 +493,22 @@ def main():
         return
     
     # Process publications and grants
+    usage = UsageReport()
+    router = ModelRouter(tiers=tiers, min_confidence=args.min_confidence)
     logger.info("Processing publications...")
-    publications = process_publications(llm, latex_content)
+    publications = process_publications(llm, latex_content, usage, args.prompt_budget, router)
     logger.info(f"Found {len(publications)} publications")
     
     logger.info("Processing grants...")
-    grants = process_grants(llm, latex_content)
+    grants = process_grants(llm, latex_content, usage, args.prompt_budget, router)
     logger.info(f"Found {len(grants)} grants")
     
+    # Report token usage and latency for this run
+    summary = usage.summary()
+    logger.info(f"LLM usage: {summary}")
+    logger.info(f"Model routing: {router.summary()}")
+    log_summary(llm)
+    
     # Generate structured data
     logger.info("Generating research areas JSON...")
     research_areas = generate_research_areas_json(publications, grants)
@@ -411,6 +517,10 @@ def main():
     # Save output files
     output_dir = Path(args.output)
     output_dir.mkdir(parents=True, exist_ok=True)
+    usage.save(output_dir / 'classification_usage.json',
+               extra={"max_tokens": CLASSIFICATION_MAX_TOKENS, "reasoning_max_tokens": REASONING_MAX_TOKENS,
+                      "prompt_budget": args.prompt_budget,
+                      "routing": router.summary()})
     
     output_file = output_dir / 'research_areas.json'
     logger.info(f"Saving to {output_file}")
@@ -0,0 +1,115 @@
+import math
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from safe_io import VersionConflict
+
+
+@dataclass
+class RowEdits:
+    """Row-level changes to one list of items.
+
+    Positions refer to the list as it was loaded (the baseline), not to the
+    list on disk at save time.
+    """
+    updated: Dict[int, Dict] = field(default_factory=dict)
+    deleted: List[int] = field(default_factory=list)
+    added: List[Dict] = field(default_factory=list)
+
+    def __bool__(self):
+        return bool(self.updated or self.deleted or self.added)
+
+    def summary(self) -> str:
+        return f"{len(self.updated)} updated, {len(self.deleted)} deleted, {len(self.added)} added"
+
+
+def is_missing(value) -> bool:
+    """Empty cell as st.data_editor reports it (None, or NaN from pandas)"""
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def clean_record(record: Dict) -> Dict:
+    """Drop empty cells, so fields absent from an item stay absent"""
+    return {k: v for k, v in record.items() if not is_missing(v) and not str(k).startswith("_index")}
+
+
+def edits_from_editor(state: Dict, rows: Sequence[int], baseline: List[Dict]) -> RowEdits:
+    """Translate st.data_editor's widget state into RowEdits.
+
+    state holds edited_rows/added_rows/deleted_rows keyed by displayed row;
+    rows maps each displayed row to its position in baseline. Edited items
+    start from the stored item, so fields the editor never showed and values
+    pandas would have widened (ints with NaN neighbours) pass through as is.
+    """
+    edits = RowEdits()
+    deleted = {int(i) for i in state.get("deleted_rows", [])}
+    edits.deleted = [rows[i] for i in sorted(deleted)]
+    for display, changes in state.get("edited_rows", {}).items():
+        display = int(display)
+        if display in deleted:
+            continue
+        position = rows[display]
+        item = dict(baseline[position])
+        for key, value in changes.items():
+            if is_missing(value):
+                item.pop(key, None)
+            else:
+                item[key] = value
+        if item != baseline[position]:
+            edits.updated[position] = item
+    edits.added = [item for item in map(clean_record, state.get("added_rows", [])) if item]
+    return edits
+
+
+def resolve_positions(current: List[Dict], baseline: List[Dict], positions: Iterable[int],
+                      path: Path) -> Dict[int, int]:
+    """Map baseline positions to indexes in current.
+
+    An item is found at its old position or, if others inserted or removed
+    items meanwhile, wherever an identical copy still is. An item that was
+    edited or deleted elsewhere cannot be found and raises VersionConflict.
+    """
+    found, used = {}, set()
+    for position in positions:
+        expected = baseline[position]
+        if position < len(current) and position not in used and current[position] == expected:
+            index = position
+        else:
+            index = next((i for i, item in enumerate(current) if i not in used and item == expected), None)
+        if index is None:
+            raise VersionConflict(path, f"{expected.get('title', 'An item')!r} was changed by someone else")
+        found[position] = index
+        used.add(index)
+    return found
+
+
+def apply_edits(current: List[Dict], baseline: List[Dict], edits: RowEdits, path: Path) -> List[Dict]:
+    """current with edits applied; untouched items keep whatever others saved"""
+    index = resolve_positions(current, baseline, [*edits.updated, *edits.deleted], path)
+    result = list(current)
+    for position, item in edits.updated.items():
+        result[index[position]] = item
+    dropped = {index[position] for position in edits.deleted}
+    return [item for i, item in enumerate(result) if i not in dropped] + edits.added
+
+
+def search_text(item: Dict) -> str:
+    """Lower-cased text of an item's string fields, for substring search"""
+    parts = []
+    for value in item.values():
+        if isinstance(value, str):
+            parts.append(value)
+        elif isinstance(value, list):
+            parts.extend(v for v in value if isinstance(v, str))
+    return "\n".join(parts).lower()
+
+
+def filter_items(items: List[Dict], texts: List[str], query: str = "",
+                 year: Optional[int] = None, status: Optional[str] = None) -> List[int]:
+    """Positions of the items matching every given filter"""
+    query = query.strip().lower()
+    return [i for i, item in enumerate(items)
+            if (year is None or item.get("year") == year)
+            and (status is None or item.get("status") == status)
+            and (not query or query in texts[i])]
@@ -0,0 +1,103 @@
+import contextlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # fcntl is POSIX only; without it locking is a no-op
+    fcntl = None
+
+
+class VersionConflict(Exception):
+    """A file changed after it was read and before it could be saved"""
+
+    def __init__(self, path: Path, message: str = None):
+        super().__init__(message or f"{path} was changed by another writer; reload and try again")
+        self.path = Path(path)
+
+
+def atomic_write_bytes(path: Path, data: bytes):
+    """Write bytes to a temp file, fsync it and rename it over path"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        mode = path.stat().st_mode & 0o777
+    except FileNotFoundError:
+        mode = 0o644
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        # mkstemp creates files as 0600; keep the mode the file had
+        os.fchmod(fd, mode)
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(tmp)
+        raise
+    # Persist the rename itself
+    with contextlib.suppress(OSError):
+        dir_fd = os.open(path.parent, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+def atomic_write_json(path: Path, data: Any, indent: Optional[int] = 2, sort_keys: bool = False):
+    """Write JSON to a temp file, fsync it and rename it over path"""
+    atomic_write_bytes(path, json.dumps(data, indent=indent, sort_keys=sort_keys).encode())
+
+
+@contextlib.contextmanager
+def file_lock(path: Path) -> Iterator[None]:
+    """Exclusive advisory lock for path, held on a sidecar <name>.lock file.
+
+    The data file itself cannot carry the lock because atomic writes replace
+    it with a new inode.
+    """
+    path = Path(path)
+    if fcntl is None:
+        yield
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path.with_name(path.name + ".lock"), "a") as lock:
+        fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+
+
+def read_json(path: Path, default: Any = None) -> Any:
+    """Load a JSON file, or default when it does not exist"""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+
+
+def update_json(path: Path, change: Callable[[Any], Any], default: Any = None,
+                on_saved: Callable[[Any], None] = None) -> Any:
+    """Read-modify-write a JSON file under its lock.
+
+    change receives the current contents and either mutates them in place
+    (returning None) or returns the new contents. It may raise VersionConflict
+    to reject an update that no longer applies. on_saved is called with the
+    written data before the lock is released.
+    """
+    with file_lock(path):
+        data = read_json(path, default)
+        result = change(data)
+        if result is not None:
+            data = result
+        atomic_write_json(path, data)
+        if on_saved:
+            on_saved(data)
+        return data
@@ -0,0 +1,384 @@
+"""Build-time full-text search index over publications.
+
+Title, authors, venue and description are tokenised into an inverted index
+written to public/data/search/index.json (plus a .gz variant), so the site
+can search without scanning publications.json:
+
+    {"version": 3,
+     "fields": {"title": 6, ...},       weight of one occurrence per field
+     "docs": [[title, year, type], ...], in the order of the "all" bundle
+     "terms": ["algebra", ...],          sorted, so prefixes are a range
+     "postings": [[weight, count, gap, gap, ...,
+                   weight, count, gap, ...], ...]}
+
+Each posting list is a run of blocks, highest weight first: the documents
+with one weight for the term, in order and stored as gaps from the
+previous one (the first from 0). So the best matches for a single term are
+the head of its list, and a block is a set of documents that score the
+same. Queries match every word; the last word also matches as a prefix
+(search as you type).
+
+The site serves it as /api/search (src/app/api/search/route.ts), through
+src/utils/publicationSearch.mjs, which mirrors SearchIndex below. Change
+tokenising or scoring in both; tests/test_search_index.py compares them.
+
+    python scripts/search_index.py
+"""
+import argparse
+import heapq
+import itertools
+import json
+import logging
+import math
+import re
+import unicodedata
+from bisect import bisect_left
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from publication_bundles import PUBLICATIONS_FILE, compressors, sort_key
+from safe_io import atomic_write_bytes
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = Path("public/data/search/index.json")
+VERSION = 3
+
+# Weight of one occurrence in each field; repeats count up to MAX_TF times
+FIELDS = {"title": 6, "authors": 4, "venue": 3, "description": 2}
+MAX_TF = 3
+# Prefixes shorter than this only match whole words
+MIN_PREFIX = 2
+# A prefix expands to at most this many terms, the most common ones
+MAX_EXPANSIONS = 32
+# Prefix matches rank below whole-word matches
+PREFIX_WEIGHT = 0.7
+# Blocks of a query word are merged into levels of up to this many documents
+MERGED_LEVEL = 256
+# Expansions and levels of prefixes up to this long are found when the index is loaded
+SHORT_PREFIX = 3
+# Documents of a level read at a time when looking for the first that match
+READ_AHEAD = 256
+# Longer prefix expansions remembered between queries
+MAX_CACHED_PREFIXES = 4096
+
+# A block: the weight or score of its documents for a term, the documents in order and as a set
+Block = Tuple[float, List[int], Set[int]]
+# A level of a query word: its best score, its run of blocks and all their documents as a set
+Level = Tuple[float, List[Block], Set[int]]
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from in into is it of on or the to with".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-case words without accents; stop words and single letters dropped"""
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    return [t for t in re.findall(r"[a-z0-9]+", text)
+            if t not in STOPWORDS and (len(t) > 1 or t.isdigit())]
+
+
+def field_text(pub: Dict, name: str) -> str:
+    value = pub.get(name)
+    if name == "title" and not value:
+        value = (pub.get("description") or "").split(".")[0]
+    if isinstance(value, list):
+        return " ".join(v for v in value if isinstance(v, str))
+    return value if isinstance(value, str) else ""
+
+
+def build_index(publications: Iterable[Dict]) -> Dict:
+    """The index artifact for publications, ranked as the bundles order them"""
+    pubs = sorted(publications, key=sort_key)
+    weights: Dict[str, Dict[int, int]] = defaultdict(dict)
+    docs = []
+    for doc, pub in enumerate(pubs):
+        docs.append([field_text(pub, "title"), pub.get("year"), pub.get("type")])
+        counts: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        for name in FIELDS:
+            for token in tokenize(field_text(pub, name)):
+                counts[token][name] += 1
+        for token, fields in counts.items():
+            weights[token][doc] = sum(FIELDS[name] * min(n, MAX_TF) for name, n in fields.items())
+
+    terms = sorted(weights)
+    postings = []
+    for term in terms:
+        blocks: Dict[int, List[int]] = defaultdict(list)
+        for doc, weight in sorted(weights[term].items()):
+            blocks[weight].append(doc)
+        flat = []
+        for weight in sorted(blocks, reverse=True):
+            ids = blocks[weight]
+            flat += [weight, len(ids)] + [doc - previous for doc, previous in zip(ids, [0] + ids)]
+        postings.append(flat)
+    return {"version": VERSION, "fields": FIELDS, "docs": docs, "terms": terms, "postings": postings}
+
+
+def decode_blocks(flat: List[int]) -> List[Block]:
+    """The blocks of a stored posting list, highest weight first"""
+    blocks, i = [], 0
+    while i < len(flat):
+        weight, count = flat[i], flat[i + 1]
+        docs = list(itertools.accumulate(flat[i + 2:i + 2 + count]))
+        blocks.append((weight, docs, set(docs)))
+        i += 2 + count
+    return blocks
+
+
+def common_documents(blocks: List[Block]) -> Iterator[int]:
+    """Documents in all of blocks, in order; the first block is the smallest"""
+    ordered = blocks[0][1]
+    for i in range(0, len(ordered), READ_AHEAD):
+        docs = ordered[i:i + READ_AHEAD]
+        for _, _, members in blocks[1:]:
+            docs = [doc for doc in docs if doc in members]
+        yield from docs
+
+
+def best_scores(blocks: List[Block], docs: Set[int], floor: float = -math.inf) -> Dict[int, float]:
+    """The score of each of docs in the first of blocks (best first) holding
+    it, leaving out documents scoring less than floor"""
+    scores: Dict[int, float] = {}
+    left = set(docs)
+    for score, _, members in blocks:
+        if not left or score < floor:
+            break
+        found = members.intersection(left)
+        if found:
+            scores.update(dict.fromkeys(found, score))
+            left -= found
+    return scores
+
+
+def encode(index: Dict) -> bytes:
+    return json.dumps(index, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def write_index(index: Dict, path: Path = INDEX_FILE):
+    data = encode(index)
+    atomic_write_bytes(path, data)
+    for suffix, compress in compressors().items():
+        atomic_write_bytes(path.with_name(path.name + suffix), compress(data))
+    logger.info(f"Indexed {len(index['docs'])} publications, {len(index['terms'])} terms, "
+                f"{len(data) // 1024} KiB, in {path}")
+
+
+class SearchIndex:
+    """Queries a loaded index artifact.
+
+    Each block of a posting list is a set of documents with the same score
+    for its term, so a query is answered block by block: combinations of
+    one block per query word are visited best first, and the documents of a
+    combination (the intersection of its blocks) all have its score. Blocks
+    are decoded into lists and sets, and the expansions and levels of short
+    prefixes found, when the index is loaded; only longer prefix expansions
+    are kept between queries.
+    """
+
+    def __init__(self, index: Dict):
+        if index.get("version") != VERSION:
+            raise ValueError(f"Unsupported search index version {index.get('version')!r}")
+        self.docs = index["docs"]
+        self.terms = index["terms"]
+        blocks = [decode_blocks(flat) for flat in index["postings"]]
+        self.df = [sum(len(docs) for _, docs, _ in term_blocks) for term_blocks in blocks]
+        self.expansions: Dict[str, List[int]] = {}
+        total = len(self.docs)
+        self.idf = [math.log(1 + total / df) for df in self.df]
+        # Each term's blocks with the score of one of their documents for the term
+        self.blocks = [[(weight * idf, docs, members) for weight, docs, members in term_blocks]
+                       for term_blocks, idf in zip(blocks, self.idf)]
+        # Short prefixes start the most terms, so their expansions and levels are found once
+        self.short_prefixes: Dict[str, List[int]] = {}
+        for length in range(MIN_PREFIX, SHORT_PREFIX + 1):
+            for prefix, group in itertools.groupby(range(len(self.terms)), key=lambda t: self.terms[t][:length]):
+                if len(prefix) == length:
+                    self.short_prefixes[prefix] = self._most_common(t for t in group if len(self.terms[t]) > length)
+        self.prefix_levels: Dict[Tuple[str, bool], List[Level]] = {
+            (prefix, merge): self._levels(self.matching_terms(prefix, True), merge)
+            for prefix in self.short_prefixes for merge in (False, True)}
+
+    @classmethod
+    def load(cls, path: Path = INDEX_FILE) -> "SearchIndex":
+        with open(path) as f:
+            return cls(json.load(f))
+
+    def matching_terms(self, token: str, prefix: bool) -> List[Tuple[int, float]]:
+        """(term number, factor) for the terms a query word matches"""
+        i = bisect_left(self.terms, token)
+        exact = i < len(self.terms) and self.terms[i] == token
+        found = [(i, 1.0)] if exact else []
+        if prefix and len(token) >= MIN_PREFIX:
+            found += [(t, PREFIX_WEIGHT) for t in self._expand(token, i + exact)]
+        return found
+
+    def _expand(self, token: str, start: int) -> List[int]:
+        """The most common terms longer than token that start with it"""
+        if token in self.short_prefixes:
+            return self.short_prefixes[token]
+        if token not in self.expansions:
+            if len(self.expansions) >= MAX_CACHED_PREFIXES:
+                self.expansions.clear()
+            self.expansions[token] = self._most_common(range(start, bisect_left(self.terms, token + "\uffff", start)))
+        return self.expansions[token]
+
+    def _most_common(self, terms: Iterable[int]) -> List[int]:
+        terms = list(terms)
+        if len(terms) > MAX_EXPANSIONS:
+            return heapq.nlargest(MAX_EXPANSIONS, terms, key=self.df.__getitem__)
+        return terms
+
+    def search(self, query: str, limit: int = 20) -> List[Tuple[int, float]]:
+        """(doc, score) of the best matches for every word in query"""
+        words = tokenize(query)
+        if not words or limit <= 0:
+            return []
+        # A trailing space or punctuation means the last word is complete
+        prefix_ok = query[-1:].isalnum()
+        matched = [self.matching_terms(w, prefix_ok and i == len(words) - 1) for i, w in enumerate(words)]
+        if not all(matched):
+            return []
+        # One word's blocks are already in rank order; merging only helps to combine words
+        merge = len(matched) > 1
+        levels = [self._levels(terms, merge) for terms in matched[:-1]]
+        levels.append(self.prefix_levels.get((words[-1], merge)) if prefix_ok else None)
+        if levels[-1] is None:
+            levels[-1] = self._levels(matched[-1], merge)
+        return self._top(levels, limit, any(len(terms) > 1 for terms in matched))
+
+    def _levels(self, terms: List[Tuple[int, float]], merge: bool) -> List[Level]:
+        """A query word's levels: runs of the (score, documents, set) blocks it
+        matches, best first.
+
+        Without merge each block is a level. With merge, runs of small blocks
+        are one level, whose documents are scored one by one, so combining
+        words does not visit many tiny levels.
+        """
+        if len(terms) == 1 and terms[0][1] == 1.0:
+            blocks = self.blocks[terms[0][0]]
+        else:
+            blocks = [(score * factor, docs, members)
+                      for term, factor in terms for score, docs, members in self.blocks[term]]
+            blocks.sort(key=lambda block: -block[0])
+        runs, size = [], 0
+        for block in blocks:
+            if not runs or not merge or size + len(block[1]) > MERGED_LEVEL:
+                runs.append([])
+                size = 0
+            runs[-1].append(block)
+            size += len(block[1])
+        return [(run[0][0], run, run[0][2] if len(run) == 1 else set().union(*(block[2] for block in run)))
+                for run in runs]
+
+    @staticmethod
+    def _top(levels: List[List[Level]], limit: int, overlapping: bool) -> List[Tuple[int, float]]:
+        """Top documents matching every word, ties by document.
+
+        A combination of one level per word scores at most the sum of its
+        levels' best scores, and its successors (one level further down in
+        one word) no more, so combinations come off a heap best first.
+        Search stops once the next one cannot beat the weakest of the best
+        `limit`.
+
+        The levels of a word that matches several terms overlap; a document
+        scores by its best term, which is the first combination reaching it.
+        """
+        seen: Set[int] = set()
+        best: List[Tuple[float, int]] = []
+
+        def offer(score: float, doc: int) -> bool:
+            """Keep doc if it is among the best so far"""
+            entry = (score, -doc)
+            if len(best) < limit:
+                heapq.heappush(best, entry)
+            elif entry > best[0]:
+                heapq.heapreplace(best, entry)
+            else:
+                return False
+            return True
+
+        bound = lambda at: sum(levels[w][i][0] for w, i in enumerate(at))
+        start = (0,) * len(levels)
+        frontier = [(-bound(start), start)]
+        while frontier:
+            total, at = heapq.heappop(frontier)
+            total = -total
+            if len(best) == limit and total < best[0][0]:
+                break
+            chosen = [levels[w][i] for w, i in enumerate(at)]
+            if all(len(blocks) == 1 for _, blocks, _ in chosen):
+                # Every document scores total, so they rank by number and the first that misses
+                # ends the combination
+                blocks = sorted((level[1][0] for level in chosen), key=lambda block: len(block[1]))
+                for doc in common_documents(blocks):
+                    if overlapping:
+                        if doc in seen:
+                            continue
+                        seen.add(doc)
+                    if not offer(total, doc):
+                        break
+            else:
+                sets = sorted((members for _, _, members in chosen), key=len)
+                docs = sets[0].intersection(*sets[1:])
+                if overlapping:
+                    docs -= seen
+                    seen |= docs
+                # A word's score has to make up for the others being below their best; a little
+                # lower floor keeps the documents that only rounding would leave out
+                floor = best[0][0] - total - 1e-9 if len(best) == limit else -math.inf
+                scores = [best_scores(blocks, docs, floor + score) if len(blocks) > 1 else None
+                          for score, blocks, _ in chosen]
+                for doc in min((s for s in scores if s is not None), key=len):
+                    score = 0.0
+                    for level, word_scores in zip(chosen, scores):
+                        if word_scores is None:
+                            score += level[0]
+                        elif doc in word_scores:
+                            score += word_scores[doc]
+                        else:
+                            break
+                    else:
+                        offer(score, doc)
+            # Each combination is reached from one parent: the one with its last raised level lowered
+            last = max((w for w, i in enumerate(at) if i), default=0)
+            for w in range(last, len(at)):
+                if at[w] + 1 < len(levels[w]):
+                    successor = at[:w] + (at[w] + 1,) + at[w + 1:]
+                    heapq.heappush(frontier, (-bound(successor), successor))
+        return [(-doc, total) for total, doc in sorted(best, reverse=True)]
+
+    def results(self, query: str, limit: int = 20) -> List[Dict]:
+        """Matches with the stored title, year and type"""
+        return [{"id": doc, "score": round(score, 3), "title": self.docs[doc][0],
+                 "year": self.docs[doc][1], "type": self.docs[doc][2]}
+                for doc, score in self.search(query, limit)]
+
+
+def build(publications_path: Path = PUBLICATIONS_FILE, output: Path = INDEX_FILE) -> Dict:
+    with open(publications_path) as f:
+        publications = json.load(f).get("publications", [])
+    index = build_index(publications)
+    write_index(index, output)
+    return index
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Build the publication search index")
+    parser.add_argument("--publications", type=Path, default=PUBLICATIONS_FILE)
+    parser.add_argument("--output", type=Path, default=INDEX_FILE)
+    parser.add_argument("--query", help="Search the built index instead of building it")
+    args = parser.parse_args(argv)
+
+    if args.query is not None:
+        for hit in SearchIndex.load(args.output).results(args.query):
+            print(f"{hit['score']:8.2f}  {hit['year'] or '':>4}  {hit['title']}")
+        return
+    build(args.publications, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+import json
+import re
+import statistics
+from dataclasses import dataclass, field, asdict
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Type
+
+if TYPE_CHECKING:
+    from pydantic import BaseModel
+
+# Rough sub-word split used when tiktoken is not installed: words are cut into
+# 4-character pieces, which tracks BPE token counts closely for English text
+_TOKEN_PATTERN = re.compile(r"\w{1,4}|[^\w\s]")
+
+# Tokens assumed per generated string / list element when sizing output caps
+TOKENS_PER_STRING = 12
+ITEMS_PER_LIST = 5
+
+
+@lru_cache(maxsize=None)
+def _encoding():
+    """Load the tiktoken encoding on first use; None when tiktoken is missing"""
+    try:
+        import tiktoken
+    except ImportError:  # tiktoken is optional; fall back to a regex approximation
+        return None
+    return tiktoken.get_encoding("cl100k_base")
+
+
+def count_tokens(text: str) -> int:
+    """Count tokens in text with the local tokenizer"""
+    if not text:
+        return 0
+    encoding = _encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return len(_TOKEN_PATTERN.findall(text))
+
+
+def truncate_to_tokens(text: str, budget: int) -> str:
+    """Truncate text so that it fits into a token budget"""
+    if budget <= 0:
+        return ""
+    encoding = _encoding()
+    if encoding is not None:
+        tokens = encoding.encode(text)
+        if len(tokens) <= budget:
+            return text
+        return encoding.decode(tokens[:budget]).rstrip()
+
+    matches = list(_TOKEN_PATTERN.finditer(text))
+    if len(matches) <= budget:
+        return text
+    return text[:matches[budget - 1].end()].rstrip()
+
+
+def token_offsets(text: str) -> List[int]:
+    """Character offset at which each token of text starts"""
+    encoding = _encoding()
+    if encoding is not None:
+        return encoding.decode_with_offsets(encoding.encode(text))[1]
+    return [m.start() for m in _TOKEN_PATTERN.finditer(text)]
+
+
+def split_at_tokens(text: str, max_tokens: int) -> List[str]:
+    """Cut text into pieces of at most max_tokens at token boundaries.
+
+    Pieces are sliced from text itself, so nothing is lost or duplicated;
+    pieces that are only whitespace are dropped.
+    """
+    offsets = token_offsets(text) + [len(text)]
+    step = max(max_tokens, 1)
+    pieces = (text[offsets[i]:offsets[min(i + step, len(offsets) - 1)]].strip()
+              for i in range(0, len(offsets) - 1, step))
+    return [piece for piece in pieces if piece]
+
+
+def chunk_text(text: str, max_tokens: int) -> List[str]:
+    """Split text into chunks of at most max_tokens, breaking at blank lines"""
+    chunks, current, size = [], [], 0
+    for paragraph in re.split(r'\n\s*\n', text):
+        if not paragraph.strip():
+            continue
+        tokens = count_tokens(paragraph)
+
+        # Paragraphs longer than a whole chunk are cut at token boundaries;
+        # the last piece may share a chunk with the paragraphs after it
+        if tokens > max_tokens:
+            if current:
+                chunks.append("\n\n".join(current))
+                current, size = [], 0
+            *whole, paragraph = split_at_tokens(paragraph, max_tokens)
+            chunks.extend(whole)
+            tokens = count_tokens(paragraph)
+
+        if current and size + tokens > max_tokens:
+            chunks.append("\n\n".join(current))
+            current, size = [], 0
+        if paragraph:
+            current.append(paragraph)
+            size += tokens
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+
+def compact_latex_entry(text: str) -> str:
+    """Reduce a LaTeX CV entry to plain text without URLs or DOIs"""
+    # Keep link text, drop link targets
+    text = re.sub(r'\\href\{[^}]*\}\{([^}]*)\}', r'\1', text)
+    text = re.sub(r'\\url\{[^}]*\}', '', text)
+
+    # Drop bare URLs and DOIs
+    text = re.sub(r'https?://\S+', '', text)
+    text = re.sub(r'\bdoi:\s*\S+', '', text, flags=re.IGNORECASE)
+    text = re.sub(r'\b10\.\d{4,9}/\S+', '', text)
+
+    # Unwrap formatting commands and remove the rest
+    text = re.sub(r'\\(?:textbf|textit|emph|underline|textsc|sc)\{([^}]*)\}', r'\1', text)
+    text = re.sub(r'\\(?:begin|end)\{[^}]*\}', '', text)
+    text = re.sub(r'\\item\b', '', text)
+    text = text.replace('\\&', '&').replace('\\%', '%').replace('~', ' ')
+    text = re.sub(r'\\[a-zA-Z]+\*?', '', text)
+    text = re.sub(r'[{}]', '', text)
+
+    # Clean up whitespace and dangling punctuation left by removed links
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'\s+([.,;:])', r'\1', text)
+    text = re.sub(r'([.,;:])(?:\s+[.,;:])+', r'\1', text)
+    return text.strip()
+
+
+def compact_for_prompt(text: str, budget: int) -> str:
+    """Compact a LaTeX entry and truncate it to a token budget"""
+    return truncate_to_tokens(compact_latex_entry(text), budget)
+
+
+def _schema_tokens(schema: Dict, definitions: Dict) -> int:
+    """Estimate the tokens needed to emit a value matching a JSON schema"""
+    if "$ref" in schema:
+        return _schema_tokens(definitions[schema["$ref"].split("/")[-1]], definitions)
+    if "anyOf" in schema:
+        return max(_schema_tokens(option, definitions) for option in schema["anyOf"])
+    if "enum" in schema:
+        return max(count_tokens(json.dumps(value)) for value in schema["enum"])
+    if "const" in schema:
+        return count_tokens(json.dumps(schema["const"]))
+
+    schema_type = schema.get("type")
+    if schema_type == "object":
+        total = 2
+        for name, prop in schema.get("properties", {}).items():
+            total += count_tokens(json.dumps(name)) + 2
+            total += _schema_tokens(prop, definitions)
+        return total
+    if schema_type == "array":
+        items = schema.get("maxItems", ITEMS_PER_LIST)
+        return 2 + items * (_schema_tokens(schema.get("items", {}), definitions) + 1)
+    if schema_type == "string":
+        return TOKENS_PER_STRING
+    return 4
+
+
+def output_token_cap(model: Type["BaseModel"], headroom: float = 1.5, minimum: int = 64) -> int:
+    """Derive a max_tokens cap from the size of the expected JSON response"""
+    schema = model.model_json_schema()
+    estimate = _schema_tokens(schema, schema.get("$defs", {}))
+    return max(minimum, int(estimate * headroom))
+
+
+@dataclass
+class CallUsage:
+    """Token and latency figures for a single completion call"""
+    label: str
+    prompt_tokens: int
+    completion_tokens: int
+    latency_s: float
+
+
+@dataclass
+class UsageReport:
+    """Collects per-call usage for one run and summarizes it"""
+    calls: List[CallUsage] = field(default_factory=list)
+
+    def record(self, label: str, prompt: str, completion: str, latency_s: float) -> CallUsage:
+        """Measure a prompt/completion pair and add it to the report"""
+        usage = CallUsage(
+            label=label,
+            prompt_tokens=count_tokens(prompt),
+            completion_tokens=count_tokens(completion),
+            latency_s=latency_s
+        )
+        self.calls.append(usage)
+        return usage
+
+    def summary(self) -> Dict:
+        """Aggregate token and latency figures across all calls"""
+        if not self.calls:
+            return {"calls": 0}
+
+        latencies = sorted(call.latency_s for call in self.calls)
+        prompt_tokens = sum(call.prompt_tokens for call in self.calls)
+        completion_tokens = sum(call.completion_tokens for call in self.calls)
+        return {
+            "calls": len(self.calls),
+            "tokenizer": "tiktoken/cl100k_base" if _encoding() is not None else "approximate",
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "mean_prompt_tokens": round(prompt_tokens / len(self.calls), 1),
+            "mean_completion_tokens": round(completion_tokens / len(self.calls), 1),
+            "total_latency_s": round(sum(latencies), 3),
+            "p50_latency_s": round(statistics.median(latencies), 3),
+            "max_latency_s": round(latencies[-1], 3),
+        }
+
+    def save(self, path: Path, extra: Optional[Dict] = None):
+        """Write the summary and per-call figures to a JSON file"""
+        report = {"summary": self.summary(), "calls": [asdict(call) for call in self.calls]}
+        if extra:
+            report.update(extra)
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2)
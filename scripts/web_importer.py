@@ -1,39 +1,54 @@
+import time
 import streamlit as st
 from pathlib import Path
 from cv_importer import CVImporter
+from import_jobs import FAILED, ImportJobs, upload_key
+
+# Seconds between progress checks while a job is running
+POLL_INTERVAL = 0.5
+
+@st.cache_resource
+def import_jobs() -> ImportJobs:
+    """Worker pool and job results shared by every session"""
+    return ImportJobs()
 
 def cv_upload_page():
     st.title("CV Importer")
-    
+
     uploaded_file = st.file_uploader("Choose your CV file", type=['tex'])
-    
+
     if uploaded_file:
-        # Save uploaded file temporarily
-        temp_path = Path("temp") / uploaded_file.name
-        temp_path.parent.mkdir(exist_ok=True)
-        
-        try:
-            temp_path.write_bytes(uploaded_file.getvalue())
-            
-            # Import CV
-            importer = CVImporter(temp_path)
-            data = importer.import_cv()
-            
-            # Show preview
-            st.subheader("Import Preview")
-            for section, content in data.items():
-                with st.expander(f"{section.title()} Preview"):
-                    st.json(content)
-            
-            # Save button
-            if st.button("Save Imported Data"):
-                importer.save_data(data)
-                st.success("CV data imported successfully!")
-                
-        finally:
-            # Cleanup
-            if temp_path.exists():
-                temp_path.unlink()
-            
+        # Hash each upload once per session rather than on every rerun
+        keys = st.session_state.setdefault("upload_keys", {})
+        if uploaded_file.file_id not in keys:
+            keys[uploaded_file.file_id] = upload_key(uploaded_file.getvalue())
+        key = keys[uploaded_file.file_id]
+
+        jobs = import_jobs()
+        job = jobs.get(key)
+        if job is None or job.status == FAILED and st.button("Retry"):
+            job = jobs.submit(uploaded_file.name, uploaded_file.getvalue(), key)
+
+        if job.pending:
+            st.progress(job.progress, text=job.message)
+            time.sleep(POLL_INTERVAL)
+            st.rerun()
+
+        if not job.finished_ok:
+            st.error(f"Could not import {job.name}: {job.error}")
+            return
+        data = job.result
+
+        # Show preview
+        st.subheader("Import Preview")
+        for section, content in data.items():
+            with st.expander(f"{section.title()} Preview"):
+                st.json(content)
+
+        # Save button
+        if st.button("Save Imported Data"):
+            CVImporter(Path(job.name)).save_data(data)
+            st.success("CV data imported successfully!")
+
 if __name__ == "__main__":
-    cv_upload_page() 
\ No newline at end of file
+    cv_upload_page()
@@ -1,72 +1,110 @@
+import { createHash } from 'crypto';
 import { promises as fs } from 'fs';
 import path from 'path';
 import { NextResponse } from 'next/server';
+import { buildPayload } from '@/utils/publicationPayload.mjs';
 
 // Define the route as dynamic to avoid static generation errors
 export const dynamic = 'force-dynamic';
 
-// Helper function to normalize author names for comparison
-function normalizeAuthorName(name: string): string {
-  return name.toLowerCase()
-    .replace(/\./g, '') // Remove periods
-    .replace(/\s+/g, '') // Remove spaces
-    .trim();
+const DATA_DIR = path.join(process.cwd(), 'src/data');
+const BUNDLE_DIR = path.join(process.cwd(), 'public/data/publications');
+// Files the bundles are built from, as named in manifest.sources
+const BUNDLE_SOURCES = ['publications.json', 'authors.json', 'author-index.json'];
+// Served with each encoding, best first, when the manifest lists it
+const ENCODINGS: [string, string][] = [['br', '.br'], ['gzip', '.gz']];
+
+interface BundleManifest {
+  version: string;
+  sources: Record<string, string>;
+  encodings: string[];
+  files: Record<string, { path: string }>;
+}
+
+// Source hashes by file stamp, so unchanged sources are not re-read per request
+const sourceHashes = new Map<string, { stamp: string; hash: string }>();
+
+async function sourceHash(name: string): Promise<string> {
+  const file = path.join(DATA_DIR, name);
+  let stamp: string;
+  try {
+    const stat = await fs.stat(file);
+    stamp = `${stat.mtimeMs}:${stat.size}:${stat.ino}`;
+  } catch {
+    return '';
+  }
+  const cached = sourceHashes.get(name);
+  if (cached && cached.stamp === stamp) return cached.hash;
+  const hash = createHash('sha256').update(await fs.readFile(file)).digest('hex').slice(0, 12);
+  sourceHashes.set(name, { stamp, hash });
+  return hash;
+}
+
+// The manifest of the prebuilt bundles, if they were built from the current data files
+async function readManifest(): Promise<BundleManifest | null> {
+  let manifest: BundleManifest;
+  try {
+    manifest = JSON.parse(await fs.readFile(path.join(BUNDLE_DIR, 'manifest.json'), 'utf8'));
+  } catch {
+    return null;
+  }
+  const hashes = await Promise.all(BUNDLE_SOURCES.map(sourceHash));
+  const current = BUNDLE_SOURCES.every((name, i) => (manifest.sources?.[name] ?? '') === hashes[i]);
+  return current && manifest.files?.all ? manifest : null;
+}
+
+// The "all" bundle, precompressed when the client accepts an encoding it was built with
+async function readBundle(request: Request): Promise<NextResponse | null> {
+  const manifest = await readManifest();
+  if (!manifest) return null;
+  const file = path.join(BUNDLE_DIR, manifest.files.all.path);
+  const etag = `"${manifest.files.all.path}"`;
+  const headers: Record<string, string> = {
+    'Content-Type': 'application/json',
+    'Cache-Control': 'public, max-age=0, must-revalidate',
+    'ETag': etag,
+    'Vary': 'Accept-Encoding',
+  };
+  if (request.headers.get('if-none-match') === etag) {
+    return new NextResponse(null, { status: 304, headers });
+  }
+
+  const accepted = (request.headers.get('accept-encoding') || '').toLowerCase();
+  for (const [encoding, suffix] of ENCODINGS) {
+    if (!manifest.encodings?.includes(suffix.slice(1)) || !accepted.includes(encoding)) continue;
+    try {
+      const body = await fs.readFile(file + suffix);
+      return new NextResponse(body, { headers: { ...headers, 'Content-Encoding': encoding } });
+    } catch {
+      // Fall through to the next encoding, or the plain file
+    }
+  }
+  try {
+    return new NextResponse(await fs.readFile(file), { headers });
+  } catch {
+    return null;
+  }
 }
 
 // GET /api/publications
 // Public route to get all publications with author details
-export async function GET() {
+export async function GET(request: Request) {
   try {
-    // Read both publications and authors data
-    const publicationsPath = path.join(process.cwd(), 'src/data/publications.json');
-    const authorsPath = path.join(process.cwd(), 'src/data/authors.json');
-    
-    const [publicationsJson, authorsJson] = await Promise.all([
-      fs.readFile(publicationsPath, 'utf8'),
-      fs.readFile(authorsPath, 'utf8')
+    // Serve the build-time bundle when it matches the current data files
+    const bundle = await readBundle(request);
+    if (bundle) return bundle;
+
+    // Build the same payload from the data files
+    const [publicationsJson, authorsJson, authorIndexJson] = await Promise.all([
+      fs.readFile(path.join(DATA_DIR, 'publications.json'), 'utf8'),
+      fs.readFile(path.join(DATA_DIR, 'authors.json'), 'utf8'),
+      fs.readFile(path.join(DATA_DIR, 'author-index.json'), 'utf8').catch(() => '{}'),
     ]);
-    
-    const { publications, grants } = JSON.parse(publicationsJson);
     const { authors } = JSON.parse(authorsJson);
+    const { aliases } = JSON.parse(authorIndexJson);
 
-    // Add author details to each publication
-    const publicationsWithAuthors = publications.map((pub: any) => {
-      // Ensure authors is always an array
-      const rawAuthors = Array.isArray(pub.authors) ? pub.authors : [pub.authors];
-      
-      // Create a set of normalized author names to track uniqueness
-      const uniqueNormalizedNames = new Set<string>();
-      const uniqueAuthors: string[] = [];
-      
-      // Process each author
-      rawAuthors.forEach((author: string) => {
-        if (!author || author.trim() === '') return;
-        
-        // Normalize the name for comparison
-        const normalizedName = normalizeAuthorName(author);
-        
-        // Only add if we haven't seen this normalized name before
-        if (!uniqueNormalizedNames.has(normalizedName)) {
-          uniqueNormalizedNames.add(normalizedName);
-          uniqueAuthors.push(author.trim());
-        }
-      });
-
-      // Remove the location field if it matches an author name
-      const { location, ...pubWithoutLocation } = pub;
-
-      return {
-        ...pubWithoutLocation,
-        // Use the deduplicated author list
-        authors: uniqueAuthors,
-        // Add author details mapping
-        authorDetails: authors
-      };
-    });
-
-    return NextResponse.json({
-      publications: publicationsWithAuthors,
-      grants
+    return NextResponse.json(buildPayload(JSON.parse(publicationsJson), authors || {}, aliases || {}), {
+      headers: { 'Cache-Control': 'public, max-age=0, must-revalidate' }
     });
   } catch (error) {
     console.error('Error loading publications data:', error);
@@ -0,0 +1,44 @@
+import { promises as fs } from 'fs';
+import path from 'path';
+import { NextResponse } from 'next/server';
+import { loadIndex, results } from '@/utils/publicationSearch.mjs';
+
+// Define the route as dynamic to avoid static generation errors
+export const dynamic = 'force-dynamic';
+
+// Written by scripts/search_index.py (make search-index)
+const INDEX_FILE = path.join(process.cwd(), 'public/data/search/index.json');
+const DEFAULT_LIMIT = 20;
+const MAX_LIMIT = 100;
+
+// The decoded index by file stamp, so an unchanged index is not re-read per request
+let cached: { stamp: string; index: ReturnType<typeof loadIndex> } | null = null;
+
+async function readIndex(): Promise<ReturnType<typeof loadIndex>> {
+  const stat = await fs.stat(INDEX_FILE);
+  const stamp = `${stat.mtimeMs}:${stat.size}:${stat.ino}`;
+  if (cached && cached.stamp === stamp) return cached.index;
+  const index = loadIndex(JSON.parse(await fs.readFile(INDEX_FILE, 'utf8')));
+  cached = { stamp, index };
+  return index;
+}
+
+// GET /api/search?q=geometry%20teach&limit=20
+// Public route to search publications by title, authors, venue and description
+export async function GET(request: Request) {
+  const params = new URL(request.url).searchParams;
+  const query = params.get('q') || '';
+  const limit = Math.min(parseInt(params.get('limit') || '', 10) || DEFAULT_LIMIT, MAX_LIMIT);
+  try {
+    const index = await readIndex();
+    return NextResponse.json({ query, hits: results(index, query, limit) }, {
+      headers: { 'Cache-Control': 'public, max-age=0, must-revalidate' }
+    });
+  } catch (error) {
+    console.error('Error searching publications:', error);
+    return NextResponse.json(
+      { error: 'Failed to search publications' },
+      { status: 500 }
+    );
+  }
+}
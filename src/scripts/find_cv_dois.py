@@ -1,4 +1,4 @@
-import requests
+import argparse
 import re
 import time
 import json
@@ -148,6 +148,8 @@ def search_crossref(pub: Publication) -> Optional[str]:
     max_retries = 3
     retry_delay = 2  # seconds
     
+    import requests  # loaded only when a search runs
+
     for attempt in range(max_retries):
         try:
             response = requests.get(base_url, params=params, headers=headers, timeout=10)
@@ -220,6 +222,8 @@ def search_semantic_scholar(pub: Publication) -> Optional[str]:
     max_retries = 3
     retry_delay = 2  # seconds
     
+    import requests  # loaded only when a search runs
+
     for attempt in range(max_retries):
         try:
             response = requests.get(base_url, params=params, timeout=10)
@@ -364,8 +368,10 @@ if __name__ == "__main__":
     script_dir = os.path.dirname(os.path.abspath(__file__))
     project_root = os.path.abspath(os.path.join(script_dir, '../..'))
     
-    # Path to the CV file
-    cv_path = os.path.join(project_root, 'src', 'data', 'cv', 'CV_ion.tex')
+    parser = argparse.ArgumentParser(description='Find missing DOIs for publications in a LaTeX CV')
+    parser.add_argument('cv_path', nargs='?', default=os.path.join(project_root, 'src', 'data', 'cv', 'CV_ion.tex'),
+                        help='Path to the CV file')
+    cv_path = parser.parse_args().cv_path
     
     # Check if the file exists
     if not os.path.exists(cv_path):
@@ -1,4 +1,4 @@
-import requests
+import argparse
 import re
 import time
 import json
@@ -95,6 +95,8 @@ def search_crossref(pub: Publication) -> Optional[str]:
     max_retries = 3
     retry_delay = 2  # seconds
     
+    import requests  # loaded only when a search runs
+
     for attempt in range(max_retries):
         try:
             response = requests.get(base_url, params=params, headers=headers, timeout=10)
@@ -167,6 +169,8 @@ def search_semantic_scholar(pub: Publication) -> Optional[str]:
     max_retries = 3
     retry_delay = 2  # seconds
     
+    import requests  # loaded only when a search runs
+
     for attempt in range(max_retries):
         try:
             response = requests.get(base_url, params=params, timeout=10)
@@ -260,8 +264,10 @@ def main():
     script_dir = os.path.dirname(os.path.abspath(__file__))
     project_root = os.path.abspath(os.path.join(script_dir, '../..'))
     
-    # Path to the publications.json file
-    json_path = os.path.join(project_root, 'src', 'data', 'publications.json')
+    parser = argparse.ArgumentParser(description='Find missing DOIs for publications.json')
+    parser.add_argument('--json-path', default=os.path.join(project_root, 'src', 'data', 'publications.json'),
+                        help='Path to the publications.json file')
+    json_path = parser.parse_args().json_path
     
     # Load publications from JSON
     publications = load_publications_from_json(json_path)
@@ -0,0 +1,78 @@
+/**
+ * The /api/publications payload, built from publications.json, authors.json
+ * and the aliases of author-index.json.
+ *
+ * This mirrors build_bundles in scripts/publication_bundles.py, which writes
+ * the same payload ahead of time as the "all" bundle. The route falls back to
+ * this when the bundle is stale, so the two must produce identical JSON;
+ * tests/test_publication_bundles.py runs both on the same data and compares.
+ * Plain JavaScript, so that test can run it with node.
+ */
+
+/** Comparison form of an author name */
+export function normalizeAuthorName(name) {
+  return name.toLowerCase().replace(/[.\s]/g, '');
+}
+
+const has = (object, key) => Object.prototype.hasOwnProperty.call(object, key);
+
+/**
+ * Normalised name -> authors.json key. Aliases (variant -> canonical name)
+ * also map the variants of authors whose canonical name is in authors.json.
+ */
+export function authorIndex(authors, aliases = {}) {
+  const index = {};
+  for (const name of Object.keys(authors)) index[normalizeAuthorName(name)] = name;
+  for (const [variant, canonical] of Object.entries(aliases || {})) {
+    const key = normalizeAuthorName(variant);
+    if (has(authors, canonical) && !has(index, key)) index[key] = canonical;
+  }
+  return index;
+}
+
+/** A publication with deduplicated authors and the details of just those authors */
+export function joinAuthors(pub, authors, index) {
+  const raw = pub.authors || [];
+  const names = [];
+  const seen = new Set();
+  for (let name of Array.isArray(raw) ? raw : [raw]) {
+    name = (name || '').trim();
+    if (name && !seen.has(normalizeAuthorName(name))) {
+      seen.add(normalizeAuthorName(name));
+      names.push(name);
+    }
+  }
+
+  const joined = {};
+  for (const [key, value] of Object.entries(pub)) {
+    if (key !== 'location') joined[key] = value;
+  }
+  // location holds an author name in the CV export; keep it only when it is a place
+  if (pub.location && !raw.includes(pub.location)) joined.location = pub.location;
+  joined.authors = names;
+  const details = {};
+  for (const name of names) {
+    const key = has(authors, name) ? name : index[normalizeAuthorName(name)];
+    if (key) details[name] = authors[key];
+  }
+  joined.authorDetails = details;
+  return joined;
+}
+
+/** Newest first; undated entries last; then by title */
+function comparePublications(a, b) {
+  const year = (pub) => (Number.isInteger(pub.year) ? -pub.year : 1);
+  if (year(a) !== year(b)) return year(a) - year(b);
+  const titleA = (a.title || '').toLowerCase();
+  const titleB = (b.title || '').toLowerCase();
+  return titleA < titleB ? -1 : titleA > titleB ? 1 : 0;
+}
+
+/** {publications, grants} as the "all" bundle holds them */
+export function buildPayload(data, authors, aliases = {}) {
+  const index = authorIndex(authors, aliases);
+  const publications = (data.publications || [])
+    .map((pub) => joinAuthors(pub, authors, index))
+    .sort(comparePublications);
+  return { publications, grants: data.grants || [] };
+}
@@ -0,0 +1,125 @@
+/**
+ * Search over public/data/search/index.json, the index artifact written by
+ * scripts/search_index.py.
+ *
+ * This mirrors SearchIndex in that script: the same tokens, prefix
+ * expansions and scores, so /api/search ranks as `search_index.py --query`
+ * does; tests/test_search_index.py runs both on the same index and
+ * compares. It scores every block of the terms a query matches rather than
+ * stopping at the best ones, which is plenty for the site's publications.
+ * Plain JavaScript, so that test can run it with node.
+ */
+
+export const VERSION = 3;
+// Prefixes shorter than this only match whole words
+const MIN_PREFIX = 2;
+// A prefix expands to at most this many terms, the most common ones
+const MAX_EXPANSIONS = 32;
+// Prefix matches rank below whole-word matches
+const PREFIX_WEIGHT = 0.7;
+
+const STOPWORDS = new Set(
+  'a an and are as at be by for from in into is it of on or the to with'.split(' '));
+
+/** Lower-case words without accents; stop words and single letters dropped */
+export function tokenize(text) {
+  const folded = text.normalize('NFKD').replace(/\p{Mn}/gu, '').toLowerCase();
+  return (folded.match(/[a-z0-9]+/g) || [])
+    .filter((t) => !STOPWORDS.has(t) && (t.length > 1 || /^[0-9]+$/.test(t)));
+}
+
+/**
+ * The artifact with its posting lists decoded: for each term, blocks of
+ * [score of one document for the term, its documents in order], best first.
+ */
+export function loadIndex(index) {
+  if (index.version !== VERSION) {
+    throw new Error(`Unsupported search index version ${JSON.stringify(index.version)}`);
+  }
+  const blocks = index.postings.map((flat) => {
+    const decoded = [];
+    for (let i = 0; i < flat.length; i += 2 + flat[i + 1]) {
+      const docs = [];
+      let doc = 0;
+      for (const gap of flat.slice(i + 2, i + 2 + flat[i + 1])) docs.push((doc += gap));
+      decoded.push([flat[i], docs]);
+    }
+    return decoded;
+  });
+  const df = blocks.map((termBlocks) => termBlocks.reduce((n, [, docs]) => n + docs.length, 0));
+  const idf = df.map((n) => Math.log(1 + index.docs.length / n));
+  return {
+    docs: index.docs,
+    terms: index.terms,
+    df,
+    blocks: blocks.map((termBlocks, t) => termBlocks.map(([weight, docs]) => [weight * idf[t], docs])),
+  };
+}
+
+/** First position in the sorted terms not before token */
+function lowerBound(terms, token) {
+  let lo = 0;
+  let hi = terms.length;
+  while (lo < hi) {
+    const mid = (lo + hi) >> 1;
+    if (terms[mid] < token) lo = mid + 1;
+    else hi = mid;
+  }
+  return lo;
+}
+
+/** [term number, factor] for the terms a query word matches */
+function matchingTerms(index, token, prefix) {
+  const i = lowerBound(index.terms, token);
+  const exact = index.terms[i] === token;
+  const found = exact ? [[i, 1.0]] : [];
+  if (prefix && token.length >= MIN_PREFIX) {
+    // The most common terms longer than token that start with it; ties keep term order
+    const longer = [];
+    for (let t = i + (exact ? 1 : 0); t < index.terms.length && index.terms[t].startsWith(token); t++) {
+      longer.push(t);
+    }
+    longer.sort((a, b) => index.df[b] - index.df[a] || a - b);
+    for (const t of longer.slice(0, MAX_EXPANSIONS)) found.push([t, PREFIX_WEIGHT]);
+  }
+  return found;
+}
+
+/** [doc, score] of the best matches for every word in query, ties by document */
+export function search(index, query, limit = 20) {
+  const words = tokenize(query);
+  if (!words.length || limit <= 0) return [];
+  // A trailing space or punctuation means the last word is complete
+  const prefixOk = /[\p{L}\p{N}]$/u.test(query);
+  const matched = words.map((word, i) => matchingTerms(index, word, prefixOk && i === words.length - 1));
+  if (matched.some((terms) => !terms.length)) return [];
+
+  let totals = null;
+  for (const terms of matched) {
+    // A document scores for a word by the best term it has
+    const best = new Map();
+    for (const [term, factor] of terms) {
+      for (const [score, docs] of index.blocks[term]) {
+        const value = score * factor;
+        for (const doc of docs) {
+          if (!(best.get(doc) >= value)) best.set(doc, value);
+        }
+      }
+    }
+    const next = new Map();
+    for (const [doc, value] of best) {
+      if (totals === null) next.set(doc, 0.0 + value);
+      else if (totals.has(doc)) next.set(doc, totals.get(doc) + value);
+    }
+    totals = next;
+  }
+  return [...totals].sort((a, b) => b[1] - a[1] || a[0] - b[0]).slice(0, limit);
+}
+
+/** Matches with the stored title, year and type */
+export function results(index, query, limit = 20) {
+  return search(index, query, limit).map(([doc, score]) => {
+    const [title, year, type] = index.docs[doc];
+    return { id: doc, score: Number(score.toFixed(3)), title, year, type };
+  });
+}
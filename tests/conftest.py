@@ -0,0 +1,25 @@
+import sys
+import os
+
+import pytest
+
+# Add the project root and scripts directory to Python path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "scripts"))
+
+from scripts.llm_stub import LocalLLMClient, StubSettings, serve_in_background, server_url
+
+@pytest.fixture
+def stub_server():
+    """Start stub LLM servers with the given StubSettings fields; returns a client for each"""
+    def start(**settings):
+        server = serve_in_background(StubSettings(**settings))
+        servers.append(server)
+        return LocalLLMClient(server_url(server))
+
+    servers = []
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
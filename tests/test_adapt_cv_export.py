@@ -0,0 +1,90 @@
+import json
+import sys
+import os
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "scripts"))
+
+jinja2 = pytest.importorskip("jinja2")
+pytest.importorskip("yaml")
+
+from scripts import adapt_cv
+
+@pytest.fixture
+def adapter(tmp_path, monkeypatch):
+    (tmp_path / "config").mkdir()
+    (tmp_path / "config" / "cv_config.yaml").write_text(
+        "contexts: [teaching, industry]\nformats: [tex]\n")
+    (tmp_path / "templates").mkdir()
+    (tmp_path / "templates" / "academic_template.tex").write_text(
+        "{{ context }}: {% for area in areas %}{{ area }} {% endfor %}{{ missing.section }}")
+    (tmp_path / "templates" / "industry_template.tex").write_text("industry {{ areas|length }}")
+    (tmp_path / "data").mkdir()
+    (tmp_path / "data" / "areas.json").write_text(json.dumps({"Learning Analytics": {}}))
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(adapt_cv, "CONFIG_PATH", tmp_path / "config" / "cv_config.yaml")
+    adapt_cv.get_config.cache_clear()
+    cv_adapter = adapt_cv.CVAdapter()
+    cv_adapter.data_dir = tmp_path / "data"
+    cv_adapter.template_dir = tmp_path / "templates"
+    yield cv_adapter
+    adapt_cv.get_config.cache_clear()
+
+def test_export_all_renders_each_context(adapter):
+    results = adapter.export_all()
+    assert [r["status"] for r in results] == ["written", "written"]
+    exports = adapter.output_dir / "exports"
+    assert (exports / "cv_teaching.tex").read_text() == "teaching: Learning Analytics "
+    assert (exports / "cv_industry.tex").read_text() == "industry 1"
+
+def test_export_all_skips_unchanged_sources(adapter):
+    adapter.export_all()
+    assert [r["status"] for r in adapter.export_all()] == ["unchanged", "unchanged"]
+
+    adapted = adapter.output_dir / "adapted"
+    adapted.mkdir()
+    (adapted / "teaching.json").write_text(json.dumps({"areas": ["Assessment"]}))
+    statuses = {r["context"]: r["status"] for r in adapter.export_all()}
+    assert statuses == {"teaching": "written", "industry": "unchanged"}
+
+def test_llm_client_is_created_once_across_threads(adapter, monkeypatch):
+    import threading
+    import time
+    created = []
+
+    def slow_connect():
+        time.sleep(0.01)
+        created.append(object())
+        return created[-1]
+
+    monkeypatch.setattr(adapter.llm, "_connect", slow_connect)
+    clients = []
+    threads = [threading.Thread(target=lambda: clients.append(adapter.llm.llm)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(created) == 1
+    assert all(client is created[0] for client in clients)
+
+def test_fully_cached_analysis_records_cache_hits(adapter, stub_server, monkeypatch, tmp_path):
+    adapt_cv.CONFIG_PATH.write_text(
+        "contexts: [teaching]\nllm: {model: m, max_tokens: 200, temperature: 0}\n"
+        "analysis: {chunk_tokens: 6000, merge_fan_in: 2}\n")
+    adapt_cv.get_config.cache_clear()
+    monkeypatch.setenv("LLM_BASE_URL", stub_server().base_url)
+    cvs = []
+    for name in ("a.tex", "b.tex"):
+        cvs.append(tmp_path / name)
+        cvs[-1].write_text(f"Reference CV {name}")
+    adapter.analyze_reference_cvs(cvs, max_workers=2)
+
+    cached = adapt_cv.CVAdapter()
+    cached.analyze_reference_cvs(cvs, max_workers=2)
+    assert cached.llm._client is None
+    rows = {(r["label"], r["cache_hits"], r["calls"]) for r in cached.llm.summary()["groups"]}
+    assert rows == {("analyze_reference", 2, 0), ("synthesize", 1, 0)}
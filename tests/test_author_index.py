@@ -0,0 +1,61 @@
+import json
+import sys
+import os
+from collections import Counter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "scripts"))
+
+from scripts.author_index import AuthorIndexBuilder, build_index, join_fragments, parse_name
+
+def test_parse_name_forms():
+    assert parse_name("Herbst, P. G.").key == "herbst|pg"
+    assert parse_name("Gere, A.R.").key == "gere|ar"
+    assert parse_name("\\textbf{Ion, M.}").key == "ion|m"
+    assert parse_name("Kevyn Collins-Thompson").key == "collinsthompson|k"
+    assert parse_name("Dumitraşcu, D.").last_key == "dumitrascu"
+    assert parse_name("Ion, M.", {"firstName": "Michael"}).given == ("Michael",)
+    for junk in ("Invited talks & guest lectures", "Oshkosh", "(Apr. 2019). A title", "3}",
+                 "North America Annual Conference}. St. Louis", "North America}. Greenville"):
+        assert parse_name(junk) is None
+    assert join_fragments(["Herbst", "P.", "\\textbf{Ion", "M.}", "Ko, I."]) == \
+        ["Herbst, P.", "\\textbf{Ion, M.}", "Ko, I."]
+
+def test_variants_merge_and_ambiguous_or_misspelt_names_are_proposed():
+    counts = Counter({"Herbst, P.": 5, "Herbst, P. G.": 2, "Patricio Herbst": 1,
+                      "Brown, A. M.": 3, "Brown, A. R.": 1, "Brown, A.": 2,
+                      "Dumitrascu, D.": 2, "Dumitrescu, D.": 1, "Ko, I.": 1, "Ko, J.": 1})
+    index = AuthorIndexBuilder(known={"Herbst, P.": {"firstName": "Patricio"}}).build(counts)
+    assert index["aliases"]["Herbst, P. G."] == "Herbst, P."
+    assert index["aliases"]["Patricio Herbst"] == "Herbst, P."
+    assert index["authors"]["Herbst, P."]["count"] == 8
+    # Initials alone never merge two different people
+    assert "Ko, J." in index["authors"] and "Ko, I." in index["authors"]
+
+    proposed = {(p["variant"], p["canonical"]) for p in index["proposals"]}
+    assert "Brown, A." not in index["aliases"]
+    assert {("Brown, A.", "Brown, A. M."), ("Brown, A.", "Brown, A. R.")} <= proposed
+    assert any({"Dumitrascu, D.", "Dumitrescu, D."} == set(pair) for pair in proposed)
+
+def test_one_letter_typos_in_short_last_names_are_proposed():
+    counts = Counter({"Paulsen, A.": 3, "Paulson, A.": 1, "Herbst, P.": 4, "Herbts, P.": 1,
+                      "Ko, I.": 1, "Ho, I.": 1})
+    index = AuthorIndexBuilder().build(counts)
+    proposed = {frozenset((p["variant"], p["canonical"])) for p in index["proposals"]}
+    assert frozenset(("Paulsen, A.", "Paulson, A.")) in proposed
+    assert frozenset(("Herbst, P.", "Herbts, P.")) in proposed
+    assert frozenset(("Ko, I.", "Ho, I.")) not in proposed
+    assert index["aliases"] == {}
+
+def test_decisions_survive_rebuilds(tmp_path):
+    source = tmp_path / "publications.json"
+    source.write_text(json.dumps({"publications": [
+        {"authors": ["Brown, A.", "Brown, A. M.", "Brown, A. R.", "Gere, A.", "Gere, A.R."]}]}))
+    path = tmp_path / "author-index.json"
+    build_index([source], tmp_path / "authors.json", path,
+                accept=[("Brown, A.", "Brown, A. M.")], reject=[("Gere, A.", "Gere, A.R.")])
+    index = build_index([source], tmp_path / "authors.json", path)
+    assert index["aliases"] == {"Brown, A.": "Brown, A. M."}
+    assert "Gere, A." in index["authors"] and "Gere, A.R." in index["authors"]
+    assert json.loads(path.read_text())["rejected"] == [["Gere, A.", "Gere, A.R."]]
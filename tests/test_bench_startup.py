@@ -0,0 +1,26 @@
+import sys
+import os
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "scripts"))
+
+from scripts.bench_startup import StartupResult, parse_importtime, regressions
+
+IMPORTTIME_OUTPUT = """import time: self [us] | cumulative | imported package
+import time:       100 |        100 | _io
+import time:        50 |         50 |   encodings.aliases
+import time:       200 |        250 | encodings
+"""
+
+def test_parse_importtime_keeps_top_level_only():
+    totals = parse_importtime(IMPORTTIME_OUTPUT)
+    assert totals == {"_io": 100, "encodings": 250}
+
+def test_regressions_flags_growth_beyond_tolerance():
+    baseline = {"results": [{"name": "adapt_cv", "import_ms": 50.0},
+                            {"name": "cv_updater", "import_ms": 40.0}]}
+    results = [StartupResult("adapt_cv", [], 0.0, 200.0, 0),
+               StartupResult("cv_updater", [], 0.0, 45.0, 0)]
+    problems = regressions(results, baseline, tolerance=1.5)
+    assert len(problems) == 1 and problems[0].startswith("adapt_cv")
@@ -0,0 +1,83 @@
+import json
+import sys
+import os
+
+from click.testing import CliRunner
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "scripts"))
+
+from scripts import add_research, cv_updater
+from scripts.bulk_import import merge_sorted, read_rows
+
+def test_read_rows_coerces_csv_cells(tmp_path):
+    path = tmp_path / "works.csv"
+    path.write_text('title,authors,year,venue\nPaper,"Ion, M.; Herbst, P.",2024,\n')
+    assert list(read_rows(path)) == [(1, {"title": "Paper", "authors": ["Ion, M.", "Herbst, P."], "year": 2024})]
+
+def test_merge_sorted_keeps_existing_order_for_ties():
+    existing = [{"title": "a", "year": 2024}, {"title": "b", "year": 2022}]
+    new = [{"title": "c", "year": 2022}, {"title": "d", "year": 2025}]
+    assert [i["title"] for i in merge_sorted(existing, new)] == ["d", "a", "b", "c"]
+
+def test_bulk_reports_invalid_rows(tmp_path, monkeypatch):
+    monkeypatch.setattr(add_research, "DATA_DIR", tmp_path)
+    (tmp_path / "grants.json").write_text(json.dumps({"grants": [{"title": "Old", "year_start": 2020}]}))
+    rows = tmp_path / "rows.jsonl"
+    rows.write_text("\n".join(json.dumps(r) for r in [
+        {"title": "New", "amount": "$1", "year_start": 2024, "role": "PI"},
+        {"title": "No role", "amount": "$1", "year_start": 2023},
+        {"title": "Bad subtype", "amount": "$1", "year_start": 2023, "role": "PI", "subtype": "x"},
+    ]))
+    report = tmp_path / "report.json"
+    result = CliRunner().invoke(add_research.cli, ["bulk", str(rows), "--type", "grant", "--report", str(report)])
+    assert result.exit_code == 1
+    grants = json.loads((tmp_path / "grants.json").read_text())["grants"]
+    assert [g["title"] for g in grants] == ["New", "Old"]
+    errors = json.loads(report.read_text())["errors"]
+    assert [(e["row"], e["errors"]) for e in errors] == [(2, ["missing role"]), (3, ["unknown grant subtype: x"])]
+
+def test_cv_updater_bulk_merges_valid_rows_in_date_order(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # no content store here, so items go through the log
+    monkeypatch.setattr(cv_updater, "DATA_DIR", tmp_path / "cv")
+    (tmp_path / "cv").mkdir()
+    (tmp_path / "cv" / "publications.json").write_text(json.dumps([
+        {"title": "Old", "date": "2022-06-01"}, {"title": "Older", "date": "2019-01-01"}]))
+    rows = tmp_path / "publications.csv"
+    rows.write_text(
+        "title,date,authors,venue,type,status\n"
+        "Newest,2024-03-01,\"Ion, M.; Herbst, P.\",ZDM,journal,published\n"
+        "No venue,2023-01-01,\"Ion, M.\",,journal,published\n"
+        "Middle,2020-09-01,\"Ion, M.\",PME-NA,conference,published\n")
+    report = tmp_path / "report.json"
+
+    result = CliRunner().invoke(cv_updater.cli, ["bulk", str(rows), "--type", "publication",
+                                                 "--report", str(report)])
+    assert result.exit_code == 1
+    assert "Imported 2 items, 1 rows rejected" in result.output
+    publications = json.loads((tmp_path / "cv" / "publications.json").read_text())
+    assert [p["title"] for p in publications] == ["Newest", "Old", "Middle", "Older"]
+    assert publications[0]["authors"] == ["Ion, M.", "Herbst, P."]
+    errors = json.loads(report.read_text())["errors"]
+    assert [(e["row"], e["title"], e["errors"]) for e in errors] == [(2, "No venue", ["missing venue"])]
+
+def test_cv_updater_bulk_reads_item_types_from_jsonl(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(cv_updater, "DATA_DIR", tmp_path / "cv")
+    rows = tmp_path / "items.jsonl"
+    rows.write_text("\n".join(json.dumps(r) for r in [
+        {"item_type": "grant", "title": "Grant", "date": "2024-01-01", "amount": "$1", "funder": "NSF",
+         "role": "PI", "status": "awarded"},
+        {"item_type": "talk", "title": "Talk", "date": "2024-01-01"},
+        {"title": "Untyped", "date": "2024-01-01"},
+    ]))
+
+    dry = CliRunner().invoke(cv_updater.cli, ["bulk", str(rows), "--dry-run"])
+    assert "Validated 1 items, 2 rows rejected" in dry.output
+    assert not (tmp_path / "cv" / "grants.json").exists()
+
+    CliRunner().invoke(cv_updater.cli, ["bulk", str(rows)])
+    grants = json.loads((tmp_path / "cv" / "grants.json").read_text())
+    assert [g["title"] for g in grants] == ["Grant"]
+    assert "item_type" not in grants[0]
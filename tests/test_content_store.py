@@ -0,0 +1,126 @@
+import json
+import sys
+import os
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "scripts"))
+
+from scripts.content_store import AREAS_COLLECTION, ContentStore, VersionConflict
+from scripts.row_edits import RowEdits
+
+AREAS = {
+    "AI in Education": {
+        "id": "ai-education",
+        "description": "LLMs",
+        "keywords": ["nlp"],
+        "projects": [],
+        "publications": [{"title": "P1", "year": 2023, "status": "published", "areas": ["math-education"]}],
+        "collaborators": [],
+    },
+    "Mathematics Education": {"id": "math-education", "description": "Math", "publications": []},
+}
+PUBLICATIONS = {
+    "journal_articles": [{"title": "J2", "year": 2024, "status": "in_review"},
+                         {"title": "J1", "year": 2022, "status": "published"}],
+    "conference_papers": [],
+}
+
+@pytest.fixture
+def store(tmp_path):
+    research = tmp_path / "research"
+    research.mkdir()
+    (research / "areas.json").write_text(json.dumps(AREAS, indent=2))
+    (research / "publications.json").write_text(json.dumps(PUBLICATIONS, indent=2))
+    content = ContentStore(tmp_path / "content.db", tmp_path)
+    content.import_all()
+    yield content
+    content.close()
+
+def test_import_round_trips_files(store):
+    assert store.load(AREAS_COLLECTION) == AREAS
+    assert store.load("research/publications.json") == PUBLICATIONS
+    assert store.export_dirty() == []
+
+def test_filtered_queries_use_item_fields(store):
+    assert [item["title"] for _, item in store.query(area="math-education")] == ["P1"]
+    assert [item["title"] for _, item in store.query(item_type="publication", status="published")] == ["P1", "J1"]
+    assert [item["title"] for _, item in store.query(year=2024)] == ["J2"]
+
+def test_point_edits_export_only_changed_collections(store, tmp_path):
+    store.add_item("research/publications.json", {"title": "J3", "year": 2023}, group="journal_articles")
+    item_id, _ = store.query(area="ai-education")[0]
+    store.update_item(item_id, {"title": "P1 revised", "year": 2023})
+    assert sorted(store.export_dirty()) == [AREAS_COLLECTION, "research/publications.json"]
+
+    publications = json.loads((tmp_path / "research" / "publications.json").read_text())
+    assert [p["title"] for p in publications["journal_articles"]] == ["J2", "J3", "J1"]
+    areas = json.loads((tmp_path / "research" / "areas.json").read_text())
+    assert areas["AI in Education"]["publications"] == [{"title": "P1 revised", "year": 2023}]
+
+def test_point_edits_wait_for_export(store, tmp_path):
+    before = store.version(AREAS_COLLECTION)
+    store.set_area("AI in Education", {"description": "Updated"})
+    store.add_item("research/publications.json", {"title": "J3", "year": 2023}, group="journal_articles")
+    assert store.version(AREAS_COLLECTION) == before + 1
+    assert json.loads((tmp_path / "research" / "areas.json").read_text()) == AREAS
+
+    assert store.export_dirty([AREAS_COLLECTION]) == [AREAS_COLLECTION]
+    assert json.loads((tmp_path / "research" / "areas.json").read_text())["AI in Education"]["description"] == "Updated"
+    assert store.export_dirty() == ["research/publications.json"]
+
+def test_area_changes_keep_items(store):
+    store.set_area("AI in Education", {"description": "Updated"})
+    store.set_area("Learning Analytics", {"id": "learning-analytics", "publications": []})
+    data = store.load(AREAS_COLLECTION)
+    assert data["AI in Education"]["description"] == "Updated"
+    assert data["AI in Education"]["publications"][0]["title"] == "P1"
+    assert list(data) == ["AI in Education", "Mathematics Education", "Learning Analytics"]
+    store.delete_area("AI in Education")
+    assert store.query(area="math-education") == []
+
+def test_edit_rows_writes_only_edited_rows(store):
+    rows = store.query(collection=AREAS_COLLECTION, group="publications", owner="AI in Education")
+    (before_id, item), = rows
+    store.edit_rows(AREAS_COLLECTION, rows,
+                    RowEdits(updated={0: dict(item, title="P1b")}, added=[{"title": "P2", "year": 2024}]),
+                    group="publications", area="AI in Education")
+    after = store.query(collection=AREAS_COLLECTION, group="publications")
+    assert after[0] == (before_id, dict(item, title="P1b"))
+    assert [i["title"] for _, i in after] == ["P1b", "P2"]
+    assert store.export_dirty() == [AREAS_COLLECTION]
+
+    with pytest.raises(VersionConflict):
+        store.edit_rows(AREAS_COLLECTION, rows, RowEdits(deleted=[0]), group="publications",
+                        area="AI in Education")
+
+def test_filtered_pages_are_read_in_sql(store):
+    journals = dict(collection="research/publications.json", group="journal_articles")
+    store.add_items("research/publications.json",
+                    [{"title": f"Paper {i}", "year": 2020, "venue": "Zeitschrift für Didaktik"} for i in range(5)],
+                    group="journal_articles")
+    assert store.count(**journals) == 7
+    assert store.distinct("year", **journals) == [2020, 2022, 2024]
+    assert store.distinct("status", **journals) == ["in_review", "published"]
+
+    page = store.query(limit=2, offset=2, search=" FÜR ", **journals)
+    assert [item["title"] for _, item in page] == ["Paper 2", "Paper 3"]
+    assert store.count(search="für", year=2020, **journals) == 5
+    assert [item["title"] for _, item in store.query(owner="Mathematics Education")] == []
+
+def test_existing_stores_gain_the_search_column(tmp_path):
+    import sqlite3
+    conn = sqlite3.connect(str(tmp_path / "old.db"))
+    conn.executescript("""
+        CREATE TABLE items (id INTEGER PRIMARY KEY, collection TEXT NOT NULL, grp TEXT NOT NULL DEFAULT '',
+            area TEXT, position INTEGER NOT NULL, item_type TEXT, year INTEGER, status TEXT,
+            sort_key TEXT NOT NULL DEFAULT '', title TEXT, data TEXT NOT NULL);
+        INSERT INTO items (collection, position, data) VALUES ('cv/grants.json', 0, '{"title": "Old Grant"}');
+    """)
+    conn.commit()
+    conn.close()
+    content = ContentStore(tmp_path / "old.db", tmp_path)
+    assert [item["title"] for _, item in content.query(search="old gr")] == ["Old Grant"]
+    content.close()
@@ -0,0 +1,44 @@
+import pytest
+import sys
+import os
+
+# Add the project root and scripts directory to Python path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "scripts"))
+
+from scripts.cv_retrieval import flatten_cv_items, select_context
+
+@pytest.fixture
+def cv_data():
+    return {
+        "publications": {
+            "journal_articles": [
+                {"title": "Teaching Geometry for Secondary Teachers", "year": 2023},
+                {"title": "Alumni Perspectives on General Education", "year": 2023},
+            ],
+            "conference_papers": [
+                {"title": "Conceptions of the Derivative: A Natural Language Processing Approach"},
+            ],
+        },
+        "grants": {"grants": [{"title": "AI-Powered Interview Practice", "amount": "$10,000"}]},
+        "areas": {"AI in Education": {"id": "ai-education", "projects": []}},
+    }
+
+def test_flatten_cv_items(cv_data):
+    items = flatten_cv_items(cv_data)
+    assert len(items) == 4
+    assert items[0].section == "publications/journal_articles"
+
+def test_select_context_ranks_relevant_items(cv_data):
+    selected = select_context(cv_data, "industry role in natural language processing", top_k=1)
+    assert [item["title"] for item in selected["relevant_items"]] == [
+        "Conceptions of the Derivative: A Natural Language Processing Approach"
+    ]
+    assert selected["summary"]["omitted_items"] == 3
+
+def test_select_context_respects_budget(cv_data):
+    many = {"publications": [{"title": f"Geometry paper {i}"} for i in range(500)]}
+    selected = select_context(many, "geometry", budget_tokens=100, top_k=500)
+    assert 0 < len(selected["relevant_items"]) < 500
+    assert selected["summary"]["total_items"] == 500
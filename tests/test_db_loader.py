@@ -0,0 +1,116 @@
+import sqlite3
+import sys
+import os
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "scripts"))
+
+from scripts.db_loader import (SQLITE, SQLITE_SCHEMA, BulkLoader, owner_names, parse_author_name,
+                               read_areas, read_publications)
+
+AUTHORS = {"Ion, M.": {"firstName": "Michael", "lastName": "Ion", "fullName": "Michael Ion"}}
+DATA = {
+    "publications": [
+        {"title": "Tutoring at Scale", "year": 2024, "venue": "L@S", "type": "conference",
+         "authors": ["Ion, M.", "Brown, A. M.", "Ion, M"], "keywords": ["LLMs", "tutoring"]},
+        {"title": "", "year": 2023, "type": "journal", "authors": ["Herbst, P."],
+         "description": "Agreeing on objectives: feedback from instructors. PME-NA. Reno, NV."},
+        {"title": "Draft", "type": "preprint", "authors": ["Ion, M."]},
+    ],
+    "talks": [{"title": "Text as Data", "year": 2025, "venue": "JMM", "type": "talk", "authors": ["Ion, M."]}],
+}
+AREAS = {"researchAreas": [{"title": "Tutoring", "description": "AI tutors", "tags": ["llms"],
+                            "publications": ["Tutoring at Scale"]}]}
+
+@pytest.fixture
+def conn(tmp_path):
+    connection = sqlite3.connect(str(tmp_path / "site.db"))
+    connection.executescript(SQLITE_SCHEMA)
+    yield connection
+    connection.close()
+
+def load(conn, data=DATA):
+    skipped = []
+    with conn:
+        report = BulkLoader(conn, SQLITE, batch_size=2).load(
+            read_publications(data, AUTHORS, skipped), read_areas(AREAS), owner_names(AUTHORS, "Ion, M."))
+    return report, skipped
+
+def rows(conn, sql):
+    return conn.execute(sql).fetchall()
+
+def test_parse_author_name():
+    assert parse_author_name("Ion, M.", AUTHORS) == ("Michael", "Ion", None)
+    assert parse_author_name("Brown, A. M.", AUTHORS) == ("A.", "Brown", "M.")
+    assert parse_author_name("Deborah Loewenberg Ball", AUTHORS) == ("Deborah", "Ball", "Loewenberg")
+
+def test_load_fills_tables(conn):
+    report, skipped = load(conn)
+    assert report.publications == 3 and report.authors_created == 3
+    assert skipped == ["publications: 'Draft' (no year)"]
+    assert sorted(t for t, in rows(conn, 'SELECT "title" FROM "Publication"')) == [
+        "Agreeing on objectives: feedback from instructors", "Text as Data", "Tutoring at Scale"]
+    # Duplicate author strings collapse; the first author is the corresponding one
+    assert rows(conn, '''SELECT a."lastName", pa."position", pa."isCorresponding" FROM "PublicationAuthor" pa
+                         JOIN "Author" a ON a."id" = pa."authorId" JOIN "Publication" p ON p."id" = pa."publicationId"
+                         WHERE p."title" = 'Tutoring at Scale' ORDER BY pa."position"''') == [
+        ("Ion", 1, 1), ("Brown", 2, 0)]
+    assert rows(conn, 'SELECT "firstName" FROM "Author" WHERE "isYou"') == [("Michael",)]
+    # Keywords match case-insensitively across publications and areas
+    assert rows(conn, 'SELECT COUNT(*) FROM "Keyword"') == [(2,)]
+    assert rows(conn, '''SELECT p."title" FROM "_PublicationToResearchArea" l
+                         JOIN "Publication" p ON p."id" = l."A"''') == [("Tutoring at Scale",)]
+
+def test_reload_updates_in_place(conn):
+    load(conn)
+    before = rows(conn, 'SELECT "id", "title" FROM "Publication" ORDER BY "id"')
+    links = rows(conn, 'SELECT "id" FROM "PublicationAuthor" ORDER BY "id"')
+
+    changed = {**DATA, "talks": [dict(DATA["talks"][0], authors=["Ion, M.", "Herbst, P."])]}
+    report, _ = load(conn, changed)
+    assert report.authors_created == 0
+    assert rows(conn, 'SELECT "id", "title" FROM "Publication" ORDER BY "id"') == before
+    after = rows(conn, 'SELECT "id" FROM "PublicationAuthor" ORDER BY "id"')
+    assert set(links) < set(after) and len(after) == len(links) + 1
+
+def sync(conn, data, areas=AREAS, dry_run=False):
+    with conn:
+        return BulkLoader(conn, SQLITE).sync(read_publications(data, AUTHORS), read_areas(areas),
+                                             owner_names(AUTHORS, "Ion, M."), dry_run=dry_run)
+
+def test_sync_writes_only_changed_rows(conn):
+    load(conn)
+    assert sync(conn, DATA).details() == []
+
+    edited = {**DATA, "talks": [dict(DATA["talks"][0], description="Joint Mathematics Meetings talk")]}
+    before = conn.total_changes
+    report = sync(conn, edited)
+    assert report.updated == ["talk 2025: Text as Data"] and report.unchanged == 2
+    # One Publication row and its hash
+    assert conn.total_changes - before == 2
+    assert rows(conn, '''SELECT "description" FROM "Publication" WHERE "title" = 'Text as Data' ''') == [
+        ("Joint Mathematics Meetings talk",)]
+
+def test_sync_dry_run_and_deletes(conn):
+    load(conn)
+    trimmed = {"publications": DATA["publications"][:1], "talks": []}
+    before = conn.total_changes
+    report = sync(conn, trimmed, dry_run=True)
+    assert report.deleted == ["journal 2023: Agreeing on objectives: feedback from instructors", "talk 2025: Text as Data"]
+    assert conn.total_changes == before
+
+    sync(conn, trimmed, areas={"researchAreas": []})
+    assert rows(conn, 'SELECT "title" FROM "Publication"') == [("Tutoring at Scale",)]
+    assert rows(conn, 'SELECT COUNT(*) FROM "PublicationAuthor"') == [(2,)]
+    assert rows(conn, 'SELECT COUNT(*) FROM "ResearchArea"') == [(0,)]
+    assert rows(conn, 'SELECT COUNT(*) FROM "_PublicationToResearchArea"') == [(0,)]
+
+def test_sync_links_new_publication_to_unchanged_area(conn):
+    load(conn, {"publications": [], "talks": []})
+    report = sync(conn, DATA)
+    assert len(report.inserted) == 3 and report.areas_changed == []
+    assert rows(conn, '''SELECT p."title" FROM "_PublicationToResearchArea" l
+                         JOIN "Publication" p ON p."id" = l."A"''') == [("Tutoring at Scale",)]
@@ -0,0 +1,63 @@
+import pytest
+import sys
+import os
+
+# Add the project root and scripts directory to Python path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "scripts"))
+
+from scripts.eval_classifier import (
+    DEFAULT_CORPUS,
+    keyword_overlap,
+    load_corpus,
+    macro_f1,
+    percentile,
+)
+
+def test_macro_f1():
+    gold = ["A", "A", "B", "C"]
+    assert macro_f1(gold, gold) == 1.0
+    # A: P=0.5 R=0.5 F1=0.5, B: P=0.5 R=1 F1=2/3, C: 0
+    assert macro_f1(gold, ["A", "B", "B", "A"]) == pytest.approx((0.5 + 2 / 3 + 0) / 3)
+
+def test_keyword_overlap():
+    assert keyword_overlap(["Geometry", "proof"], ["geometry"]) == 0.5
+    assert keyword_overlap([], []) == 1.0
+
+def test_percentile():
+    values = [float(v) for v in range(1, 21)]
+    assert percentile(values, 50) == 10.0
+    assert percentile(values, 95) == 19.0
+    assert percentile([], 50) == 0.0
+
+def test_fixture_corpus_is_labeled():
+    corpus = load_corpus(DEFAULT_CORPUS)
+    assert len(corpus) >= 10
+    assert all({"id", "text", "primary_area", "keywords"} <= set(entry) for entry in corpus)
+
+def test_run_variant_against_the_stub_backend(stub_server):
+    from scripts.eval_classifier import DEFAULT_STUB_RULES, run_variant
+    from scripts.llm_stub import load_rules
+
+    corpus = load_corpus(DEFAULT_CORPUS)
+    report = run_variant("routed", stub_server(rules=load_rules(DEFAULT_STUB_RULES)), corpus)
+
+    summary = report.summary()
+    assert summary["entries"] == len(corpus)
+    assert all(e.predicted_area != "Uncategorized" for e in report.entries)
+    assert 0.0 < summary["macro_f1"] <= 1.0
+    assert summary["tokens_per_entry"] > 0
+
+def test_main_writes_a_report(tmp_path, capsys):
+    import json
+    from scripts.eval_classifier import main
+
+    output = tmp_path / "eval.json"
+    main(["--variants", "compact,small-only", "--stub-latency", "fixed:0", "--output", str(output)])
+
+    report = json.loads(output.read_text())
+    assert report["backend"] == "stub"
+    assert [s["variant"] for s in report["summaries"]] == ["compact", "small-only"]
+    assert len(report["entries"]["compact"]) == len(load_corpus(DEFAULT_CORPUS))
+    assert "small-only" in capsys.readouterr().out
@@ -0,0 +1,57 @@
+import sys
+import os
+import threading
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "scripts"))
+
+from scripts.import_jobs import DONE, FAILED, ImportJobs
+
+def wait(jobs, key):
+    while jobs.get(key).pending:
+        threading.Event().wait(0.01)
+    return jobs.get(key)
+
+def test_same_upload_is_parsed_once(tmp_path):
+    calls, release = [], threading.Event()
+
+    def parse(path, on_progress):
+        calls.append(path.read_bytes())
+        on_progress("contact", 0.0)
+        release.wait(5)
+        return {"contact": {"name": path.read_text()}}
+
+    jobs = ImportJobs(tmp_path, max_workers=2, parse=parse)
+    first = jobs.submit("cv.tex", b"Ion")
+    # A rerun or a second user with the same bytes gets the running job
+    assert jobs.submit("other.tex", b"Ion") is first
+    release.set()
+    job = wait(jobs, first.key)
+    assert job.status == DONE and job.progress == 1.0
+    assert job.result == {"contact": {"name": "Ion"}}
+    assert calls == [b"Ion"]
+    assert jobs.submit("cv.tex", b"Ion") is first
+    # The uploaded copy is removed once parsed
+    assert list(tmp_path.iterdir()) == []
+    jobs.shutdown()
+
+def test_failed_jobs_are_retried_and_old_jobs_evicted(tmp_path):
+    attempts = []
+
+    def parse(path, on_progress):
+        attempts.append(path.read_bytes())
+        if len(attempts) == 1:
+            raise ValueError("bad section")
+        return {}
+
+    jobs = ImportJobs(tmp_path, max_workers=1, max_jobs=2, parse=parse)
+    job = jobs.submit("cv.tex", b"a")
+    assert wait(jobs, job.key).status == FAILED and job.error == "bad section"
+    assert wait(jobs, jobs.submit("cv.tex", b"a").key).status == DONE
+
+    for content in (b"b", b"c"):
+        wait(jobs, jobs.submit("cv.tex", content).key)
+    assert jobs.get(job.key) is None
+    assert len(jobs.jobs) == 2
+    jobs.shutdown()
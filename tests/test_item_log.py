@@ -0,0 +1,46 @@
+import json
+import sys
+import os
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "scripts"))
+
+from scripts.item_log import ItemLog
+
+def test_compact_merges_appends_in_date_order(tmp_path):
+    (tmp_path / "grants.json").write_text(json.dumps([
+        {"title": "B", "date": "2023-05-01"},
+        {"title": "A", "date": "2021-01-01"},
+    ]))
+    log = ItemLog(tmp_path, "grant")
+    for title, date in [("C", "2024-02-01"), ("D", "2022-03-01"), ("E", "2023-05-01")]:
+        log.append({"title": title, "date": date})
+
+    assert json.loads((tmp_path / "grants.json").read_text())[0]["title"] == "B"
+    assert log.compact() == 3
+    titles = [item["title"] for item in json.loads((tmp_path / "grants.json").read_text())]
+    assert titles == ["C", "B", "E", "D", "A"]
+    assert log.compact() == 0
+
+def test_compact_matches_full_sort(tmp_path):
+    log = ItemLog(tmp_path, "service")
+    dates = ["2020-01-0%d" % (i % 9 + 1) for i in range(7)] + ["2019-12-31", "2020-01-05"]
+    expected = []
+    for i, date in enumerate(dates):
+        item = {"title": str(i), "date": date}
+        log.append(item)
+        expected.append(item)
+        if i % 3 == 2:
+            log.compact()
+    log.compact()
+    expected.sort(key=lambda x: x["date"], reverse=True)
+    assert json.loads((tmp_path / "services.json").read_text()) == expected
+
+def test_pending_ignores_partial_line(tmp_path):
+    log = ItemLog(tmp_path, "presentation")
+    log.append({"title": "Talk", "date": "2024-01-01"})
+    with open(log.log_path, "a") as f:
+        f.write('{"title": "Half')
+    items, _ = log.pending()
+    assert items == [{"title": "Talk", "date": "2024-01-01"}]
@@ -0,0 +1,77 @@
+import pytest
+import sys
+import os
+from typing import List
+
+from pydantic import BaseModel
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.json_stream import JSONMemberScanner, JSONObjectScanner, first_valid_object, iter_json_objects
+
+class Area(BaseModel):
+    primary_area: str
+    keywords: List[str]
+
+def chunked(text, size=3):
+    for i in range(0, len(text), size):
+        yield text[i:i + size]
+
+@pytest.fixture
+def reasoning_response():
+    return (
+        "<think>The answer looks like {\"primary_area\": \"wrong\"} but "
+        "let me reconsider.</think>\n"
+        "Sure! Here is the classification:\n```json\n"
+        "{\"primary_area\": \"Mathematics Education\", \"keywords\": [\"proof {x}\", \"a\\\"b\"]}\n"
+        "```\nHope this helps."
+    )
+
+def test_scanner_skips_think_and_preamble(reasoning_response):
+    objects = list(iter_json_objects(chunked(reasoning_response)))
+    assert objects == [{"primary_area": "Mathematics Education", "keywords": ["proof {x}", "a\"b"]}]
+
+def test_scanner_handles_single_character_chunks():
+    scanner = JSONObjectScanner()
+    completed = []
+    for char in 'noise {"a": {"b": 1}} tail {"c": 2}':
+        completed.extend(scanner.feed(char))
+    assert completed == ['{"a": {"b": 1}}', '{"c": 2}']
+
+def test_first_valid_object_stops_stream_early():
+    consumed = []
+
+    def stream():
+        for chunk in ['{"other": 1}', ' {"primary_area": "STEM", ', '"keywords": []}', ' more', ' text']:
+            consumed.append(chunk)
+            yield chunk
+
+    result = first_valid_object(stream(), Area)
+    assert result == Area(primary_area="STEM", keywords=[])
+    assert consumed[-1] == '"keywords": []}'
+
+def test_first_valid_object_returns_none_without_match():
+    assert first_valid_object(iter(["no json here"]), Area) is None
+
+def test_member_scanner_yields_sections_as_they_close():
+    scanner = JSONMemberScanner()
+    text = '<think>{"x": 1}</think> {"sections": ["a, b", {"c": [1, 2]}], "note": "x}y", "n": 3} trailing'
+    members = []
+    for chunk in chunked(text, 2):
+        members.extend(scanner.feed(chunk))
+    assert members == [("sections", ["a, b", {"c": [1, 2]}]), ("note", "x}y"), ("n", 3)]
+    assert scanner.done
+
+def test_member_scanner_keeps_sections_before_malformed_end():
+    scanner = JSONMemberScanner()
+    members = scanner.feed('{"order": ["education"], "highlight": [1, 2')
+    assert members == [("order", ["education"])]
+    assert not scanner.done
+
+def test_import_does_not_load_pydantic():
+    import subprocess
+    scripts = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts")
+    code = "import sys, json_stream; print('pydantic' in sys.modules)"
+    result = subprocess.run([sys.executable, "-c", code], cwd=scripts, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "False"
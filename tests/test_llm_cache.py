@@ -0,0 +1,30 @@
+import pytest
+import sys
+import os
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.llm_cache import JSONCache, file_hash, fingerprint, set_fingerprint
+
+def test_set_fingerprint_ignores_member_order():
+    assert set_fingerprint(["b", "a"], "synthesis", "model") == set_fingerprint(["a", "b"], "synthesis", "model")
+    assert set_fingerprint(["a"], "synthesis", "model") != set_fingerprint(["a"], "synthesis", "other")
+
+def test_fingerprint_separates_parts():
+    assert fingerprint("ab", "c") != fingerprint("a", "bc")
+
+def test_cache_round_trip(tmp_path):
+    cache = JSONCache(tmp_path / "cache")
+    key = fingerprint("analysis", "hash")
+    assert cache.get(key) is None
+    cache.put(key, {"sections": ["Education"]})
+    assert cache.get(key) == {"sections": ["Education"]}
+    assert not list((tmp_path / "cache").glob("*.tmp"))
+
+def test_file_hash_tracks_content(tmp_path):
+    path = tmp_path / "cv.tex"
+    path.write_text("first")
+    before = file_hash(path)
+    path.write_text("second")
+    assert file_hash(path) != before
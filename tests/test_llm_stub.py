@@ -0,0 +1,40 @@
+import pytest
+import sys
+import os
+import json
+
+# Add the project root and scripts directory to Python path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "scripts"))
+
+from scripts.llm_stub import LLMHTTPError, ScriptRule
+
+@pytest.fixture
+def stub(stub_server):
+    return lambda **settings: stub_server(seed=0, **settings)
+
+def test_create_returns_scripted_output(stub):
+    client = stub(rules=[
+        ScriptRule(match="geometry", output='{"primary_area": "Mathematics Education"}'),
+        ScriptRule(output='{"primary_area": "AI in Education"}'),
+    ])
+    response = client.Complete.create(prompt="A geometry poster", model="m", max_tokens=100)
+    assert json.loads(response["output"]["choices"][0]["text"]) == {"primary_area": "Mathematics Education"}
+    assert response["output"]["usage"]["completion_tokens"] > 0
+
+    response = client.Complete.create(prompt="Something else", model="m", max_tokens=100)
+    assert "AI in Education" in response["output"]["choices"][0]["text"]
+
+def test_streaming_reassembles_output(stub):
+    client = stub(rules=[ScriptRule(preamble="<think>hmm</think> ", output='{"a": [1, 2, 3]}')])
+    chunks = list(client.Complete.create_streaming(prompt="p", model="m", max_tokens=100))
+    assert len(chunks) > 1
+    assert "".join(chunks) == '<think>hmm</think> {"a": [1, 2, 3]}'
+
+def test_rate_limit_injection(stub):
+    client = stub(rate_limit_rate=1.0, retry_after=2.5)
+    with pytest.raises(LLMHTTPError) as error:
+        client.Complete.create(prompt="p", model="m", max_tokens=10)
+    assert error.value.status == 429
+    assert error.value.retry_after == 2.5
@@ -0,0 +1,62 @@
+import pytest
+import sys
+import os
+import json
+
+# Add the project root and scripts directory to Python path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "scripts"))
+
+from scripts.llm_stub import ScriptRule
+from scripts.llm_trace import TracedLLM
+
+@pytest.fixture
+def stub_client(stub_server):
+    return stub_server(rules=[ScriptRule(output='{"ok": true}')])
+
+def test_traced_calls_are_written_as_jsonl(stub_client, tmp_path):
+    trace_path = tmp_path / "trace.jsonl"
+    llm = TracedLLM(stub_client, trace_path, run_name="test")
+
+    with llm.label("classify"):
+        llm.Complete.create(prompt="classify this", model="mistral-7b-instruct", max_tokens=50)
+    llm.note_parse(True)
+    chunks = list(llm.Complete.create_streaming(prompt="stream this", model="m", max_tokens=50))
+    llm.note_cache("m", hit=True)
+    llm.flush()
+
+    rows = [json.loads(line) for line in trace_path.read_text().splitlines()]
+    assert [row["label"] for row in rows] == ["classify", "completion", "completion"]
+    assert rows[0]["parse_ok"] is True
+    assert rows[0]["completion_tokens"] > 0
+    assert rows[0]["cost_usd"] is not None
+    assert rows[1]["streamed"] is True
+    assert "".join(chunks) == '{"ok": true}'
+    assert rows[2]["cache"] == "hit"
+
+def test_summary_groups_by_label_and_model(stub_client):
+    llm = TracedLLM(stub_client)
+    for _ in range(3):
+        with llm.label("adapt"):
+            llm.Complete.create(prompt="p", model="m", max_tokens=10)
+        llm.note_parse(False)
+
+    (row,) = llm.summary()["groups"]
+    assert row["label"] == "adapt"
+    assert row["calls"] == 3
+    assert row["parse_failures"] == 3
+    assert row["cost_usd"] is None
+
+def test_get_llm_counts_calls_without_a_trace_file(stub_client, monkeypatch, caplog):
+    from scripts.config import get_llm
+    monkeypatch.setenv("LLM_BASE_URL", stub_client.base_url)
+    monkeypatch.delenv("LLM_TRACE", raising=False)
+    llm = get_llm(run_name="untraced")
+    llm.Complete.create(prompt="p", model="m", max_tokens=10)
+
+    with caplog.at_level("INFO"):
+        llm.log_summary()
+    assert llm.trace_path is None
+    assert llm.summary()["groups"][0]["calls"] == 1
+    assert "LLM calls for run untraced" in caplog.text
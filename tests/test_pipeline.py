@@ -0,0 +1,101 @@
+import sys
+import os
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "scripts"))
+
+from scripts.pipeline import BLOCKED, FAILED, RAN, SKIPPED, Pipeline, Stage
+
+def copy_stage(name, source, target, extra=""):
+    """Stage copying source to target, appending extra and counting its runs"""
+    code = (f"import pathlib; s = pathlib.Path({str(source)!r}).read_text(); "
+            f"pathlib.Path({str(target)!r}).write_text(s + {extra!r}); "
+            f"c = pathlib.Path({str(target) + '.runs'!r}); c.write_text(c.read_text() + 'x' if c.exists() else 'x')")
+    return Stage(name, [sys.executable, "-c", code], inputs=[str(source)], outputs=[str(target)])
+
+def runs(path):
+    return len(open(str(path) + ".runs").read())
+
+def make_pipeline(tmp_path):
+    cv = tmp_path / "cv.tex"
+    if not cv.exists():
+        cv.write_text("cv")
+    stages = [copy_stage("parse", cv, tmp_path / "pubs.json"),
+              copy_stage("classify", cv, tmp_path / "areas.json"),
+              copy_stage("bundle", tmp_path / "pubs.json", tmp_path / "bundle.json")]
+    return Pipeline(stages, tmp_path / "state.json"), cv
+
+def test_unchanged_stages_are_skipped(tmp_path):
+    pipeline, cv = make_pipeline(tmp_path)
+    assert pipeline.stages["bundle"].after == ["parse"]
+    assert set(pipeline.run().values()) == {RAN}
+    assert set(make_pipeline(tmp_path)[0].run().values()) == {SKIPPED}
+
+    # A changed output is rebuilt; its dependents see the same content and skip
+    (tmp_path / "pubs.json").write_text("edited")
+    results = make_pipeline(tmp_path)[0].run()
+    assert results == {"parse": RAN, "classify": SKIPPED, "bundle": SKIPPED}
+    assert runs(tmp_path / "bundle.json") == 1
+
+    cv.write_text("new cv")
+    assert set(make_pipeline(tmp_path)[0].run().values()) == {RAN}
+    assert (tmp_path / "bundle.json").read_text() == "new cv"
+
+def test_lost_compressed_variants_are_rebuilt(tmp_path):
+    cv, bundle = tmp_path / "cv.tex", tmp_path / "bundle.json"
+    cv.write_text("cv")
+    code = (f"import gzip, pathlib; s = pathlib.Path({str(cv)!r}).read_bytes(); "
+            f"pathlib.Path({str(bundle)!r}).write_bytes(s); "
+            f"pathlib.Path({str(bundle) + '.gz'!r}).write_bytes(gzip.compress(s))")
+    stages = lambda: [Stage("bundle", [sys.executable, "-c", code], inputs=[str(cv)],
+                            outputs=[str(bundle), str(bundle) + ".*"])]
+    assert Pipeline(stages(), tmp_path / "state.json").run() == {"bundle": RAN}
+    assert Pipeline(stages(), tmp_path / "state.json").run() == {"bundle": SKIPPED}
+
+    (tmp_path / "bundle.json.gz").unlink()
+    assert Pipeline(stages(), tmp_path / "state.json").run() == {"bundle": RAN}
+    assert (tmp_path / "bundle.json.gz").exists()
+
+def test_in_place_rewrites_do_not_rerun_the_producer(tmp_path):
+    cv, pubs = tmp_path / "cv.tex", tmp_path / "pubs.json"
+    cv.write_text("cv")
+    enrich = copy_stage("enrich", pubs, pubs, extra="+doi")
+    enrich.outputs = [str(pubs)]
+    stages = lambda: [copy_stage("parse", cv, pubs), enrich]
+    assert Pipeline(stages(), tmp_path / "state.json").run() == {"parse": RAN, "enrich": RAN}
+    assert Pipeline(stages(), tmp_path / "state.json").run() == {"parse": SKIPPED, "enrich": SKIPPED}
+    assert pubs.read_text() == "cv+doi"
+
+def test_independent_stages_run_in_parallel_and_failures_block(tmp_path):
+    # Each stage waits for the other to have started, so this only passes in parallel
+    wait = ("import pathlib, time, sys; d = pathlib.Path({d!r}); (d / {me!r}).touch(); "
+            "end = time.time() + 10\n"
+            "while not (d / {other!r}).exists() and time.time() < end: time.sleep(0.01)\n"
+            "sys.exit(0 if (d / {other!r}).exists() else 1)")
+    stages = [Stage(me, [sys.executable, "-c", wait.format(d=str(tmp_path), me=me, other=other)],
+                    inputs=[], outputs=[str(tmp_path / me)])
+              for me, other in (("a", "b"), ("b", "a"))]
+    stages.append(Stage("fails", [sys.executable, "-c", "raise SystemExit(1)"], inputs=[],
+                        outputs=[str(tmp_path / "out")]))
+    stages.append(Stage("after", [sys.executable, "-c", ""], inputs=[str(tmp_path / "out")], outputs=[]))
+    results = Pipeline(stages, tmp_path / "state.json").run()
+    assert results == {"a": RAN, "b": RAN, "fails": FAILED, "after": BLOCKED}
+
+def test_first_run_leaves_the_output_of_manual_stages_alone(tmp_path):
+    cv, pubs = tmp_path / "cv.tex", tmp_path / "pubs.json"
+    cv.write_text("cv")
+    pubs.write_text("curated")
+    def stages():
+        parse = copy_stage("parse", cv, pubs)
+        parse.manual = True
+        return [parse, copy_stage("bundle", pubs, tmp_path / "bundle.json")]
+
+    # No state yet: the committed output is used as it is
+    assert Pipeline(stages(), tmp_path / "state.json").run() == {"parse": SKIPPED, "bundle": RAN}
+    assert pubs.read_text() == "curated"
+    assert (tmp_path / "bundle.json").read_text() == "curated"
+
+    results = Pipeline(stages(), tmp_path / "state.json").run(include=["parse"])
+    assert results == {"parse": RAN, "bundle": RAN}
+    assert (tmp_path / "bundle.json").read_text() == "cv"
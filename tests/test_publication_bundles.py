@@ -0,0 +1,94 @@
+import gzip
+import json
+import shutil
+import subprocess
+import sys
+import os
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "scripts"))
+
+from scripts.publication_bundles import MANIFEST, author_index, build, build_bundles, join_authors
+
+PAYLOAD_MODULE = os.path.join(ROOT, "src", "utils", "publicationPayload.mjs")
+
+AUTHORS = {"Ion, M.": {"fullName": "Michael Ion", "lastName": "Ion"},
+           "Smith, J.": {"fullName": "Jane Smith", "lastName": "Smith"},
+           "Doe, A.": {"fullName": "Alex Doe", "lastName": "Doe"}}
+
+def write_sources(tmp_path, publications):
+    pubs = tmp_path / "publications.json"
+    authors = tmp_path / "authors.json"
+    pubs.write_text(json.dumps({"publications": publications, "grants": [{"title": "G"}]}))
+    authors.write_text(json.dumps({"authors": AUTHORS}))
+    return pubs, authors
+
+def test_authors_are_deduplicated_and_joined():
+    pub = {"title": "P", "authors": ["Ion, M.", "ion, m", "Smith,J"], "location": "Ion, M."}
+    joined = join_authors(pub, AUTHORS, author_index(AUTHORS))
+    assert joined["authors"] == ["Ion, M.", "Smith,J"]
+    assert "location" not in joined
+    assert set(joined["authorDetails"]) == {"Ion, M.", "Smith,J"}
+    assert joined["authorDetails"]["Smith,J"]["fullName"] == "Jane Smith"
+
+    # Variants from the canonical author index get the canonical entry's details
+    index = author_index(AUTHORS, {"Doe, A. B.": "Doe, A."})
+    joined = join_authors({"title": "P", "authors": ["Doe, A. B."]}, AUTHORS, index)
+    assert joined["authorDetails"]["Doe, A. B."]["fullName"] == "Alex Doe"
+
+def test_shards_and_manifest(tmp_path):
+    pubs, authors = write_sources(tmp_path, [
+        {"title": "Old", "year": 2019, "type": "journal", "authors": ["Ion, M."]},
+        {"title": "New", "year": 2023, "type": "conference", "authors": ["Doe, A."]},
+    ])
+    out = tmp_path / "out"
+    manifest = build(pubs, authors, out)
+    files = manifest["files"]
+    assert {"all", "grants", "talks", "year-2019", "year-2023", "type-journal", "type-conference"} <= set(files)
+
+    all_path = out / files["all"]["path"]
+    data = json.loads(all_path.read_text())
+    assert [p["title"] for p in data["publications"]] == ["New", "Old"]
+    assert data["grants"] == [{"title": "G"}]
+    assert gzip.decompress((out / (all_path.name + ".gz")).read_bytes()) == all_path.read_bytes()
+    assert json.loads((out / MANIFEST).read_text()) == manifest
+
+def test_unchanged_sources_are_skipped_and_stale_shards_removed(tmp_path):
+    pubs, authors = write_sources(tmp_path, [{"title": "A", "year": 2020, "authors": []}])
+    out = tmp_path / "out"
+    first = build(pubs, authors, out)
+    stamp = (out / MANIFEST).stat().st_mtime_ns
+    assert build(pubs, authors, out) == first
+    assert (out / MANIFEST).stat().st_mtime_ns == stamp
+
+    pubs.write_text(json.dumps({"publications": [{"title": "B", "year": 2021, "authors": []}]}))
+    second = build(pubs, authors, out)
+    assert "year-2020" not in second["files"]
+    names = {p.name for p in out.iterdir()}
+    assert first["files"]["year-2020"]["path"] not in names
+    assert first["files"]["all"]["path"] not in names
+    assert second["files"]["all"]["path"] in names
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="node is not installed")
+def test_api_fallback_payload_matches_the_bundle():
+    data = {"publications": [
+        {"title": "b undated", "authors": ["Ion, M."], "location": "Ion, M."},
+        {"title": "Old", "year": 2019, "type": "journal", "authors": ["Ion, M.", "ion, m", "Doe, A. B."],
+         "location": "Ann Arbor, MI"},
+        {"title": "new", "year": 2023, "authors": "Smith, J."},
+        {"title": "A new", "year": 2023, "authors": [" Smith,J ", "", "Ion, Mike"]},
+        {"title": "Straße", "year": "2020", "authors": []},
+    ], "grants": [{"title": "G"}]}
+    aliases = {"Doe, A. B.": "Doe, A.", "Ion, Mike": "Ion, M.", "Missing, X.": "Nobody"}
+    script = ("import { buildPayload } from " + json.dumps("file://" + PAYLOAD_MODULE) + ";\n"
+              "import { readFileSync } from 'fs';\n"
+              "const input = JSON.parse(readFileSync(0, 'utf8'));\n"
+              "process.stdout.write(JSON.stringify(buildPayload(input.data, input.authors, input.aliases)));")
+    result = subprocess.run(["node", "--input-type=module", "-e", script], capture_output=True, text=True,
+                            input=json.dumps({"data": data, "authors": AUTHORS, "aliases": aliases}), check=True)
+    fallback = result.stdout
+    bundle = json.dumps(build_bundles(data, AUTHORS, aliases)["all"], ensure_ascii=False, separators=(",", ":"))
+    assert fallback == bundle
@@ -0,0 +1,79 @@
+import pytest
+import sys
+import os
+import json
+
+# Add the project root and scripts directory to Python path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "scripts"))
+
+from scripts.llm_stub import ScriptRule
+from scripts.research_classifier import ModelRouter, classify_research_work
+
+SMALL, LARGE = "small-model", "large-model"
+
+def answer(area: str, confidence: float) -> str:
+    return json.dumps({"primary_area": area, "secondary_areas": [], "keywords": [],
+                       "collaborators": [], "confidence": confidence})
+
+@pytest.fixture
+def stub(stub_server):
+    def start(small: str, large: str, large_preamble: str = ""):
+        return stub_server(rules=[
+            ScriptRule(match=".", model=SMALL, output=small),
+            ScriptRule(match=".", model=LARGE, output=large, preamble=large_preamble),
+        ])
+    return start
+
+def test_confident_small_answer_is_accepted(stub):
+    llm = stub(answer("Mathematics Education", 0.9), answer("AI in Education", 0.9))
+    router = ModelRouter(tiers=[SMALL, LARGE], min_confidence=0.7)
+    result = classify_research_work(llm, "A geometry study", router=router)
+    assert result.primary_area == "Mathematics Education"
+    assert router.summary()["answered"] == {SMALL: 1}
+    assert router.summary()["escalations"] == {}
+
+def test_invalid_json_escalates(stub):
+    llm = stub("not json at all", answer("AI in Education", 0.9))
+    router = ModelRouter(tiers=[SMALL, LARGE])
+    result = classify_research_work(llm, "A tutoring system", router=router)
+    assert result.primary_area == "AI in Education"
+    assert router.escalations == {f"{SMALL}:invalid": 1}
+
+def test_low_confidence_escalates_and_last_tier_is_accepted(stub):
+    llm = stub(answer("Mathematics Education", 0.4), answer("AI in Education", 0.2))
+    router = ModelRouter(tiers=[SMALL, LARGE], min_confidence=0.7)
+    for text in ["First work", "Second work"]:
+        result = classify_research_work(llm, text, router=router)
+        # Below min_confidence too, but there is no tier left to ask
+        assert result.primary_area == "AI in Education"
+
+    summary = router.summary()
+    assert summary["answered"] == {LARGE: 2}
+    assert summary["escalations"] == {f"{SMALL}:low_confidence": 2}
+    assert set(summary["latency_s"]) == {SMALL, LARGE}
+
+def test_no_valid_answer_is_uncategorized(stub):
+    llm = stub("nope", "still nope")
+    router = ModelRouter(tiers=[SMALL, LARGE])
+    result = classify_research_work(llm, "Anything", router=router)
+    assert result.primary_area == "Uncategorized"
+    assert router.escalations == {f"{SMALL}:invalid": 1, f"{LARGE}:invalid": 1}
+    assert router.answered == {}
+
+def test_reasoning_models_get_room_to_think(stub):
+    thinking = "<think>" + "Weighing the areas against each other. " * 150 + "</think>\n"
+    llm = stub("unused", answer("AI in Education", 0.9), large_preamble=thinking)
+    # The schema-sized cap alone would cut the answer off inside the <think> block
+    assert ModelRouter(tiers=[LARGE], reasoning=set()).max_tokens(LARGE) < len(thinking.split())
+    result = classify_research_work(llm, "A tutoring system", router=ModelRouter(tiers=[LARGE]))
+    assert result.primary_area == "Uncategorized"
+
+    router = ModelRouter(tiers=[LARGE], reasoning={LARGE})
+    result = classify_research_work(llm, "A tutoring system", router=router)
+    assert result.primary_area == "AI in Education"
+
+def test_no_tiers_is_uncategorized(stub):
+    llm = stub("unused", "unused")
+    assert classify_research_work(llm, "Anything", router=ModelRouter(tiers=[])).primary_area == "Uncategorized"
@@ -0,0 +1,48 @@
+import sys
+import os
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "scripts"))
+
+from scripts.row_edits import VersionConflict, apply_edits, edits_from_editor, filter_items, search_text
+
+ITEMS = [
+    {"title": "A", "year": 2024, "status": "published", "collaborators": ["Kim"]},
+    {"title": "B", "year": 2023, "status": "in_review"},
+    {"title": "C", "year": 2023, "status": "published", "venue": "ICML"},
+]
+
+def test_editor_state_becomes_row_edits():
+    # Displayed rows 0 and 1 are baseline items 2 and 0
+    state = {
+        "edited_rows": {"0": {"venue": None, "title": "C2"}, "1": {"title": "A"}},
+        "added_rows": [{"title": "D", "year": float("nan")}, {"title": None}],
+        "deleted_rows": [],
+    }
+    edits = edits_from_editor(state, [2, 0], ITEMS)
+    # Unchanged rows are dropped, cleared cells remove the field, NaN is not stored
+    assert edits.updated == {2: {"title": "C2", "year": 2023, "status": "published"}}
+    assert edits.added == [{"title": "D"}]
+    assert edits.deleted == []
+
+def test_apply_edits_keeps_concurrent_changes_to_other_rows():
+    current = [{"title": "New"}] + ITEMS[:1] + [dict(ITEMS[1], status="published")] + ITEMS[2:]
+    edits = edits_from_editor({"edited_rows": {0: {"title": "A2"}}, "deleted_rows": [1]}, [0, 2], ITEMS)
+    result = apply_edits(current, ITEMS, edits, "areas.json")
+    assert [item["title"] for item in result] == ["New", "A2", "B"]
+    assert result[2]["status"] == "published"
+
+def test_apply_edits_rejects_rows_changed_elsewhere():
+    current = [dict(ITEMS[0], title="A (theirs)")] + ITEMS[1:]
+    edits = edits_from_editor({"edited_rows": {0: {"title": "A (mine)"}}}, [0], ITEMS)
+    with pytest.raises(VersionConflict):
+        apply_edits(current, ITEMS, edits, "areas.json")
+
+def test_filter_items():
+    texts = [search_text(item) for item in ITEMS]
+    assert filter_items(ITEMS, texts, year=2023) == [1, 2]
+    assert filter_items(ITEMS, texts, status="published", query="icml") == [2]
+    assert filter_items(ITEMS, texts, query=" kim ") == [0]
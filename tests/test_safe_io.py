@@ -0,0 +1,44 @@
+import json
+import sys
+import os
+import threading
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "scripts"))
+
+from scripts.safe_io import VersionConflict, atomic_write_json, update_json
+
+def test_atomic_write_leaves_no_temp_files(tmp_path):
+    path = tmp_path / "areas.json"
+    atomic_write_json(path, {"a": 1})
+    atomic_write_json(path, {"a": 2})
+    assert json.loads(path.read_text()) == {"a": 2}
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["areas.json"]
+
+def test_rejected_update_leaves_the_file_alone(tmp_path):
+    path = tmp_path / "areas.json"
+    atomic_write_json(path, {"a": ["theirs"]})
+
+    def stale(data):
+        raise VersionConflict(path)
+    with pytest.raises(VersionConflict):
+        update_json(path, stale)
+    assert json.loads(path.read_text()) == {"a": ["theirs"]}
+    assert update_json(path, lambda data: data["a"].append("mine")) == {"a": ["theirs", "mine"]}
+
+def test_concurrent_updates_are_not_lost(tmp_path):
+    path = tmp_path / "counter.json"
+
+    def bump():
+        for _ in range(20):
+            update_json(path, lambda data: data.append(1), default=[])
+
+    threads = [threading.Thread(target=bump) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(json.loads(path.read_text())) == 80
@@ -0,0 +1,100 @@
+import json
+import random
+import shutil
+import subprocess
+import sys
+import os
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "scripts"))
+SEARCH_MODULE = os.path.join(ROOT, "src", "utils", "publicationSearch.mjs")
+
+from scripts.search_index import SearchIndex, build_index, tokenize, write_index
+from scripts.bench_search import synthetic_corpus
+
+PUBLICATIONS = [
+    {"title": "Teaching geometry to future teachers", "year": 2021, "type": "journal",
+     "authors": ["Ion, M.", "Herbst, P."], "venue": "ZDM"},
+    {"title": "Tutoring conversations at scale", "year": 2024, "type": "conference",
+     "authors": ["Ion, M."], "description": "A dataset of geometry tutoring sessions."},
+    {"title": "Proof in the classroom", "year": 2019, "type": "journal", "authors": ["Herbst, P."],
+     "venue": "Geometry Teacher"},
+]
+
+def brute_force(index, query, limit):
+    """Score every document directly, as the index is documented to"""
+    words = tokenize(query)
+    prefix = query[-1:].isalnum()
+    matched = [index.matching_terms(w, prefix and i == len(words) - 1) for i, w in enumerate(words)]
+    scores = {}
+    for doc in range(len(index.docs)):
+        total = 0.0
+        for terms in matched:
+            found = [score * f for t, f in terms for score, _, members in index.blocks[t] if doc in members]
+            if not found:
+                break
+            total += max(found)
+        else:
+            scores[doc] = total
+    return sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+
+def test_tokenize_folds_and_drops_stop_words():
+    assert tokenize("The Géométrie of Proof, 2nd ed.") == ["geometrie", "proof", "2nd", "ed"]
+
+def test_field_boosts_prefixes_and_every_word_matching():
+    index = SearchIndex(build_index(PUBLICATIONS))
+    titles = lambda query: [index.docs[doc][0] for doc, _ in index.search(query)]
+    # The title match outranks a venue or description match
+    assert titles("geometry")[0] == "Teaching geometry to future teachers"
+    assert set(titles("geometry")) == {p["title"] for p in PUBLICATIONS}
+    assert titles("herbst proof") == ["Proof in the classroom"]
+    # Only the last word is a prefix, and only while it is being typed
+    assert titles("tutor") == ["Tutoring conversations at scale"]
+    assert titles("tutor ") == []
+    assert titles("tutor ion") == []
+    assert titles("conversations io") == ["Tutoring conversations at scale"]
+
+def test_multi_word_queries_match_brute_force():
+    corpus = synthetic_corpus(400, seed=3)
+    index = SearchIndex(json.loads(json.dumps(build_index(corpus))))
+    rng = random.Random(5)
+    matched = 0
+    for _ in range(60):
+        # Words of one publication, so most queries have results
+        words = tokenize(rng.choice(corpus)["description"])
+        query = " ".join(rng.sample(words, 2)) + rng.choice(["", " " + rng.choice(words)[:3]])
+        found = index.search(query, 10)
+        assert found == brute_force(index, query, 10)
+        matched += bool(found)
+    assert matched > 40
+
+def test_written_index_loads(tmp_path):
+    path = tmp_path / "search" / "index.json"
+    write_index(build_index(PUBLICATIONS), path)
+    assert (tmp_path / "search" / "index.json.gz").exists()
+    hits = SearchIndex.load(path).results("classroom")
+    assert [(h["title"], h["year"]) for h in hits] == [("Proof in the classroom", 2019)]
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="node is not installed")
+def test_api_search_matches_the_script():
+    corpus = synthetic_corpus(300, seed=7)
+    artifact = build_index(corpus + PUBLICATIONS)
+    index = SearchIndex(json.loads(json.dumps(artifact)))
+    rng = random.Random(11)
+    queries = ["geometry", "Géométrie teach", "tutor ", "the", "herbst proof", "zzz"]
+    for _ in range(40):
+        words = tokenize(rng.choice(corpus)["description"])
+        queries.append(" ".join(rng.sample(words, rng.randint(1, 2))) + rng.choice(["", " " + rng.choice(words)[:3]]))
+    # Short prefixes expand to more terms than are kept
+    queries += [word[:2] for word in rng.sample(artifact["terms"], 20)]
+    script = ("import { loadIndex, results } from " + json.dumps("file://" + SEARCH_MODULE) + ";\n"
+              "import { readFileSync } from 'fs';\n"
+              "const input = JSON.parse(readFileSync(0, 'utf8'));\n"
+              "const index = loadIndex(input.index);\n"
+              "process.stdout.write(JSON.stringify(input.queries.map((q) => results(index, q, 50))));")
+    result = subprocess.run(["node", "--input-type=module", "-e", script], capture_output=True, text=True,
+                            input=json.dumps({"index": artifact, "queries": queries}), check=True)
+    assert json.loads(result.stdout) == [index.results(query, 50) for query in queries]
@@ -0,0 +1,83 @@
+import pytest
+import sys
+import os
+from typing import List, Literal
+
+from pydantic import BaseModel
+
+# Add the project root to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.token_budget import (
+    UsageReport,
+    chunk_text,
+    compact_for_prompt,
+    compact_latex_entry,
+    count_tokens,
+    output_token_cap,
+)
+
+class Classification(BaseModel):
+    primary_area: Literal["AI in Education", "Mathematics Education"]
+    keywords: List[str]
+
+@pytest.fixture
+def latex_entry():
+    return (
+        "\\textbf{Ion, M.}, Herbst, P. (2023). Test \\emph{Publication Title}. "
+        "\\textit{Journal of Testing}. "
+        "\\href{https://doi.org/10.1234/test}{doi: 10.1234/test}"
+    )
+
+def test_compact_latex_entry(latex_entry):
+    result = compact_latex_entry(latex_entry)
+    assert result == "Ion, M., Herbst, P. (2023). Test Publication Title. Journal of Testing."
+
+def test_compact_for_prompt_respects_budget(latex_entry):
+    result = compact_for_prompt(latex_entry * 20, 10)
+    assert count_tokens(result) <= 10
+
+def test_output_token_cap_scales_with_schema():
+    cap = output_token_cap(Classification, headroom=1.0, minimum=0)
+    assert 0 < cap < 2048
+
+def test_usage_report_summary():
+    report = UsageReport()
+    report.record("classify", "some prompt text", "{}", 0.5)
+    report.record("classify", "another prompt", "{}", 1.5)
+    summary = report.summary()
+    assert summary["calls"] == 2
+    assert summary["p50_latency_s"] == 1.0
+    assert summary["prompt_tokens"] > 0
+
+def test_chunk_text_respects_budget():
+    text = "\n\n".join(f"Paragraph {i} " + "word " * 50 for i in range(20))
+    chunks = chunk_text(text, 200)
+    assert len(chunks) > 1
+    assert all(count_tokens(chunk) <= 200 for chunk in chunks)
+    assert "Paragraph 19" in chunks[-1]
+
+def test_chunk_text_splits_oversized_paragraph():
+    chunks = chunk_text("word " * 1000, 100)
+    assert all(count_tokens(chunk) <= 100 for chunk in chunks)
+    assert sum(chunk.count("word") for chunk in chunks) == 1000
+
+class CharEncoding:
+    """One token per character, standing in for tiktoken"""
+    def encode(self, text):
+        return [ord(c) for c in text]
+
+    def decode(self, tokens):
+        return "".join(map(chr, tokens))
+
+    def decode_with_offsets(self, tokens):
+        return self.decode(tokens), list(range(len(tokens)))
+
+def test_chunk_text_progresses_past_whitespace_only_pieces(monkeypatch):
+    import scripts.token_budget as token_budget
+    monkeypatch.setattr(token_budget, "_encoding", lambda: CharEncoding())
+    # The first pieces of the paragraph are nothing but whitespace
+    text = " " * 12 + "abcd " * 10
+    chunks = chunk_text(text, 5)
+    assert all(count_tokens(chunk) <= 5 for chunk in chunks)
+    assert "".join(chunks).replace(" ", "") == "abcd" * 10